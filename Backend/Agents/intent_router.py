@@ -0,0 +1,160 @@
+# Backend/Agents/intent_router.py
+import os
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+# --- Library Imports with Fallbacks ---
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+ROUTES = ("TEST", "READ", "WRITE", "SYNC", "IMPORT")
+
+COURSE_CODE = r"\b[a-z]{2,5}\s?\d{3}[a-z]?\b"
+
+# IMPORT posts the batch to UniTime, so no local tier decides it unless the
+# message is an explicit command; negated requests are always left to the LLM.
+IMPORT_COMMAND = re.compile(
+    r"^\s*(please\s+)?((can|could|would) you\s+(please\s+)?)?"
+    r"(import\s+(the\s+)?(new\s+)?(batch|update|file|courses)\b"
+    r"|(push|upload)\b.*\bto unitime\b"
+    r"|apply the (changes|update)\b)",
+    re.I,
+)
+NEGATION = re.compile(r"\b(not|never|no|don'?t|doesn'?t|isn'?t|won'?t|can'?t|cannot|stop|cancel|hold off)\b", re.I)
+
+# Tier 1: high-precision rules. A message matching rules of more than one route is left to the next tier.
+KEYWORD_RULES: List[Tuple[str, "re.Pattern"]] = [
+    ("TEST", re.compile(r"\btest(ing)?\b.*\b(export|selenium)\b|\b(export|selenium)\b.*\btest\b", re.I)),
+    ("SYNC", re.compile(r"\bauto-?sync\b|\brun\b.*\bsync\b|\brefresh\b.*\b(database|rag|index|chatbot)\b", re.I)),
+    ("IMPORT", IMPORT_COMMAND),
+    ("WRITE", re.compile(
+        r"\b(process|check|read)\b.*\b(inbox|e-?mails?|requests?)\b"
+        r"|\b(add|insert|create|update|modify|change)\b.*\b(course|class|offering|preference|title|room|capacity)\b"
+        r"|" + COURSE_CODE + r".*\bto (title|room)\b"
+        r"|\binstructor\b.*\b(needs?|prefers?|cannot|can't|wants?)\b",
+        re.I)),
+    ("READ", re.compile(
+        r"\b(where|when|who|which|what time|what room)\b.*(" + COURSE_CODE + r"|\bclass(es)?\b|\bcourse\b|\blecture\b|\bteach(es|ing)?\b)"
+        r"|\b(schedule|timetable)\b.*\?",
+        re.I)),
+]
+
+# Tier 2: seed utterances for the local TF-IDF + logistic regression classifier.
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "TEST": [
+        "test export", "test selenium", "test the export bot", "can you test the selenium export",
+        "run a test of the export", "check that the export bot works",
+    ],
+    "READ": [
+        "where is my ALG 101 class", "when does BIOL 101 meet", "who teaches CHM 101",
+        "what room is ECON 101 in", "what time is my calculus lecture", "which building is the physics lab in",
+        "is there a class on friday morning", "tell me about my schedule", "who is the instructor for algebra",
+        "where do I go for my lab",
+    ],
+    "WRITE": [
+        "process the new request in the inbox", "check email", "add a new offering CS 4500",
+        "instructor doe needs a projector", "update DLCS 101 to title advanced ai",
+        "change the room of MATH 201 to engineering 205", "insert a new course offering",
+        "prof smith cannot teach on mondays", "add a preference for instructor newman", "modify the capacity of CS 101",
+    ],
+    "SYNC": [
+        "run the sync", "refresh the database", "run the auto-sync now", "sync the timetable",
+        "update the chatbot with the latest schedule", "rebuild the rag index",
+    ],
+    "IMPORT": [
+        "import the batch file", "import the update", "push data to unitime", "import new courses",
+        "apply the changes to unitime", "upload the batch xml to unitime",
+    ],
+}
+
+
+class TieredIntentRouter:
+    """
+    Routes a user message to TEST/READ/WRITE/SYNC/IMPORT in up to three tiers:
+
+    1. compiled keyword/regex rules (microseconds),
+    2. a small local TF-IDF + logistic regression classifier, accepted when its
+       confidence reaches ROUTER_CLASSIFIER_THRESHOLD,
+    3. the LLM router, only for whatever is still undecided.
+
+    `stats` counts which tier decided each request.
+    """
+
+    def __init__(self, llm_route: Optional[Callable[[str], str]] = None, threshold: Optional[float] = None):
+        self.llm_route = llm_route
+        self.threshold = threshold if threshold is not None else float(os.getenv("ROUTER_CLASSIFIER_THRESHOLD", 0.55))
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._classifier = self._train_classifier()
+
+    def _train_classifier(self):
+        if not SKLEARN_AVAILABLE:
+            print("Warning: scikit-learn not installed, intent router skips the classifier tier.")
+            return None
+        texts, labels = [], []
+        for route, examples in SEED_EXAMPLES.items():
+            texts.extend(examples)
+            labels.extend([route] * len(examples))
+        classifier = make_pipeline(
+            TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True),
+            LogisticRegression(C=10.0, max_iter=1000),
+        )
+        classifier.fit(texts, labels)
+        return classifier
+
+    # --- Tiers ---
+    @staticmethod
+    def _locally_allowed(route: Optional[str], text: str) -> Optional[str]:
+        """Drops a local IMPORT decision unless the message is an explicit, non-negated import command."""
+        if route == "IMPORT" and (NEGATION.search(text) or not IMPORT_COMMAND.search(text)):
+            return None
+        return route
+
+    def _keyword_route(self, text: str) -> Optional[str]:
+        matches = {route for route, pattern in KEYWORD_RULES if pattern.search(text)}
+        return self._locally_allowed(matches.pop(), text) if len(matches) == 1 else None
+
+    def _classifier_route(self, text: str) -> Optional[str]:
+        if self._classifier is None:
+            return None
+        probabilities = self._classifier.predict_proba([text])[0]
+        best = probabilities.argmax()
+        if probabilities[best] >= self.threshold:
+            return self._locally_allowed(str(self._classifier.classes_[best]), text)
+        return None
+
+    def _llm_fallback(self, text: str) -> Optional[str]:
+        if self.llm_route is None:
+            return None
+        try:
+            choice = self.llm_route(text).strip().upper()
+        except Exception as e:
+            print(f"Router Error: {e}. Defaulting to READ.")
+            return None
+        return choice if choice in ROUTES else None
+
+    def _record(self, tier: str) -> None:
+        with self._stats_lock:
+            self.stats[tier] += 1
+
+    def route(self, text: str) -> str:
+        for tier, decide in (
+            ("keyword", self._keyword_route),
+            ("classifier", self._classifier_route),
+            ("llm", self._llm_fallback),
+        ):
+            choice = decide(text)
+            if choice:
+                self._record(tier)
+                print(f"[Router] {tier} tier decided: {choice}")
+                return choice
+
+        self._record("default")
+        return "READ"  # default fallback
@@ -0,0 +1,113 @@
+# Backend/Helper/answer_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from Backend.Helper.embeddings import get_embeddings
+
+
+def normalize_query(text: str) -> str:
+    """Lower-cases, collapses whitespace and drops trailing punctuation so trivial variants share a key."""
+    text = " ".join(str(text).lower().split())
+    return text.strip(" ?!.")
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache keyed on the normalized query embedding.
+
+    A lookup hits when a stored query has cosine similarity >= `threshold`,
+    the entry is younger than `ttl_seconds` and was stored under the same RAG
+    index version. Seeing a new index version (after Refresh_RAG_Database)
+    drops every entry at once. Size is bounded with LRU eviction.
+    """
+
+    def __init__(self, embed_fn: Callable[[str], List[float]], threshold: float = 0.92,
+                 ttl_seconds: float = 3600, max_entries: int = 512):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embed_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_version(self, version: Optional[str]) -> None:
+        if version != self._version:
+            if self._entries:
+                print(f"--- [Answer Cache]: Index version changed, dropping {len(self._entries)} cached answers ---")
+            self._entries.clear()
+            self._version = version
+
+    def _drop_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        for key in [k for k, e in self._entries.items() if e["created"] < cutoff]:
+            del self._entries[key]
+
+    def lookup(self, query: str, version: Optional[str]) -> Optional[str]:
+        key = normalize_query(query)
+        with self._lock:
+            self._sync_version(version)
+            self._drop_expired()
+            if not self._entries:
+                return None
+            exact = self._entries.get(key)
+            if exact is not None:
+                self._entries.move_to_end(key)
+                return exact["answer"]
+
+        vector = self._embed(key)
+        with self._lock:
+            if version != self._version or not self._entries:
+                return None
+            keys = list(self._entries.keys())
+            similarities = np.stack([self._entries[k]["vector"] for k in keys]) @ vector
+            best = int(similarities.argmax())
+            if similarities[best] < self.threshold:
+                return None
+            self._entries.move_to_end(keys[best])
+            print(f"--- [Answer Cache]: Hit ({similarities[best]:.3f}) for '{query}' ---")
+            return self._entries[keys[best]]["answer"]
+
+    def store(self, query: str, answer: str, version: Optional[str]) -> None:
+        key = normalize_query(query)
+        vector = self._embed(key)
+        with self._lock:
+            self._sync_version(version)
+            self._entries[key] = {"vector": vector, "answer": answer, "created": time.monotonic()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# --- Process-wide access ---
+_caches: Dict[str, SemanticAnswerCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_answer_cache(name: str) -> SemanticAnswerCache:
+    """Returns the shared cache for `name` (e.g. 'read_agent', used by the READ node)."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = SemanticAnswerCache(
+                embed_fn=lambda text: get_embeddings().embed_query(text),
+                threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.92)),
+                ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", 3600)),
+                max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 512)),
+            )
+            _caches[name] = cache
+        return cache
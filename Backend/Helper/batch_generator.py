@@ -0,0 +1,179 @@
+# Backend/Helper/batch_generator.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional, Tuple
+
+import torch
+from transformers import LogitsProcessorList
+
+from Backend.Helper.model_registry import QLoRAModelRegistry, get_model_registry
+from Backend.Helper.draft_model import get_draft_model_pool
+from Backend.Helper.generation_cache import GenerationCache, get_generation_cache
+from Backend.Helper.xml_constraints import get_logits_processor
+
+
+class _GenerationRequest:
+    __slots__ = ("adapter_name", "adapter_path", "prompt", "gen_kwargs", "future")
+
+    def __init__(self, adapter_name: str, adapter_path: str, prompt: str, gen_kwargs: Dict[str, Any]):
+        self.adapter_name = adapter_name
+        self.adapter_path = adapter_path
+        self.prompt = prompt
+        self.gen_kwargs = gen_kwargs
+        self.future: Future = Future()
+
+    @property
+    def group_key(self) -> Tuple:
+        return (self.adapter_name, self.adapter_path, tuple(sorted(self.gen_kwargs.items())))
+
+
+class BatchedGenerator:
+    """
+    Micro-batching front end for seq2seq generation on the shared model pool.
+
+    Prompts submitted within `max_wait_ms` of each other (from concurrent tool
+    calls or via `generate_many`) are grouped by adapter + generation config,
+    padded into one batch and decoded with a single `generate` call.
+
+    A `constraint` generation kwarg (e.g. "offering-insert") names an XML
+    grammar from xml_constraints that the decoder is restricted to.
+
+    A `draft` generation kwarg turns on assisted generation: the draft model
+    from draft_model (with the draft adapter at that path, "" for none)
+    proposes tokens for the full model to verify. Transformers only supports
+    this greedily for one sequence at a time, so those requests are decoded
+    one by one with num_beams=1; if the draft cannot be loaded they fall
+    back to plain decoding.
+
+    With a `cache`, deterministic generations are looked up before queueing
+    and stored after decoding, so a repeated prompt never reaches the model.
+    """
+
+    def __init__(self, registry: QLoRAModelRegistry, max_batch_size: int = 8, max_wait_ms: float = 25,
+                 cache: Optional[GenerationCache] = None):
+        self.registry = registry
+        self.cache = cache
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[_GenerationRequest]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    # --- Public API ---
+    def submit(self, adapter_name: str, adapter_path: str, prompt: str, **gen_kwargs: Any) -> Future:
+        """Queues one prompt and returns a Future resolving to the decoded text."""
+        request = _GenerationRequest(adapter_name, adapter_path, prompt, gen_kwargs)
+        if self.cache is not None and self.cache.cacheable(gen_kwargs):
+            cached = self.cache.get(self.registry.base_model_id, adapter_path, prompt, gen_kwargs)
+            if cached is not None:
+                print(f"--- [Batch Generator] Cache hit on '{adapter_name}' ---")
+                request.future.set_result(cached)
+                return request.future
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future
+
+    def generate(self, adapter_name: str, adapter_path: str, prompt: str, **gen_kwargs: Any) -> str:
+        return self.submit(adapter_name, adapter_path, prompt, **gen_kwargs).result()
+
+    def generate_many(self, adapter_name: str, adapter_path: str, prompts: List[str], **gen_kwargs: Any) -> List[str]:
+        futures = [self.submit(adapter_name, adapter_path, p, **gen_kwargs) for p in prompts]
+        return [f.result() for f in futures]
+
+    # --- Worker ---
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="batched-generator", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[_GenerationRequest]:
+        """Blocks for the first request, then gathers more until the window closes or the batch is full."""
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            pending = self._collect()
+            groups: Dict[Tuple, List[_GenerationRequest]] = {}
+            for request in pending:
+                groups.setdefault(request.group_key, []).append(request)
+            for group in groups.values():
+                if "draft" in group[0].gen_kwargs:
+                    for request in group:
+                        self._run_batch([request])
+                else:
+                    self._run_batch(group)
+
+    def _run_batch(self, batch: List[_GenerationRequest]) -> None:
+        head = batch[0]
+        try:
+            with ExitStack() as stack:
+                model, tokenizer = stack.enter_context(self.registry.use_adapter(head.adapter_name, head.adapter_path))
+                # Outputs are cached under the weights that produced them, not whatever is on disk by then
+                generated_with = self.registry.attached_checksum(head.adapter_name)
+                gen_kwargs = dict(head.gen_kwargs)
+                constraint = gen_kwargs.pop("constraint", None)
+                if constraint:
+                    gen_kwargs["logits_processor"] = LogitsProcessorList([get_logits_processor(constraint, tokenizer)])
+                draft = gen_kwargs.pop("draft", None)
+                if draft is not None:
+                    gen_kwargs["num_beams"] = 1
+                    pool = get_draft_model_pool()
+                    if pool.load(draft):
+                        gen_kwargs["assistant_model"] = stack.enter_context(pool.use(draft, model.device))
+                    else:
+                        print(f"--- [Batch Generator] Draft model unavailable, plain greedy decoding on '{head.adapter_name}' ---")
+                inputs = tokenizer(
+                    [r.prompt for r in batch], return_tensors="pt", padding=True
+                ).to(model.device)
+                with torch.no_grad():
+                    outputs = model.generate(
+                        input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"],
+                        pad_token_id=tokenizer.pad_token_id, eos_token_id=tokenizer.eos_token_id,
+                        **gen_kwargs,
+                    )
+                texts = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+            print(f"--- [Batch Generator] {len(batch)} prompt(s) decoded on '{head.adapter_name}' in one pass ---")
+            for request, text in zip(batch, texts):
+                if self.cache is not None and self.cache.cacheable(request.gen_kwargs):
+                    self.cache.put(self.registry.base_model_id, request.adapter_path, request.prompt, request.gen_kwargs, text,
+                                   generated_with=generated_with)
+                request.future.set_result(text)
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+
+# --- Process-wide access ---
+_generators: Dict[str, BatchedGenerator] = {}
+_generators_lock = threading.Lock()
+
+
+def get_batch_generator(base_model_id: str) -> BatchedGenerator:
+    """Returns the shared micro-batching generator for `base_model_id`."""
+    with _generators_lock:
+        generator = _generators.get(base_model_id)
+        if generator is None:
+            generator = BatchedGenerator(
+                get_model_registry(base_model_id),
+                max_batch_size=int(os.getenv("GEN_MAX_BATCH_SIZE", 8)),
+                max_wait_ms=float(os.getenv("GEN_MAX_WAIT_MS", 25)),
+                cache=get_generation_cache(),
+            )
+            _generators[base_model_id] = generator
+        return generator
@@ -0,0 +1,138 @@
+# Backend/Helper/batch_store.py
+import datetime
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+# --- Platform file locking ---
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import msvcrt
+    MSVCRT_AVAILABLE = True
+except ImportError:
+    MSVCRT_AVAILABLE = False
+
+OFFERINGS_FOOTER = "</offerings>"
+
+
+def offerings_header() -> str:
+    timestamp = datetime.datetime.now().strftime("%a %b %d %H:%M:%S %Z %Y")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<offerings campus="woebegon" year="2010" term="Fal" dateFormat="yyyy/M/d" timeFormat="HHmm" created="{timestamp}" includeExams="none">
+"""
+
+
+class BatchStore:
+    """
+    Append-only store behind a UniTime batch file such as unitime_batch.xml.
+
+    Fragments (<offering>, preference blocks, ...) are appended to
+    `<batch file>.journal`, which holds the XML header followed by every
+    fragment in order, under an exclusive lock on `<batch file>.lock`. An
+    append is one write at the end of the journal, whatever the batch size.
+
+    The batch file itself, with its closing </offerings>, is only written by
+    materialize() (at import time), through a temp file and os.replace so
+    readers never see a partial file.
+    """
+
+    def __init__(self, batch_file_path: str):
+        self.batch_file_path = batch_file_path
+        self.journal_path = batch_file_path + ".journal"
+        self.lock_path = batch_file_path + ".lock"
+        self._thread_lock = threading.Lock()
+
+    # --- Locking ---
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Exclusive across threads (threading.Lock) and processes (fcntl / msvcrt on the lock file)."""
+        with self._thread_lock:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                elif MSVCRT_AVAILABLE:
+                    # LK_LOCK retries for ~10 seconds before raising
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+                    elif MSVCRT_AVAILABLE:
+                        os.lseek(fd, 0, os.SEEK_SET)
+                        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
+
+    # --- Journal ---
+    def _ensure_journal(self) -> None:
+        """Creates the journal, migrating fragments from an existing batch file (caller holds the lock)."""
+        if os.path.exists(self.journal_path):
+            return
+        content = offerings_header()
+        if os.path.exists(self.batch_file_path):
+            with open(self.batch_file_path, "r", encoding="utf-8") as f:
+                existing = f.read()
+            end = existing.rfind(OFFERINGS_FOOTER)
+            if end == -1:
+                raise ValueError(f"Batch file '{self.batch_file_path}' is corrupt (no {OFFERINGS_FOOTER}).")
+            content = existing[:end].rstrip() + "\n"
+            print(f"--- [Batch Store]: Migrated {os.path.basename(self.batch_file_path)} to an append-only journal ---")
+        self._write_atomic(self.journal_path, content)
+
+    @staticmethod
+    def _write_atomic(path: str, content: str) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def append(self, fragment: str) -> None:
+        """Appends one XML fragment to the journal."""
+        data = (fragment.strip() + "\n").encode("utf-8")
+        with self._locked():
+            self._ensure_journal()
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+
+    # --- Batch file ---
+    def materialize(self) -> str:
+        """Writes the complete <offerings> document to the batch file and returns its path."""
+        with self._locked():
+            self._ensure_journal()
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                body = f.read()
+            self._write_atomic(self.batch_file_path, f"{body}{OFFERINGS_FOOTER}\n")
+        return self.batch_file_path
+
+
+# --- Process-wide access ---
+_stores: Dict[str, BatchStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_batch_store(batch_file_path: str) -> BatchStore:
+    """Returns the shared store for `batch_file_path`, so all tools in the process use one lock."""
+    path = os.path.abspath(batch_file_path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = BatchStore(path)
+        return store
+
+
+def is_journaled(batch_file_path: str) -> bool:
+    """True if `batch_file_path` is backed by a BatchStore journal that must be materialized before reading."""
+    return os.path.exists(os.path.abspath(batch_file_path) + ".journal")
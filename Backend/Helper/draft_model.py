@@ -0,0 +1,96 @@
+# Backend/Helper/draft_model.py
+import os
+import threading
+import traceback
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import torch
+from transformers import AutoModelForSeq2SeqLM
+from peft import PeftModel
+
+DEFAULT_DRAFT_MODEL_ID = "Salesforce/codet5p-220m"
+
+
+class DraftModelPool:
+    """
+    Small seq2seq model used as the assistant in assisted (speculative)
+    generation: it proposes a run of tokens greedily and the adapter-backed
+    770M model verifies them in a single forward pass.
+
+    codet5p-220m shares the 770M tokenizer, so no re-tokenization is needed.
+    Draft adapters (fine-tuned on the same datasets as the full adapters) are
+    attached by path as named PEFT adapters; an empty path uses the plain
+    draft base. The draft runs unquantized, which is what CPU workers want
+    for a model this size.
+    """
+
+    def __init__(self, model_id: str = DEFAULT_DRAFT_MODEL_ID):
+        self.model_id = model_id
+        self._model: Optional[Any] = None
+        # adapter path -> PEFT adapter name
+        self._adapters: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    # --- Loading ---
+    def _load_base(self) -> None:
+        print(f"--- [Draft Model] Loading Draft Model: {self.model_id} ---")
+        self._model = AutoModelForSeq2SeqLM.from_pretrained(self.model_id, trust_remote_code=True)
+        self._model.eval()
+
+    def _attach(self, path: str) -> None:
+        name = f"draft_{len(self._adapters)}"
+        print(f"--- [Draft Model] Attaching Draft Adapter '{name}': {path} ---")
+        if isinstance(self._model, PeftModel):
+            self._model.load_adapter(path, adapter_name=name)
+        else:
+            self._model = PeftModel.from_pretrained(self._model, path, adapter_name=name)
+        self._model.eval()
+        self._adapters[path] = name
+
+    def load(self, adapter_path: str = "") -> bool:
+        """Makes sure the draft base (and adapter, if any) is resident. Returns False (and logs) on failure."""
+        with self._lock:
+            try:
+                if self._model is None:
+                    self._load_base()
+                if adapter_path and adapter_path not in self._adapters:
+                    self._attach(adapter_path)
+                return True
+            except Exception as e:
+                print(f"--- [Draft Model] Failed to load draft model: {e} ---")
+                traceback.print_exc()
+                return False
+
+    # --- Usage ---
+    @contextmanager
+    def use(self, adapter_path: str, device: Any) -> Iterator[Any]:
+        """Yields the draft model on `device` with the adapter for `adapter_path` active."""
+        with self._lock:
+            if not self.load(adapter_path):
+                raise RuntimeError(f"Draft model '{self.model_id}' could not be loaded.")
+            if self._model.device != torch.device(device):
+                self._model.to(device)
+            if adapter_path:
+                self._model.set_adapter(self._adapters[adapter_path])
+                yield self._model
+            elif isinstance(self._model, PeftModel):
+                with self._model.disable_adapter():
+                    yield self._model
+            else:
+                yield self._model
+
+
+# --- Process-wide access ---
+_pool: Optional[DraftModelPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_draft_model_pool() -> DraftModelPool:
+    """Shared draft model pool for DRAFT_MODEL_ID (default Salesforce/codet5p-220m)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DraftModelPool(os.getenv("DRAFT_MODEL_ID") or DEFAULT_DRAFT_MODEL_ID)
+    return _pool
@@ -0,0 +1,171 @@
+# Backend/Helper/email_prefilter.py
+import os
+import re
+import threading
+from email.utils import parseaddr
+from typing import Dict, List, Optional, Tuple
+
+# --- Library Imports with Fallbacks ---
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+DEFAULT_DENY_DOMAINS = (
+    "uber.com", "medium.com", "linkedin.com", "facebookmail.com", "twitter.com", "x.com",
+    "quora.com", "mailchimp.com", "sendgrid.net", "amazon.com", "swiggy.in", "zomato.com",
+)
+
+# Vocabulary of the requests the WRITE agent acts on: (label, pattern, weight)
+RELEVANT_TERMS: List[Tuple[str, "re.Pattern", float]] = [
+    # Subject codes are upper case (CS 101, DLCS 102); a code alone never clears the threshold
+    ("course code", re.compile(r"\b[A-Z]{2,5}\s?\d{3}[A-Z]?\b"), 1.5),
+    ("course terms", re.compile(r"\b(offerings?|courses?|sections?|class(es)?|lectures?|labs?|recitations?|seminars?|tutorials?)\b", re.I), 1.5),
+    ("preference terms", re.compile(r"\b(preference|prefer(s|red)?|prohibited|required|cannot teach|can't teach)\b", re.I), 1.5),
+    ("scheduling terms", re.compile(r"\b(room|building|capacity|limit|instructor|professor|prof|timetable|schedule|semester|term)\b", re.I), 1.0),
+    ("equipment", re.compile(r"\b(projectors?|whiteboards?|blackboards?|microphones?|computers?|equipment|smart ?boards?|document cameras?)\b", re.I), 1.0),
+    ("time of day", re.compile(r"\b(mornings?|afternoons?|evenings?|weekdays?|weekends?|(mon|tues|wednes|thurs|fri|satur|sun)days?)\b", re.I), 1.0),
+    ("request phrasing", re.compile(r"\b(needs?|would like|requests?|requested|please)\b", re.I), 0.5),
+    ("meeting time", re.compile(r"\b(MWF|TTh|MW|M|T|W|Th|F)\b\s*\d{1,2}:?\d{2}", re.I), 2.0),
+    ("change verb", re.compile(r"\b(add|update|change|modify|move|cancel)\b", re.I), 0.5),
+]
+MARKETING_TERMS: List[Tuple[str, "re.Pattern", float]] = [
+    ("unsubscribe", re.compile(r"\bunsubscribe\b", re.I), -2.0),
+    ("promotion", re.compile(r"\b(sale|discount|% off|\d+%? off|offer ends|promo(tion)?|coupon|deal)\b", re.I), -2.0),
+    ("notification", re.compile(r"\b(newsletter|digest|webinar|trending|recommended for you|your (ride|trip|order|receipt))\b", re.I), -1.5),
+    ("social", re.compile(r"\b(connection request|endorsed|followers?|views? on your profile)\b", re.I), -1.5),
+]
+
+# Seed texts for the optional local classifier
+SEED_RELEVANT = [
+    "please add a new course offering cs 101 in eng 205 on mwf 10:00",
+    "request to add a lab section for biol 101 with capacity 30",
+    "instructor doe needs a projector in the classroom",
+    "prof smith cannot teach on mondays please add a time preference",
+    "update the room of math 201 to science hall 110",
+    "change the title of dlcs 101 and move it to tth 13:30",
+]
+SEED_IRRELEVANT = [
+    "your uber trip receipt thanks for riding",
+    "top stories for you on medium this week",
+    "you have a new connection request on linkedin",
+    "big sale 50% off everything offer ends tonight",
+    "join our webinar and subscribe to the newsletter",
+    "your order has shipped track your package",
+]
+
+
+def sender_domain(sender: Optional[str]) -> str:
+    address = parseaddr(sender or "")[1].lower()
+    return address.rsplit("@", 1)[-1] if "@" in address else ""
+
+
+def _domain_matches(domain: str, domains) -> bool:
+    return any(domain == d or domain.endswith("." + d) for d in domains)
+
+
+class EmailPreFilter:
+    """
+    Local relevance gate for Read_Email, applied before any LLM sees a message.
+
+    - sender on the allow list: always kept; on the deny list: always dropped,
+    - List-Unsubscribe / bulk Precedence headers count against the message,
+    - weighted course/offering/preference vocabulary counts for it,
+    - a small TF-IDF + logistic regression model (when scikit-learn is
+      installed) nudges the score either way.
+
+    A message is dropped only on negative evidence: a denied sender, or a
+    List-Unsubscribe / bulk header or marketing wording together with a score
+    below `threshold`. A low score alone lets the message through, since real
+    requests are often short ("Smith would like mornings only.").
+    """
+
+    CLASSIFIER_WEIGHT = 2.0
+    ALLOW_SCORE = 100.0
+    DENY_SCORE = -100.0
+
+    def __init__(self, allow_domains=(), deny_domains=DEFAULT_DENY_DOMAINS, threshold: float = 2.0):
+        self.allow_domains = tuple(d.lower() for d in allow_domains if d)
+        self.deny_domains = tuple(d.lower() for d in deny_domains if d)
+        self.threshold = threshold
+        self._classifier = self._train_classifier()
+
+    def _train_classifier(self):
+        if not SKLEARN_AVAILABLE:
+            return None
+        classifier = make_pipeline(
+            TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True),
+            LogisticRegression(C=5.0, max_iter=1000),
+        )
+        classifier.fit(SEED_RELEVANT + SEED_IRRELEVANT, [1] * len(SEED_RELEVANT) + [0] * len(SEED_IRRELEVANT))
+        return classifier
+
+    def _evaluate(self, headers: Dict[str, Optional[str]], body: str) -> Tuple[float, List[str], bool]:
+        """Returns (score, reasons, whether any marketing / bulk evidence was found)."""
+        domain = sender_domain(headers.get("From"))
+        if domain and _domain_matches(domain, self.allow_domains):
+            return self.ALLOW_SCORE, [f"allowed domain {domain}"], False
+        if domain and _domain_matches(domain, self.deny_domains):
+            return self.DENY_SCORE, [f"denied domain {domain}"], True
+
+        score, reasons, negative = 0.0, [], False
+        if headers.get("List-Unsubscribe"):
+            score -= 3.0
+            reasons.append("List-Unsubscribe")
+            negative = True
+        if (headers.get("Precedence") or "").lower() in ("bulk", "list", "junk"):
+            score -= 2.0
+            reasons.append("bulk precedence")
+            negative = True
+
+        text = f"{headers.get('Subject') or ''}\n{body[:4000]}"
+        for label, pattern, weight in RELEVANT_TERMS + MARKETING_TERMS:
+            if pattern.search(text):
+                score += weight
+                reasons.append(f"{label} {weight:+g}")
+                negative = negative or weight < 0
+
+        if self._classifier is not None:
+            probability = float(self._classifier.predict_proba([text.lower()])[0][1])
+            score += self.CLASSIFIER_WEIGHT * (probability - 0.5) * 2
+            reasons.append(f"classifier:{probability:.2f}")
+        return score, reasons, negative
+
+    def score(self, headers: Dict[str, Optional[str]], body: str) -> Tuple[float, List[str]]:
+        """Returns (score, reasons) for one message."""
+        score, reasons, _ = self._evaluate(headers, body)
+        return score, reasons
+
+    def keep(self, headers: Dict[str, Optional[str]], body: str) -> Tuple[bool, float, List[str]]:
+        score, reasons, negative = self._evaluate(headers, body)
+        return score >= self.threshold or not negative, score, reasons
+
+
+# --- Process-wide access ---
+_prefilter: Optional[EmailPreFilter] = None
+_prefilter_lock = threading.Lock()
+
+
+def _domain_list(value: Optional[str]) -> List[str]:
+    return [d.strip().lower() for d in (value or "").split(",") if d.strip()]
+
+
+def get_email_prefilter() -> EmailPreFilter:
+    """
+    Shared pre-filter configured by EMAIL_ALLOW_DOMAINS / EMAIL_DENY_DOMAINS
+    (comma-separated, the deny list extends the defaults) and
+    EMAIL_PREFILTER_THRESHOLD.
+    """
+    global _prefilter
+    if _prefilter is None:
+        with _prefilter_lock:
+            if _prefilter is None:
+                _prefilter = EmailPreFilter(
+                    allow_domains=_domain_list(os.getenv("EMAIL_ALLOW_DOMAINS")),
+                    deny_domains=list(DEFAULT_DENY_DOMAINS) + _domain_list(os.getenv("EMAIL_DENY_DOMAINS")),
+                    threshold=float(os.getenv("EMAIL_PREFILTER_THRESHOLD", 2.0)),
+                )
+    return _prefilter
@@ -0,0 +1,90 @@
+# Backend/Helper/embeddings.py
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_huggingface import HuggingFaceEmbeddings
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+DEFAULT_EMBED_MODEL = "all-MiniLM-L6-v2"
+
+# Quantized weights shipped in the sentence-transformers repos
+DEFAULT_ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"
+
+
+def _embedding_config() -> Dict[str, Any]:
+    return {
+        "model_name": os.getenv("RAG_EMBED_MODEL", DEFAULT_EMBED_MODEL),
+        "batch_size": int(os.getenv("RAG_EMBED_BATCH_SIZE", 64)),
+        "threads": int(os.getenv("RAG_EMBED_THREADS", 0)),
+        # torch | onnx | onnx-int8
+        "backend": os.getenv("RAG_EMBED_BACKEND", "torch").lower(),
+        "cache_dir": os.getenv("RAG_EMBED_CACHE_DIR", os.path.join(PROJECT_ROOT, "data/embedding_cache")),
+        "cache_enabled": str(os.getenv("RAG_EMBED_CACHE", "TRUE")).upper() == "TRUE",
+    }
+
+
+def embedding_signature() -> str:
+    """Identifies the vector space (model + backend). Indexes built under another signature must be rebuilt."""
+    config = _embedding_config()
+    return f"{config['model_name']}:{config['backend']}"
+
+
+def _build_model_kwargs(backend: str) -> Dict[str, Any]:
+    if backend == "onnx":
+        return {"backend": "onnx"}
+    if backend == "onnx-int8":
+        return {
+            "backend": "onnx",
+            "model_kwargs": {"file_name": os.getenv("RAG_EMBED_ONNX_FILE", DEFAULT_ONNX_INT8_FILE)},
+        }
+    return {}
+
+
+def build_embeddings() -> Any:
+    """
+    Creates the sentence embedder used by the RAG tools.
+
+    - RAG_EMBED_BATCH_SIZE / RAG_EMBED_THREADS tune encoding on CPU-only boxes.
+    - RAG_EMBED_BACKEND=onnx|onnx-int8 runs the model through ONNX Runtime.
+    - Document embeddings are cached on disk keyed by model signature + text
+      hash, so identical sentences are never re-encoded across refreshes.
+    """
+    config = _embedding_config()
+    if config["threads"] > 0:
+        import torch
+        torch.set_num_threads(config["threads"])
+
+    print(f"--- [Embeddings]: Loading {config['model_name']} (backend={config['backend']}, batch={config['batch_size']}) ---")
+    underlying = HuggingFaceEmbeddings(
+        model_name=config["model_name"],
+        model_kwargs=_build_model_kwargs(config["backend"]),
+        encode_kwargs={"batch_size": config["batch_size"]},
+    )
+    if not config["cache_enabled"]:
+        return underlying
+
+    os.makedirs(config["cache_dir"], exist_ok=True)
+    return CacheBackedEmbeddings.from_bytes_store(
+        underlying,
+        LocalFileStore(config["cache_dir"]),
+        namespace=embedding_signature(),
+    )
+
+
+# --- Process-wide access ---
+_embeddings: Optional[Any] = None
+_embeddings_lock = threading.Lock()
+
+
+def get_embeddings() -> Any:
+    """Returns the shared embedder, loading the model on first use."""
+    global _embeddings
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                _embeddings = build_embeddings()
+    return _embeddings
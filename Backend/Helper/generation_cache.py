@@ -0,0 +1,200 @@
+# Backend/Helper/generation_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    cache_key         TEXT PRIMARY KEY,
+    adapter_path      TEXT NOT NULL,
+    adapter_checksum  TEXT NOT NULL,
+    output            TEXT NOT NULL,
+    last_used         REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS generations_adapter ON generations (adapter_path);
+"""
+
+# Sampling makes outputs non-deterministic; those generations are never cached
+NON_DETERMINISTIC_KWARGS = ("do_sample",)
+
+
+# --- Adapter checksums ---
+_checksums: Dict[str, Tuple[Tuple, str]] = {}
+_checksums_lock = threading.Lock()
+
+
+def _stat_signature(path: str) -> Tuple:
+    entries = []
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            st = os.stat(full)
+            entries.append((os.path.relpath(full, path), st.st_size, st.st_mtime_ns))
+    return tuple(sorted(entries))
+
+
+def adapter_checksum(path: str) -> str:
+    """
+    sha256 over every file in the adapter directory. The content hash is only
+    recomputed when a file's name, size or mtime changes, so the common case
+    is a directory walk. Paths that are not local directories (hub ids) are
+    keyed by name only.
+    """
+    if not os.path.isdir(path):
+        return f"path:{path}"
+    signature = _stat_signature(path)
+    with _checksums_lock:
+        known = _checksums.get(path)
+        if known and known[0] == signature:
+            return known[1]
+
+    digest = hashlib.sha256()
+    for rel_path, _, _ in signature:
+        digest.update(rel_path.encode("utf-8"))
+        with open(os.path.join(path, rel_path), "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    checksum = digest.hexdigest()
+    with _checksums_lock:
+        _checksums[path] = (signature, checksum)
+    return checksum
+
+
+class GenerationCache:
+    """
+    Cache of decoded generations keyed by (base model, adapter checksum,
+    generation config, prompt).
+
+    Hits are served from an LRU of `max_entries`; with `db_path` entries are
+    also kept in SQLite (same bound) so they survive restarts. When an
+    adapter directory's checksum changes (retrained or replaced), its old
+    entries are dropped from both tiers the next time it is used.
+    """
+
+    def __init__(self, max_entries: int = 2048, db_path: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._entry_adapters: Dict[str, str] = {}
+        self._current: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def cacheable(gen_kwargs: Dict[str, Any]) -> bool:
+        return not any(gen_kwargs.get(k) for k in NON_DETERMINISTIC_KWARGS)
+
+    def _checksum(self, adapter_path: str) -> str:
+        """Current checksum of `adapter_path`, invalidating its entries if it changed (caller holds the lock)."""
+        checksum = adapter_checksum(adapter_path)
+        previous = self._current.get(adapter_path)
+        if previous != checksum:
+            self._current[adapter_path] = checksum
+            stale = [k for k, p in self._entry_adapters.items() if p == adapter_path]
+            for key in stale:
+                self._entries.pop(key, None)
+                del self._entry_adapters[key]
+            dropped = len(stale)
+            if self._conn is not None:
+                with self._conn:
+                    dropped += self._conn.execute(
+                        "DELETE FROM generations WHERE adapter_path = ? AND adapter_checksum != ?",
+                        (adapter_path, checksum),
+                    ).rowcount
+            if dropped:
+                print(f"--- [Generation Cache]: Adapter {adapter_path} changed, dropped {dropped} cached generation(s) ---")
+        return checksum
+
+    @staticmethod
+    def _key(base_model_id: str, checksum: str, prompt: str, gen_kwargs: Dict[str, Any]) -> str:
+        payload = json.dumps([base_model_id, checksum, sorted(gen_kwargs.items()), prompt], default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, adapter_path: str, output: str) -> None:
+        self._entries[key] = output
+        self._entries.move_to_end(key)
+        self._entry_adapters[key] = adapter_path
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._entry_adapters.pop(evicted, None)
+
+    def get(self, base_model_id: str, adapter_path: str, prompt: str, gen_kwargs: Dict[str, Any]) -> Optional[str]:
+        with self._lock:
+            key = self._key(base_model_id, self._checksum(adapter_path), prompt, gen_kwargs)
+            output = self._entries.get(key)
+            if output is not None:
+                self._entries.move_to_end(key)
+                return output
+            if self._conn is None:
+                return None
+            row = self._conn.execute("SELECT output FROM generations WHERE cache_key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE generations SET last_used = ? WHERE cache_key = ?", (time.time(), key))
+            self._remember(key, adapter_path, row[0])
+            return row[0]
+
+    def put(self, base_model_id: str, adapter_path: str, prompt: str, gen_kwargs: Dict[str, Any], output: str,
+            generated_with: Optional[str] = None) -> None:
+        """
+        Stores `output`. `generated_with` is the checksum of the adapter weights
+        that produced it; if the directory has changed since, nothing is stored.
+        """
+        with self._lock:
+            checksum = self._checksum(adapter_path)
+            if generated_with is not None and generated_with != checksum:
+                return
+            key = self._key(base_model_id, checksum, prompt, gen_kwargs)
+            self._remember(key, adapter_path, output)
+            if self._conn is None:
+                return
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO generations (cache_key, adapter_path, adapter_checksum, output, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, adapter_path, checksum, output, time.time()),
+                )
+                self._conn.execute(
+                    """
+                    DELETE FROM generations WHERE cache_key IN (
+                        SELECT cache_key FROM generations ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+
+
+# --- Process-wide access ---
+_cache: Optional[GenerationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_generation_cache() -> Optional[GenerationCache]:
+    """
+    Shared cache, or None when GEN_CACHE=FALSE. Bounded by GEN_CACHE_MAX_ENTRIES
+    (default 2048) and persisted to GEN_CACHE_PATH (default
+    data/generation_cache.sqlite3) unless GEN_CACHE_SQLITE=FALSE.
+    """
+    global _cache
+    if str(os.getenv("GEN_CACHE", "TRUE")).upper() != "TRUE":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                persist = str(os.getenv("GEN_CACHE_SQLITE", "TRUE")).upper() == "TRUE"
+                _cache = GenerationCache(
+                    max_entries=int(os.getenv("GEN_CACHE_MAX_ENTRIES", 2048)),
+                    db_path=(os.getenv("GEN_CACHE_PATH") or os.path.join(PROJECT_ROOT, "data/generation_cache.sqlite3")) if persist else None,
+                )
+    return _cache
@@ -0,0 +1,269 @@
+# Backend/Helper/imap_fetch.py
+import base64
+import email
+import quopri
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+HEADER_FIELDS = ("FROM", "TO", "DATE", "SUBJECT", "MESSAGE-ID", "LIST-UNSUBSCRIBE", "PRECEDENCE")
+
+_FETCH_START = re.compile(rb"^\d+ \(")
+_UID = re.compile(rb"\bUID (\d+)")
+_HEADER_LITERAL = re.compile(rb"BODY\[HEADER[^\]]*\]\s*\{\d+\}$", re.I)
+_TOKEN = re.compile(r'\(|\)|"(?:[^"\\]|\\.)*"|\{\d+\}|[^\s()"]+')
+
+
+# --- BODYSTRUCTURE parsing ---
+def _parse_sexp(text: str, literals: Optional[Iterator[bytes]] = None) -> Any:
+    """
+    Parses the first parenthesized IMAP list in `text` into nested Python lists
+    (NIL -> None). `{n}` literal markers (servers use them for e.g. non-ASCII
+    filenames) take their value from `literals` in order.
+    """
+    literals = literals or iter(())
+    stack: List[List] = []
+    for token in _TOKEN.findall(text):
+        if token == "(":
+            stack.append([])
+        elif token == ")":
+            done = stack.pop()
+            if not stack:
+                return done
+            stack[-1].append(done)
+        elif stack:
+            if token.startswith('"'):
+                value = re.sub(r"\\(.)", r"\1", token[1:-1])
+            elif token.startswith("{"):
+                value = next(literals).decode("utf-8", errors="replace")
+            elif token.upper() == "NIL":
+                value = None
+            else:
+                value = token
+            stack[-1].append(value)
+    return None
+
+
+def _params(raw: Any) -> Dict[str, str]:
+    if not isinstance(raw, list):
+        return {}
+    return {str(raw[i]).lower(): raw[i + 1] for i in range(0, len(raw) - 1, 2)}
+
+
+def _disposition(part: List, index: int) -> Tuple[str, Dict[str, str]]:
+    raw = part[index] if len(part) > index else None
+    if isinstance(raw, list) and raw:
+        return str(raw[0]).lower(), _params(raw[1] if len(raw) > 1 else None)
+    return "", {}
+
+
+def iter_body_parts(structure: List, prefix: str = "") -> List[Dict[str, Any]]:
+    """
+    Flattens a parsed BODYSTRUCTURE into leaf parts with their IMAP section
+    numbers, content type, transfer encoding, charset, size and filename.
+    Attached messages (message/rfc822) are kept as single leaves.
+    """
+    if structure and isinstance(structure[0], list):
+        # Children come first, then the subtype and the (list-valued) extension data
+        parts = []
+        for i, child in enumerate(structure):
+            if not isinstance(child, list):
+                break
+            parts.extend(iter_body_parts(child, f"{prefix}{i + 1}."))
+        return parts
+
+    maintype, subtype = str(structure[0]).lower(), str(structure[1]).lower()
+    params = _params(structure[2])
+    if maintype == "text":
+        disposition_index = 9
+    elif maintype == "message" and subtype == "rfc822":
+        disposition_index = 11
+    else:
+        disposition_index = 8
+    disposition, disposition_params = _disposition(structure, disposition_index)
+    return [{
+        "section": (prefix or "1.").rstrip("."),
+        "type": f"{maintype}/{subtype}",
+        "encoding": str(structure[5] or "7bit").lower(),
+        "charset": params.get("charset") or "utf-8",
+        "size": int(structure[6]) if str(structure[6]).isdigit() else 0,
+        "filename": disposition_params.get("filename") or params.get("name"),
+        "attachment": disposition == "attachment",
+    }]
+
+
+def parse_bodystructure(meta: bytes, literals: List[Tuple[int, bytes]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Leaf parts of the BODYSTRUCTURE in one FETCH response's metadata, or None
+    if there is none or it cannot be parsed. `literals` are the response's
+    (offset in meta, bytes) literals.
+    """
+    structure_at = meta.upper().find(b"BODYSTRUCTURE")
+    if structure_at < 0:
+        return None
+    try:
+        structure = _parse_sexp(
+            meta[structure_at:].decode("utf-8", errors="replace"),
+            iter([literal for offset, literal in literals if offset > structure_at]),
+        )
+        return iter_body_parts(structure) if structure else None
+    except (IndexError, StopIteration, TypeError, ValueError):
+        return None
+
+
+def _pick_body_part(parts: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    return next((p for p in parts if p["type"] == "text/plain" and not p["attachment"]), None)
+
+
+def decode_part(payload: bytes, part: Dict[str, Any]) -> str:
+    if part["encoding"] == "base64":
+        payload = base64.b64decode(payload)
+    elif part["encoding"] == "quoted-printable":
+        payload = quopri.decodestring(payload)
+    try:
+        return payload.decode(part["charset"], errors="replace")
+    except LookupError:
+        return payload.decode("utf-8", errors="replace")
+
+
+# --- Fetch round-trips ---
+def _split_fetch_response(data: List) -> List[Tuple[bytes, List[Tuple[int, bytes]]]]:
+    """
+    Groups an imaplib FETCH response into (metadata, literals) per message.
+    Each literal is kept with the offset of its `{n}` marker's end in the
+    metadata, so it can be matched to the item it belongs to.
+    """
+    messages: List[Tuple[bytearray, List[Tuple[int, bytes]]]] = []
+    for item in data:
+        if isinstance(item, tuple):
+            head, literal = item
+            if _FETCH_START.match(head) or not messages:
+                messages.append((bytearray(), []))
+            messages[-1][0].extend(head)
+            messages[-1][1].append((len(messages[-1][0]), literal))
+        elif isinstance(item, bytes) and messages:
+            messages[-1][0].extend(item)
+    return [(bytes(meta), literals) for meta, literals in messages]
+
+
+def _header_literal(meta: bytes, literals: List[Tuple[int, bytes]]) -> bytes:
+    return next((literal for offset, literal in literals if _HEADER_LITERAL.search(meta[:offset])), b"")
+
+
+def list_uids(conn, page: int = 0, limit: int = 5) -> List[str]:
+    """UIDs of one page of the selected folder, newest first."""
+    status, data = conn.uid("SEARCH", None, "ALL")
+    if status != "OK":
+        raise RuntimeError(f"UID SEARCH failed: {data}")
+    uids = sorted((int(u) for u in data[0].split()), reverse=True)
+    return [str(u) for u in uids[page * limit:(page + 1) * limit]]
+
+
+def uids_above(conn, last_uid: Optional[int]) -> List[int]:
+    """UIDs greater than `last_uid` (all UIDs for None), oldest first."""
+    criteria = f"UID {last_uid + 1}:*" if last_uid is not None else "ALL"
+    status, data = conn.uid("SEARCH", None, criteria)
+    if status != "OK":
+        raise RuntimeError(f"UID SEARCH failed: {data}")
+    uids = sorted(int(u) for u in data[0].split())
+    # "n:*" always matches the highest UID, even when it is below n
+    return [u for u in uids if last_uid is None or u > last_uid]
+
+
+def folder_uidvalidity(conn) -> Optional[str]:
+    """UIDVALIDITY reported by the last SELECT, if the server sent one."""
+    _, data = conn.response("UIDVALIDITY")
+    return data[0].decode() if data and data[0] else None
+
+
+def fetch_envelopes(conn, uids: List[str]) -> List[Dict[str, Any]]:
+    """
+    One round-trip for the whole UID set: headers of interest plus the
+    BODYSTRUCTURE, so the body part to download is known up front. Messages
+    whose BODYSTRUCTURE cannot be parsed get `parts=None` and are fetched in
+    full by fetch_messages.
+    """
+    if not uids:
+        return []
+    query = f"(UID BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ({' '.join(HEADER_FIELDS)})])"
+    status, data = conn.uid("FETCH", ",".join(uids), query)
+    if status != "OK":
+        raise RuntimeError(f"UID FETCH failed: {data}")
+
+    envelopes = {}
+    for meta, literals in _split_fetch_response(data):
+        uid_match = _UID.search(meta)
+        if not uid_match:
+            continue
+        parts = parse_bodystructure(meta, literals)
+        envelopes[uid_match.group(1).decode()] = {
+            "uid": uid_match.group(1).decode(),
+            "headers": email.message_from_bytes(_header_literal(meta, literals)),
+            "parts": parts,
+            "body_part": _pick_body_part(parts or []),
+            "attachments": [p for p in parts or [] if p["attachment"] or (p["filename"] and not p["type"].startswith("text/"))],
+        }
+    return [envelopes[uid] for uid in uids if uid in envelopes]
+
+
+def fetch_sections(conn, requests: Dict[str, str]) -> Dict[str, bytes]:
+    """Downloads BODY.PEEK[section] for {uid: section}, one round-trip per distinct section number."""
+    by_section: Dict[str, List[str]] = {}
+    for uid, section in requests.items():
+        by_section.setdefault(section, []).append(uid)
+
+    payloads: Dict[str, bytes] = {}
+    for section, uids in by_section.items():
+        status, data = conn.uid("FETCH", ",".join(uids), f"(UID BODY.PEEK[{section}])")
+        if status != "OK":
+            raise RuntimeError(f"UID FETCH of section {section} failed: {data}")
+        for meta, literals in _split_fetch_response(data):
+            uid_match = _UID.search(meta)
+            if uid_match and literals:
+                payloads[uid_match.group(1).decode()] = literals[0][1]
+    return payloads
+
+
+def _from_full_message(envelope: Dict[str, Any], raw: bytes, include_attachments: bool) -> None:
+    """Fills body and attachments from the whole RFC822 message (used when BODYSTRUCTURE could not be parsed)."""
+    msg = email.message_from_bytes(raw)
+    body, attachments = "", []
+    for index, part in enumerate(msg.walk() if msg.is_multipart() else [msg]):
+        if part.is_multipart():
+            continue
+        disposition = str(part.get("Content-Disposition") or "")
+        if "attachment" in disposition:
+            attachment = {"section": str(index), "type": part.get_content_type(), "filename": part.get_filename()}
+            if include_attachments:
+                attachment["payload"] = part.get_payload(decode=True) or b""
+            attachments.append(attachment)
+        elif part.get_content_type() == "text/plain" and not body:
+            payload = part.get_payload(decode=True) or b""
+            body = payload.decode(part.get_content_charset() or "utf-8", errors="replace")
+    envelope["body"] = body
+    envelope["body_type"] = "text/plain" if body else None
+    envelope["attachments"] = attachments
+
+
+def fetch_messages(conn, uids: List[str], include_attachments: bool = False) -> List[Dict[str, Any]]:
+    """
+    Headers + decoded text body for `uids` in two pipelined round-trips.
+    Attachment payloads are only downloaded when `include_attachments` is set;
+    otherwise just their metadata is returned.
+    """
+    envelopes = fetch_envelopes(conn, uids)
+    bodies = fetch_sections(conn, {e["uid"]: e["body_part"]["section"] for e in envelopes if e["body_part"]})
+    unparsed = {e["uid"]: "" for e in envelopes if e["parts"] is None}
+    full_messages = fetch_sections(conn, unparsed) if unparsed else {}
+    for envelope in envelopes:
+        if envelope["parts"] is None:
+            print(f"--- [IMAP Fetch]: Unreadable BODYSTRUCTURE for UID {envelope['uid']}, fetched the full message ---")
+            _from_full_message(envelope, full_messages.get(envelope["uid"], b""), include_attachments)
+            continue
+        part = envelope["body_part"]
+        envelope["body"] = decode_part(bodies[envelope["uid"]], part) if part and envelope["uid"] in bodies else ""
+        envelope["body_type"] = part["type"] if part else None
+        if include_attachments:
+            for attachment in envelope["attachments"]:
+                payload = fetch_sections(conn, {envelope["uid"]: attachment["section"]}).get(envelope["uid"], b"")
+                attachment["payload"] = base64.b64decode(payload) if attachment["encoding"] == "base64" else payload
+    return envelopes
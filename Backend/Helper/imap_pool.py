@@ -0,0 +1,307 @@
+# Backend/Helper/imap_pool.py
+import imaplib
+import os
+import queue
+import re
+import select
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from Backend.Helper.imap_email import ImapEmail
+from Backend.Helper.imap_fetch import fetch_messages, folder_uidvalidity, uids_above
+
+PoolKey = Tuple[str, str, str]
+
+_EXISTS = re.compile(rb"^\* \d+ EXISTS")
+
+
+class ImapConnectionPool:
+    """
+    Reuses logged-in IMAP connections keyed by (server, user, folder).
+
+    A connection idle for longer than `health_check_after` is NOOP-checked
+    before it is handed out, and replaced if the check fails. A background
+    thread NOOPs idle connections every `keepalive_seconds` so servers don't
+    drop them, and closes those unused for `max_idle_seconds`.
+    """
+
+    def __init__(self, max_per_key: int = 2, keepalive_seconds: float = 240,
+                 max_idle_seconds: float = 1800, health_check_after: float = 30,
+                 connect: Optional[Callable[[str, str, str, str], Any]] = None):
+        self.max_per_key = max(1, max_per_key)
+        self.keepalive_seconds = keepalive_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_after = health_check_after
+        # connect(folder, user, password, server), same argument order as ImapEmail.imap_open
+        self._connect = connect or ImapEmail().imap_open
+        self._idle: Dict[PoolKey, List[Tuple[Any, float]]] = {}
+        self._lock = threading.Lock()
+        self._keepalive_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- Checkout / checkin ---
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        try:
+            return conn.noop()[0] == "OK"
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(conn) -> None:
+        try:
+            conn.logout()
+        except Exception:
+            pass
+
+    def _checkout(self, key: PoolKey, password: str):
+        while True:
+            with self._lock:
+                idle = self._idle.get(key) or []
+                conn, last_used = idle.pop() if idle else (None, 0.0)
+            if conn is None:
+                break
+            if time.monotonic() - last_used < self.health_check_after or self._is_healthy(conn):
+                return conn
+            print(f"--- [IMAP Pool]: Dropping stale connection to {key[0]} ({key[2]}) ---")
+            self._close(conn)
+
+        server, user, folder = key
+        print(f"--- [IMAP Pool]: Opening connection to {server} ({folder}) ---")
+        conn = self._connect(folder, user, password, server)
+        self._ensure_keepalive()
+        return conn
+
+    def _checkin(self, key: PoolKey, conn, broken: bool) -> None:
+        if broken or getattr(conn, "state", "SELECTED") == "LOGOUT":
+            self._close(conn)
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_key:
+                idle.append((conn, time.monotonic()))
+                return
+        self._close(conn)
+
+    @contextmanager
+    def connection(self, server: str, user: str, password: str, folder: str) -> Iterator[Any]:
+        """Yields a logged-in connection with `folder` selected, returning it to the pool afterwards."""
+        key = (server, user, folder)
+        conn = self._checkout(key, password)
+        broken = False
+        try:
+            yield conn
+        except (imaplib.IMAP4.abort, OSError):
+            broken = True
+            raise
+        finally:
+            self._checkin(key, conn, broken)
+
+    # --- Keepalive ---
+    def _ensure_keepalive(self) -> None:
+        if self.keepalive_seconds <= 0 or (self._keepalive_thread and self._keepalive_thread.is_alive()):
+            return
+        self._keepalive_thread = threading.Thread(target=self._keepalive_loop, name="imap-pool-keepalive", daemon=True)
+        self._keepalive_thread.start()
+
+    def _keepalive_loop(self) -> None:
+        while not self._stop.wait(self.keepalive_seconds):
+            with self._lock:
+                snapshot = {key: list(idle) for key, idle in self._idle.items()}
+                self._idle.clear()
+            now = time.monotonic()
+            keep: Dict[PoolKey, List[Tuple[Any, float]]] = {}
+            for key, idle in snapshot.items():
+                for conn, last_used in idle:
+                    if now - last_used > self.max_idle_seconds or not self._is_healthy(conn):
+                        self._close(conn)
+                    else:
+                        keep.setdefault(key, []).append((conn, last_used))
+            with self._lock:
+                for key, idle in keep.items():
+                    self._idle.setdefault(key, []).extend(idle)
+
+    def close_all(self) -> None:
+        self._stop.set()
+        with self._lock:
+            snapshot = [conn for idle in self._idle.values() for conn, _ in idle]
+            self._idle.clear()
+        for conn in snapshot:
+            self._close(conn)
+
+
+class ImapInboxWatcher:
+    """
+    Background watcher that holds its own connection in IMAP IDLE and pushes
+    only messages with a UID above the last one seen into `messages`
+    (as returned by imap_fetch.fetch_messages). Servers without IDLE are
+    polled with NOOP every `poll_seconds` instead.
+    """
+
+    def __init__(self, server: str, user: str, password: str, folder: str = "INBOX",
+                 idle_timeout: float = 600, poll_seconds: float = 60, last_uid: Optional[int] = None,
+                 connect: Optional[Callable[[str, str, str, str], Any]] = None):
+        self.server = server
+        self.user = user
+        self.password = password
+        self.folder = folder
+        # Servers end IDLE after ~30 minutes; re-issue it well before that
+        self.idle_timeout = idle_timeout
+        self.poll_seconds = poll_seconds
+        self.last_uid = last_uid
+        self.uidvalidity: Optional[str] = None
+        self.messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._connect = connect or ImapEmail().imap_open
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ImapInboxWatcher":
+        if not (self._thread and self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"imap-watcher-{self.folder}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def drain(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Pops up to `limit` queued new messages (all of them by default)."""
+        drained = []
+        while limit is None or len(drained) < limit:
+            try:
+                drained.append(self.messages.get_nowait())
+            except queue.Empty:
+                break
+        return drained
+
+    def requeue(self, items: List[Dict[str, Any]]) -> None:
+        """Puts drained-but-unused messages back at the front of the queue, in order."""
+        with self.messages.mutex:
+            self.messages.queue.extendleft(reversed(items))
+
+    # --- Delta tracking ---
+    def _collect_new(self, conn) -> None:
+        uids = uids_above(conn, self.last_uid)
+        if not uids:
+            return
+        for item in fetch_messages(conn, [str(u) for u in uids]):
+            self.messages.put(item)
+        self.last_uid = uids[-1]
+        print(f"--- [IMAP Watcher]: Queued {len(uids)} new message(s) from {self.folder} ---")
+
+    # --- IDLE (imaplib has no IDLE command, so it is spoken directly) ---
+    def _idle_once(self, conn) -> bool:
+        """Waits in IDLE until the server reports a mailbox update or the timeout passes. True on EXISTS."""
+        tag = conn._new_tag()
+        conn.send(tag + b" IDLE\r\n")
+        if not conn.readline().startswith(b"+"):
+            raise imaplib.IMAP4.error("Server refused IDLE")
+
+        arrived = False
+        deadline = time.monotonic() + self.idle_timeout
+        sock = conn.socket()
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            # Short waits so stop() is honoured promptly
+            ready, _, _ = select.select([sock], [], [], 5)
+            if not ready and not getattr(sock, "pending", lambda: 0)():
+                continue
+            line = conn.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("Connection closed during IDLE")
+            if line.startswith(b"*"):
+                # Any mailbox update ends this IDLE; lines imaplib already buffered are
+                # invisible to select(), so don't wait for a second one
+                arrived = bool(_EXISTS.match(line))
+                break
+
+        conn.send(b"DONE\r\n")
+        while True:
+            line = conn.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("Connection closed while leaving IDLE")
+            if line.startswith(tag):
+                break
+        return arrived
+
+    def _run(self) -> None:
+        backoff = 1
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect(self.folder, self.user, self.password, self.server)
+                uidvalidity = folder_uidvalidity(conn)
+                if self.uidvalidity is not None and uidvalidity != self.uidvalidity:
+                    # UIDs were renumbered; start over (the message ledger filters repeats)
+                    self.last_uid = 0
+                self.uidvalidity = uidvalidity
+                if self.last_uid is None:
+                    existing = uids_above(conn, None)
+                    self.last_uid = existing[-1] if existing else 0
+                self._collect_new(conn)
+                supports_idle = "IDLE" in getattr(conn, "capabilities", ())
+                backoff = 1
+                while not self._stop.is_set():
+                    if supports_idle:
+                        self._idle_once(conn)
+                    else:
+                        self._stop.wait(self.poll_seconds)
+                        conn.noop()
+                    self._collect_new(conn)
+            except Exception as e:
+                print(f"--- [IMAP Watcher]: {e}. Reconnecting in {backoff}s ---")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 300)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.logout()
+                    except Exception:
+                        pass
+
+
+# --- Process-wide access ---
+_pool: Optional[ImapConnectionPool] = None
+_watchers: Dict[PoolKey, ImapInboxWatcher] = {}
+_pool_lock = threading.Lock()
+
+
+def get_imap_pool() -> ImapConnectionPool:
+    """Returns the shared connection pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ImapConnectionPool(
+                    max_per_key=int(os.getenv("EMAIL_IMAP_POOL_SIZE", 2)),
+                    keepalive_seconds=float(os.getenv("EMAIL_IMAP_KEEPALIVE_SECONDS", 240)),
+                )
+    return _pool
+
+
+def find_inbox_watcher(server: str, user: str, folder: str = "INBOX") -> Optional[ImapInboxWatcher]:
+    """Returns the watcher for (server, user, folder) if one is running."""
+    watcher = _watchers.get((server, user, folder))
+    return watcher if watcher and watcher.is_running else None
+
+
+def get_inbox_watcher(server: str, user: str, password: str, folder: str = "INBOX",
+                      last_uid: Optional[int] = None) -> ImapInboxWatcher:
+    """Returns the running watcher for (server, user, folder), starting it on first use."""
+    key = (server, user, folder)
+    with _pool_lock:
+        watcher = _watchers.get(key)
+        if watcher is None:
+            watcher = ImapInboxWatcher(
+                server, user, password, folder,
+                idle_timeout=float(os.getenv("EMAIL_IMAP_IDLE_TIMEOUT", 600)),
+                last_uid=last_uid,
+            )
+            _watchers[key] = watcher
+        return watcher.start()
@@ -0,0 +1,160 @@
+# Backend/Helper/message_ledger.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+# Returned to the agent by Read_Email, no tool has recorded what it did yet
+OUTCOME_PENDING = "returned"
+OUTCOME_IGNORED = "ignored"
+OUTCOME_FILTERED = "filtered"
+OUTCOME_BATCH_APPENDED = "batch-appended"
+OUTCOME_UPDATE_WRITTEN = "update-written"
+# Outcomes that do not stop a WRITE tool from acting on the email
+UNHANDLED_OUTCOMES = (OUTCOME_PENDING, OUTCOME_IGNORED, OUTCOME_FILTERED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_messages (
+    message_key  TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    folder       TEXT,
+    uid          INTEGER,
+    outcome      TEXT NOT NULL,
+    detail       TEXT,
+    updated_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS folder_state (
+    account      TEXT NOT NULL,
+    folder       TEXT NOT NULL,
+    uidvalidity  TEXT,
+    last_uid     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account, folder)
+);
+"""
+
+
+def message_key(message_id: Optional[str], folder: str, uid: str) -> str:
+    """Message-ID when the sender set one, else folder + UID."""
+    message_id = (message_id or "").strip()
+    return message_id if message_id else f"{folder}:{uid}"
+
+
+def content_hash(*parts: Optional[str]) -> str:
+    return hashlib.sha256("\x1f".join(p or "" for p in parts).encode("utf-8")).hexdigest()
+
+
+class MessageLedger:
+    """
+    Durable record of the emails the WRITE agent has already seen, keyed by
+    Message-ID (or folder:UID) plus a content hash, with the outcome
+    (returned / ignored / filtered / batch-appended / update-written), and the
+    per-folder UID high-water mark behind Read_Email's "new since last run" mode.
+    Emails still 'returned' are handed out again until a tool records an outcome.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    # --- Messages ---
+    def seen(self, keys_and_hashes: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+        """Returns {message_key: outcome} for the given messages already recorded with the same content."""
+        found = {}
+        with self._lock:
+            for key, digest in keys_and_hashes:
+                row = self._conn.execute(
+                    "SELECT outcome FROM processed_messages WHERE message_key = ? AND content_hash = ?",
+                    (key, digest),
+                ).fetchone()
+                if row:
+                    found[key] = row[0]
+        return found
+
+    def record(self, key: str, digest: Optional[str], outcome: str, folder: Optional[str] = None,
+               uid: Optional[str] = None, detail: Optional[str] = None) -> None:
+        """Inserts or updates a message; a later outcome overwrites an earlier one."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO processed_messages (message_key, content_hash, folder, uid, outcome, detail, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(message_key) DO UPDATE SET
+                    content_hash = COALESCE(NULLIF(excluded.content_hash, ''), processed_messages.content_hash),
+                    folder = COALESCE(excluded.folder, processed_messages.folder),
+                    uid = COALESCE(excluded.uid, processed_messages.uid),
+                    outcome = excluded.outcome,
+                    detail = excluded.detail,
+                    updated_at = excluded.updated_at
+                """,
+                (key, digest or "", folder, int(uid) if uid else None, outcome, detail, time.time()),
+            )
+
+    def outcome(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT outcome FROM processed_messages WHERE message_key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def pending(self, folder: str) -> List[Tuple[str, str]]:
+        """(message_key, uid) of the folder's emails still waiting for an outcome, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message_key, uid FROM processed_messages WHERE folder = ? AND outcome = ? AND uid IS NOT NULL "
+                "ORDER BY uid",
+                (folder, OUTCOME_PENDING),
+            ).fetchall()
+        return [(key, str(uid)) for key, uid in rows]
+
+    # --- Folder high-water marks ---
+    def last_uid(self, account: str, folder: str, uidvalidity: Optional[str] = None) -> int:
+        """Highest UID handed out for the folder; 0 if unknown or the folder's UIDVALIDITY changed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uidvalidity, last_uid FROM folder_state WHERE account = ? AND folder = ?",
+                (account, folder),
+            ).fetchone()
+        if not row:
+            return 0
+        if uidvalidity is not None and row[0] is not None and row[0] != uidvalidity:
+            return 0
+        return row[1]
+
+    def set_last_uid(self, account: str, folder: str, last_uid: int, uidvalidity: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO folder_state (account, folder, uidvalidity, last_uid) VALUES (?, ?, ?, ?)
+                ON CONFLICT(account, folder) DO UPDATE SET
+                    last_uid = CASE
+                        WHEN excluded.uidvalidity IS NOT folder_state.uidvalidity THEN excluded.last_uid
+                        ELSE MAX(folder_state.last_uid, excluded.last_uid)
+                    END,
+                    uidvalidity = excluded.uidvalidity
+                """,
+                (account, folder, uidvalidity, int(last_uid)),
+            )
+
+
+# --- Process-wide access ---
+_ledger: Optional[MessageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_message_ledger() -> MessageLedger:
+    """Returns the shared ledger (EMAIL_LEDGER_PATH, default data/email_ledger.sqlite3)."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = MessageLedger(
+                    os.getenv("EMAIL_LEDGER_PATH") or os.path.join(PROJECT_ROOT, "data/email_ledger.sqlite3")
+                )
+    return _ledger
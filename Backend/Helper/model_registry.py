@@ -0,0 +1,197 @@
+# Backend/Helper/model_registry.py
+import os
+import threading
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import torch
+from transformers import (
+    AutoModelForSeq2SeqLM,
+    AutoTokenizer,
+    BitsAndBytesConfig
+)
+from peft import PeftModel
+
+from Backend.Helper.generation_cache import adapter_checksum
+
+
+class QLoRAModelRegistry:
+    """
+    Process-wide pool for the CodeT5p QLoRA adapters.
+
+    The 4-bit base model and its tokenizer are loaded once. Every adapter
+    (offering, preference, ...) is attached to that single base as a named
+    PEFT adapter and activated per request with `set_adapter`.
+
+    Adapters are reference counted while in use and evicted in LRU order when
+    either MODEL_POOL_MAX_ADAPTERS or MODEL_POOL_MEMORY_BUDGET_MB is exceeded.
+    An adapter whose directory changed on disk (retrained or replaced) is
+    reloaded the next time it is requested while nobody holds it.
+
+    `set_adapter` switches global model state and attaching may rebind the
+    model itself, so `use_adapter` holds the model for the whole block: other
+    threads' attaches and adapter switches wait until the caller's generate
+    call has returned.
+    """
+
+    def __init__(self, base_model_id: str, max_adapters: int = 4, memory_budget_mb: float = 0):
+        self.base_model_id = base_model_id
+        self.max_adapters = max(1, max_adapters)
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+
+        self._model: Optional[Any] = None
+        self._tokenizer: Optional[Any] = None
+        self._base_bytes = 0
+        # name -> {"path": str, "refs": int, "bytes": int, "checksum": str}, oldest first
+        self._adapters: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        # _lock guards the bookkeeping. _active_lock serialises everything that
+        # touches the model (attach, delete, set_adapter and the generate calls
+        # made inside use_adapter); it is always taken before _lock.
+        self._lock = threading.RLock()
+        self._active_lock = threading.RLock()
+
+    # --- Loading ---
+    def _load_base(self) -> None:
+        print(f"--- [Model Pool] Loading Base Model: {self.base_model_id} ---")
+        bnb_config = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.float16,
+        )
+        self._model = AutoModelForSeq2SeqLM.from_pretrained(
+            self.base_model_id,
+            quantization_config=bnb_config,
+            device_map="auto",
+            trust_remote_code=True,
+        )
+        self._tokenizer = AutoTokenizer.from_pretrained(
+            self.base_model_id,
+            trust_remote_code=True,
+            use_fast=False,
+        )
+        self._base_bytes = self._model.get_memory_footprint()
+        print(f"--- [Model Pool] Base Model resident ({self._base_bytes / 2**20:.0f} MB) ---")
+
+    def _adapter_bytes(self, name: str) -> int:
+        marker = f".{name}."
+        return sum(
+            p.numel() * p.element_size()
+            for n, p in self._model.named_parameters()
+            if marker in n
+        )
+
+    def _attach(self, name: str, path: str) -> None:
+        print(f"--- [Model Pool] Attaching Adapter '{name}': {path} ---")
+        checksum = adapter_checksum(path)
+        if isinstance(self._model, PeftModel):
+            # Loading into an already attached name overwrites its weights in place
+            self._model.load_adapter(path, adapter_name=name)
+        else:
+            self._model = PeftModel.from_pretrained(self._model, path, adapter_name=name)
+        self._model.eval()
+        self._adapters[name] = {"path": path, "refs": 0, "bytes": self._adapter_bytes(name), "checksum": checksum}
+
+    def _resident_bytes(self) -> int:
+        return self._base_bytes + sum(a["bytes"] for a in self._adapters.values())
+
+    def _over_budget(self) -> bool:
+        if len(self._adapters) > self.max_adapters:
+            return True
+        return bool(self.memory_budget_bytes) and self._resident_bytes() > self.memory_budget_bytes
+
+    def _evict_if_needed(self, keep: Optional[str] = None) -> None:
+        """Drops least recently used adapters that nobody holds (other than `keep`) until back within budget."""
+        while self._over_budget() and len(self._adapters) > 1:
+            victim = next((n for n, a in self._adapters.items() if a["refs"] == 0 and n != keep), None)
+            if victim is None:
+                print("--- [Model Pool] Over budget but every adapter is in use ---")
+                return
+            print(f"--- [Model Pool] Evicting Adapter '{victim}' (LRU) ---")
+            self._model.delete_adapter(victim)
+            del self._adapters[victim]
+
+    def load_adapter(self, name: str, path: str) -> bool:
+        """
+        Makes sure the base model is resident and `name` is attached.
+        Returns False (and logs) if loading failed.
+        """
+        with self._active_lock, self._lock:
+            try:
+                if self._model is None:
+                    self._load_base()
+                adapter = self._adapters.get(name)
+                if adapter and adapter["path"] != path:
+                    raise ValueError(f"Adapter '{name}' already attached from {adapter['path']}")
+                if adapter and adapter["checksum"] != adapter_checksum(path):
+                    if adapter["refs"]:
+                        print(f"--- [Model Pool] Adapter '{name}' changed on disk but is in use, reloading later ---")
+                    else:
+                        print(f"--- [Model Pool] Adapter '{name}' changed on disk, reloading ---")
+                        self._attach(name, path)
+                if adapter is None:
+                    self._attach(name, path)
+                    self._evict_if_needed(keep=name)
+                self._adapters.move_to_end(name)
+                return True
+            except Exception as e:
+                print(f"CRITICAL ERROR LOADING MODEL: {e}")
+                traceback.print_exc()
+                return False
+
+    # --- Usage ---
+    @contextmanager
+    def use_adapter(self, name: str, path: str) -> Iterator[Tuple[Any, Any]]:
+        """
+        Activates `name` and yields (model, tokenizer) for the duration of the block.
+        The model is held exclusively until the block exits, so no other thread
+        can attach, evict or switch adapters while the caller generates.
+        """
+        with self._active_lock:
+            with self._lock:
+                if not self.load_adapter(name, path):
+                    raise RuntimeError(f"Adapter '{name}' could not be loaded.")
+                self._adapters[name]["refs"] += 1
+                self._adapters.move_to_end(name)
+                self._model.set_adapter(name)
+            try:
+                yield self._model, self._tokenizer
+            finally:
+                with self._lock:
+                    self._adapters[name]["refs"] -= 1
+                    self._evict_if_needed()
+
+    def attached_checksum(self, name: str) -> Optional[str]:
+        """adapter_checksum of the weights currently resident for `name` (None if not attached)."""
+        with self._lock:
+            adapter = self._adapters.get(name)
+            return adapter["checksum"] if adapter else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "base_model_id": self.base_model_id,
+                "resident_mb": round(self._resident_bytes() / 2**20, 1),
+                "adapters": {n: {"refs": a["refs"], "mb": round(a["bytes"] / 2**20, 1)} for n, a in self._adapters.items()},
+            }
+
+
+# --- Process-wide access ---
+_registries: Dict[str, QLoRAModelRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_model_registry(base_model_id: str) -> QLoRAModelRegistry:
+    """Returns the shared pool for `base_model_id`, creating it on first use."""
+    with _registries_lock:
+        registry = _registries.get(base_model_id)
+        if registry is None:
+            registry = QLoRAModelRegistry(
+                base_model_id,
+                max_adapters=int(os.getenv("MODEL_POOL_MAX_ADAPTERS", 4)),
+                memory_budget_mb=float(os.getenv("MODEL_POOL_MEMORY_BUDGET_MB", 0)),
+            )
+            _registries[base_model_id] = registry
+        return registry
@@ -0,0 +1,142 @@
+# Backend/Helper/offering_renderer.py
+import datetime
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+# Same pools as UniTimeDatasetGeneratorWithUpdate (term_important/data_generator/insert_update_off.py)
+BUILDING_CODES = {"science hall": "SCI", "education center": "EDUC", "engineering": "ENG", "main building": "MAIN"}
+CLASS_TYPES = {
+    "lec": "Lec", "lecture": "Lec",
+    "lab": "Lab", "laboratory": "Lab",
+    "rec": "Rec", "recitation": "Rec",
+}
+DAY_PATTERN = re.compile(r"^(?:Th|Su|Sa|M|T|W|F|S)+$")
+MANAGING_DEPT = "0100"
+
+# Model_Prompt_Factory output
+UPDATE_PROMPT = re.compile(
+    r"^Update course (?P<subject>\S+) (?P<number>\S+) to title '(?P<title>[^']*)', "
+    r"room (?P<building>.+?) (?P<room>\S+), meeting (?P<days>\S+) at (?P<start>\d{3,4})-(?P<end>\d{3,4}) "
+    r"and capacity (?P<capacity>\d+)\.?$"
+)
+# Add_Offering_to_Batch_File's sanitized prompt
+INSERT_PROMPT = re.compile(
+    r"^(?:Add|Insert) a new course offering: (?P<subject>\S+) (?P<number>\S+) titled '(?P<title>[^']*)' "
+    r"as an? (?P<type>\S+) in (?P<building>.+?) room (?P<room>\S+) on (?P<days>\S+) "
+    r"(?P<start>\d{3,4})-(?P<end>\d{3,4}) with limit (?P<capacity>\d+)\.?$"
+)
+
+
+def _attr(value) -> str:
+    return escape(str(value), {'"': "&quot;"})
+
+
+def _meetings(days: str) -> int:
+    return len(re.findall(r"Th|Su|Sa|M|T|W|F|S", days))
+
+
+def _minutes(hhmm: str) -> int:
+    return int(hhmm[:-2]) * 60 + int(hhmm[-2:])
+
+
+def building_code(building: str) -> Optional[str]:
+    """Code for a building name from the training data, or the input itself if it already is a code (e.g. EDUC)."""
+    building = " ".join(building.split())
+    code = BUILDING_CODES.get(building.lower())
+    if code:
+        return code
+    if re.fullmatch(r"[A-Z]{2,6}", building):
+        return building
+    return None
+
+
+def normalize_fields(raw: Dict[str, str]) -> Tuple[Optional[Dict[str, str]], str]:
+    """
+    Validates parsed prompt fields and derives the generator's computed values
+    (building code, minPerWeek, timePattern). Returns (fields, "") or
+    (None, reason) when something is missing or ambiguous.
+    """
+    subject, number = raw.get("subject", ""), raw.get("number", "")
+    if not re.fullmatch(r"[A-Za-z]{2,6}", subject) or not re.fullmatch(r"[A-Za-z0-9]{1,6}", number):
+        return None, f"unrecognized course code '{subject} {number}'"
+    if not raw.get("title", "").strip():
+        return None, "missing title"
+
+    code = building_code(raw.get("building", ""))
+    if code is None:
+        return None, f"unknown building '{raw.get('building')}'"
+
+    days = raw.get("days", "")
+    if not DAY_PATTERN.fullmatch(days):
+        return None, f"unrecognized days '{days}'"
+
+    start, end = raw.get("start", "").zfill(4), raw.get("end", "").zfill(4)
+    if int(start[-2:]) > 59 or int(end[-2:]) > 59 or _minutes(end) <= _minutes(start):
+        return None, f"invalid time range {start}-{end}"
+
+    class_type = CLASS_TYPES.get(str(raw.get("type") or "").lower())
+    if class_type is None:
+        return None, f"unknown class type '{raw.get('type')}'" if raw.get("type") else "missing class type"
+
+    duration = _minutes(end) - _minutes(start)
+    return {
+        "subject": subject.upper(),
+        "courseNbr": number.upper(),
+        "title_desc": raw["title"].strip(),
+        "classType": class_type,
+        "startTime": start,
+        "endTime": end,
+        "days": days,
+        "buildingCode": code,
+        "roomNbr": raw["room"],
+        "limit": str(int(raw["capacity"])),
+        "minPerWeek": str(_meetings(days) * duration),
+        "timePattern": f"{_meetings(days)} x {duration}",
+    }, ""
+
+
+def render_offering(d: Dict[str, str], action: str) -> str:
+    """The make_insert / make_update document for already-normalized fields."""
+    created = datetime.datetime.now().strftime("%a %b %d %H:%M:%S CEST %Y")
+    incremental = ' incremental="true"' if action == "update" else ""
+    d = {k: _attr(v) for k, v in d.items()}
+    return f"""<offerings campus="woebegon" year="2010" term="Fal" dateFormat="yyyy/M/d" timeFormat="HHmm" created="{created}" includeExams="none"{incremental}>
+  <offering offered="true" action="{action}">
+    <course subject="{d['subject']}" courseNbr="{d['courseNbr']}" controlling="true" title="{d['title_desc']}"/>
+    <config name="1" limit="{d['limit']}">
+      <subpart type="{d['classType']}" suffix="" minPerWeek="{d['minPerWeek']}"/>
+      <class type="{d['classType']}" suffix="L1" limit="{d['limit']}"
+             studentScheduling="true" displayInScheduleBook="true"
+             cancelled="false" managingDept="{MANAGING_DEPT}">
+        <time days="{d['days']}" startTime="{d['startTime']}" endTime="{d['endTime']}" timePattern="{d['timePattern']}"/>
+        <room building="{d['buildingCode']}" roomNbr="{d['roomNbr']}"/>
+      </class>
+    </config>
+  </offering>
+</offerings>"""
+
+
+def render_from_prompt(prompt: str, action: str,
+                       class_types: Optional[Callable[[str, str], List[str]]] = None) -> Tuple[Optional[str], str]:
+    """
+    Renders the offering XML for a Model_Prompt_Factory (update) or sanitized
+    (insert) prompt without the model. The update prompt carries no class
+    type, so `class_types(subject, number)` supplies the course's existing
+    ones; it must name exactly one. Returns (xml, "") or (None, reason to
+    use the model instead).
+    """
+    pattern = UPDATE_PROMPT if action == "update" else INSERT_PROMPT
+    match = pattern.match(" ".join(prompt.split()))
+    if not match:
+        return None, "prompt is not in the expected format"
+    raw = match.groupdict()
+    if action == "update":
+        known = sorted({CLASS_TYPES.get(t.lower(), t) for t in (class_types(raw["subject"], raw["number"]) if class_types else [])})
+        if len(known) > 1:
+            return None, f"ambiguous class type ({', '.join(known)})"
+        raw["type"] = known[0] if known else None
+    fields, reason = normalize_fields(raw)
+    if fields is None:
+        return None, reason
+    return render_offering(fields, action), ""
@@ -0,0 +1,116 @@
+# Backend/Helper/prompt_memo.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sanitized_prompts (
+    memo_key   TEXT PRIMARY KEY,
+    tool       TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    last_used  REAL NOT NULL
+);
+"""
+
+
+def prompt_version(system_prompt: str) -> str:
+    """Short digest of a system prompt; editing the prompt starts a fresh set of entries."""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def memo_key(tool: str, version: str, body: str) -> str:
+    body_hash = hashlib.sha256(body.strip().encode("utf-8")).hexdigest()
+    return f"{tool}:{version}:{body_hash}"
+
+
+class PromptMemoCache:
+    """
+    Memo of LLM prompt sanitizations keyed by (tool, system-prompt version,
+    email-body hash), so re-processing the same email skips the LLM hop.
+
+    Entries live in an LRU bounded by `max_entries`; with `db_path` they are
+    also written to SQLite (bounded the same way, oldest use evicted first)
+    and survive restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, db_path: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+
+    def _remember(self, key: str, value: str) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, tool: str, version: str, body: str) -> Optional[str]:
+        key = memo_key(tool, version, body)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+            if self._conn is None:
+                return None
+            row = self._conn.execute("SELECT value FROM sanitized_prompts WHERE memo_key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE sanitized_prompts SET last_used = ? WHERE memo_key = ?", (time.time(), key))
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, tool: str, version: str, body: str, value: str) -> None:
+        key = memo_key(tool, version, body)
+        with self._lock:
+            self._remember(key, value)
+            if self._conn is None:
+                return
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sanitized_prompts (memo_key, tool, value, last_used) VALUES (?, ?, ?, ?)",
+                    (key, tool, value, time.time()),
+                )
+                self._conn.execute(
+                    """
+                    DELETE FROM sanitized_prompts WHERE memo_key IN (
+                        SELECT memo_key FROM sanitized_prompts ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+
+
+# --- Process-wide access ---
+_memo: Optional[PromptMemoCache] = None
+_memo_lock = threading.Lock()
+
+
+def get_prompt_memo() -> PromptMemoCache:
+    """
+    Shared memo (SANITIZE_CACHE_MAX_ENTRIES, default 1024). Persisted to
+    SANITIZE_CACHE_PATH (default data/sanitize_cache.sqlite3) unless
+    SANITIZE_CACHE_SQLITE=FALSE.
+    """
+    global _memo
+    if _memo is None:
+        with _memo_lock:
+            if _memo is None:
+                persist = str(os.getenv("SANITIZE_CACHE_SQLITE", "TRUE")).upper() == "TRUE"
+                _memo = PromptMemoCache(
+                    max_entries=int(os.getenv("SANITIZE_CACHE_MAX_ENTRIES", 1024)),
+                    db_path=(os.getenv("SANITIZE_CACHE_PATH") or os.path.join(PROJECT_ROOT, "data/sanitize_cache.sqlite3")) if persist else None,
+                )
+    return _memo
@@ -0,0 +1,132 @@
+# Backend/Helper/rag_retriever.py
+import os
+import threading
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+from langchain_openai import ChatOpenAI
+
+from Backend.Helper.embeddings import get_embeddings
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+VERSION_FILE_NAME = "VERSION"
+
+
+def resolve_index_path() -> str:
+    """RAG_INDEX_PATH, falling back to data/rag_index in the project."""
+    return os.getenv("RAG_INDEX_PATH") or os.path.join(PROJECT_ROOT, "data/rag_index")
+
+
+def write_index_version(index_path: str) -> str:
+    """
+    Stamps `index_path` with a fresh version id. Written last (and atomically)
+    by the refresh so readers only ever swap to a fully saved index.
+    """
+    version = uuid.uuid4().hex
+    version_path = os.path.join(index_path, VERSION_FILE_NAME)
+    tmp_path = f"{version_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, version_path)
+    return version
+
+
+def read_index_version(index_path: str) -> Optional[str]:
+    """Current on-disk version: the VERSION stamp, else the index files' mtimes."""
+    version_path = os.path.join(index_path, VERSION_FILE_NAME)
+    try:
+        with open(version_path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        pass
+    try:
+        return "mtime:" + ":".join(
+            str(os.stat(os.path.join(index_path, name)).st_mtime_ns)
+            for name in ("index.faiss", "index.pkl")
+        )
+    except FileNotFoundError:
+        return None
+
+
+class RAGRetrieverService:
+    """
+    Long-lived retriever for the timetable RAG index.
+
+    The shared embedder, the LLM client and the FAISS index are loaded once per
+    process. Every query checks the on-disk version; when it changed the new
+    index is loaded and swapped in atomically, while queries already holding
+    the old store finish against it.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._llm: Optional[Any] = None
+        # (version, store) swapped as a single reference
+        self._current: Tuple[Optional[str], Optional[Any]] = (None, None)
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> Any:
+        return get_embeddings()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._current[0]
+
+    def get_llm(self) -> Any:
+        if self._llm is None:
+            krutrim_api_key = os.getenv("KRUTRIM_API_KEY")
+            if not krutrim_api_key:
+                raise ValueError("KRUTRIM_API_KEY not found in environment variables.")
+            self._llm = ChatOpenAI(
+                model=os.getenv("LLM_MODEL", "Qwen3-Next-80B-A3B-Instruct"),
+                api_key=krutrim_api_key,
+                base_url="https://cloud.olakrutrim.com/v1",
+                temperature=0.0
+            )
+        return self._llm
+
+    def get_store(self) -> Any:
+        """Returns the current FAISS store, hot-swapping it first if the index changed on disk."""
+        disk_version = read_index_version(self.index_path)
+        version, store = self._current
+        if store is not None and disk_version == version:
+            return store
+
+        embeddings = self.embeddings
+        with self._lock:
+            version, store = self._current
+            if store is not None and disk_version == version:
+                return store
+            try:
+                print(f"--- [RAG Retriever]: Loading FAISS index from {self.index_path} (version {disk_version}) ---")
+                new_store = FAISS.load_local(
+                    self.index_path,
+                    embeddings,
+                    allow_dangerous_deserialization=True
+                )
+            except Exception as e:
+                if store is None:
+                    raise
+                print(f"--- [RAG Retriever]: Reload failed, keeping previous index. {e} ---")
+                return store
+            self._current = (disk_version, new_store)
+            return new_store
+
+
+# --- Process-wide access ---
+_services: Dict[str, RAGRetrieverService] = {}
+_services_lock = threading.Lock()
+
+
+def get_retriever_service(index_path: str) -> RAGRetrieverService:
+    """Returns the shared retriever for `index_path`, creating it on first use."""
+    index_path = os.path.abspath(index_path)
+    with _services_lock:
+        service = _services.get(index_path)
+        if service is None:
+            service = RAGRetrieverService(index_path)
+            _services[index_path] = service
+        return service
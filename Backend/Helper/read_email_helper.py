@@ -84,3 +84,22 @@ class ReadEmail:
                 os.mkdir(folder_name)
                 filepath = os.path.join(folder_name, filename)
                 open(filepath, "wb").write(part.get_payload(decode=True))
+
+    def save_attachment(self, filename, payload, subject):
+        """
+        Function to save an attachment that was fetched on its own (see imap_fetch).
+
+        Args:
+            filename (str): The attachment file name.
+            payload (bytes): The decoded attachment content.
+            subject (str): The subject of the email.
+
+        Returns:
+            None
+        """
+        if filename and payload is not None:
+            folder_name = self.clean(subject)
+            os.makedirs(folder_name, exist_ok=True)
+            filepath = os.path.join(folder_name, os.path.basename(filename))
+            with open(filepath, "wb") as f:
+                f.write(payload)
@@ -0,0 +1,71 @@
+# Backend/Helper/timetable_documents.py
+import hashlib
+from typing import Iterator, List, Tuple
+
+import pandas as pd
+from langchain_core.documents import Document
+
+# One section meeting = these columns; the export repeats them once per date range.
+SECTION_KEY_COLUMNS = ["Name", "Section", "Type", "Location", "Day Of Week", "Published Start", "Published End"]
+
+TEXT_COLUMNS = SECTION_KEY_COLUMNS + ["Title", "Instructor / Sponsor", "First Date", "Last Date"]
+
+
+def load_sections(csv_path: str) -> pd.DataFrame:
+    """
+    Reads the exported timetable and collapses the per-date-range rows into one
+    row per section meeting, with the date ranges merged into `Dates`.
+    """
+    df = pd.read_csv(csv_path, dtype=str).fillna("")
+    for col in TEXT_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    df[TEXT_COLUMNS] = df[TEXT_COLUMNS].apply(lambda s: s.str.strip())
+
+    df["Dates"] = (df["First Date"] + " - " + df["Last Date"]).str.strip(" -")
+    sections = (
+        df.groupby(SECTION_KEY_COLUMNS, sort=False, dropna=False)
+        .agg({
+            "Title": "first",
+            "Instructor / Sponsor": "first",
+            "Dates": lambda s: "; ".join(d for d in dict.fromkeys(s) if d),
+        })
+        .reset_index()
+    )
+    return sections
+
+
+def section_sentences(sections: pd.DataFrame) -> pd.Series:
+    """Builds the "smart sentence" the AI reads for every section, column-wise."""
+    name = sections["Name"].replace("", "Unknown Class")
+    room = sections["Location"].replace("", "Unknown Room")
+    time_range = (sections["Published Start"] + "-" + sections["Published End"]).str.strip("-")
+    return (
+        "Class: " + name + ". "
+        + "Title: " + sections["Title"] + ". "
+        + "Location: " + room + ". "
+        + "Time: " + time_range + " on " + sections["Day Of Week"] + ". "
+        + "Instructor: " + sections["Instructor / Sponsor"] + ". "
+        + "Dates: " + sections["Dates"] + "."
+    )
+
+
+def build_section_documents(sections: pd.DataFrame) -> List[Tuple[str, str, Document]]:
+    """Returns (doc id, content hash, Document) per section. The id hashes the section key."""
+    keys = sections[SECTION_KEY_COLUMNS[0]].str.cat(sections[SECTION_KEY_COLUMNS[1:]], sep="|")
+    sentences = section_sentences(sections)
+    return [
+        (
+            hashlib.sha1(key.encode("utf-8")).hexdigest(),
+            hashlib.sha1(content.encode("utf-8")).hexdigest(),
+            Document(page_content=content, metadata={"source": "timetable", "course_name": name}),
+        )
+        for key, content, name in zip(keys, sentences, sections["Name"])
+    ]
+
+
+def iter_batches(items: List, batch_size: int) -> Iterator[List]:
+    """Yields fixed-size slices so documents reach the embedder a batch at a time."""
+    batch_size = max(1, batch_size)
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
@@ -0,0 +1,89 @@
+# Backend/Helper/timetable_export.py
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import requests
+
+META_SUFFIX = ".meta.json"
+CHUNK_SIZE = 64 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# --- Sidecar metadata (<export>.meta.json: sha256, ETag, Last-Modified) ---
+def load_export_meta(target_path: str) -> Dict[str, str]:
+    try:
+        with open(target_path + META_SUFFIX, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_export_meta(target_path: str, meta: Dict[str, str]) -> None:
+    meta_path = target_path + META_SUFFIX
+    tmp_path = f"{meta_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def download_export(url: str, target_path: str, timeout: float = 20,
+                    session: Optional[requests.Session] = None) -> Tuple[bool, Dict[str, str]]:
+    """
+    Downloads `url` to `target_path` and returns (changed, meta).
+
+    The request is conditional on the ETag / Last-Modified of the previous
+    export; a 304, or a body whose sha256 matches the file on disk, leaves
+    the file untouched. Otherwise the body is streamed to a temp file in the
+    same directory and renamed over the target, so readers always see either
+    the old or the new export.
+    """
+    meta = load_export_meta(target_path) if os.path.exists(target_path) else {}
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    http = session or requests
+    with http.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            return False, meta
+        if response.status_code != 200:
+            raise RuntimeError(f"Export URL returned status {response.status_code}")
+
+        tmp_path = f"{target_path}.{os.getpid()}.tmp"
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, "wb") as f:
+                for block in response.iter_content(chunk_size=CHUNK_SIZE):
+                    digest.update(block)
+                    f.write(block)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        new_meta = {
+            "sha256": digest.hexdigest(),
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+        }
+
+    if not meta.get("sha256") and os.path.exists(target_path):
+        meta["sha256"] = file_sha256(target_path)
+    changed = new_meta["sha256"] != meta.get("sha256")
+    if changed:
+        os.replace(tmp_path, target_path)
+    else:
+        os.remove(tmp_path)
+    save_export_meta(target_path, new_meta)
+    return changed, new_meta
@@ -0,0 +1,157 @@
+# Backend/Helper/timetable_lookup.py
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+LOOKUP_FILE_NAME = "lookup.json"
+
+COURSE_CODE_PATTERN = re.compile(r"\b([A-Za-z]{2,5})\s*-?\s*(\d{3}[A-Za-z]?)\b")
+# Spaced subjects as exported by UniTime, e.g. "C S 101"
+SPACED_COURSE_CODE_PATTERN = re.compile(r"\b([A-Za-z](?: [A-Za-z])+)\s+(\d{3}[A-Za-z]?)\b")
+ROOM_PATTERN = re.compile(r"\b([A-Za-z]{2,5})\s+(\d{1,4}[A-Za-z]?)\b")
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'\-]+")
+# Questions the section listing (days, times, room, instructor) actually answers;
+# anything else ("Is ALG 101 full?", "how do I get to THTR") goes to the retriever
+LISTING_QUESTION = re.compile(
+    r"\b(where|when) (is|are|does|do)\b"
+    r"|\bwhat (time|times|days?|room|building)\b|\bwhich (days?|room|building)\b"
+    r"|\bwho (teaches|is teaching|'s teaching|is the (instructor|professor|lecturer))\b"
+    r"|\bwhat (does|is) \w+ teach(ing)?\b"
+    r"|\bwhat('s| is) (in|scheduled in|happening in)\b"
+    r"|\b(schedule|timetable) (for|of)\b",
+    re.I,
+)
+
+# Words that can look like a surname or building code but are never meant as one
+STOP_WORDS = {
+    "who", "what", "where", "when", "which", "does", "the", "is", "my", "class", "course", "room",
+    "teach", "teaches", "in", "at", "on", "for", "and", "time", "lab", "lecture", "building", "student",
+}
+
+
+def _course_key(subject: str, number: str) -> str:
+    return f"{subject.replace(' ', '').upper()} {number.upper()}"
+
+
+class TimetableLookupIndex:
+    """
+    In-memory index over the exported timetable sections, keyed by course code,
+    instructor surname, room and building. Built at refresh time and saved next
+    to the FAISS index so where / when / who-teaches questions about a course,
+    instructor or room can be answered directly with a templated response.
+    """
+
+    def __init__(self, sections: List[Dict[str, str]]):
+        self.sections = sections
+        self.by_course: Dict[str, List[int]] = {}
+        self.by_instructor: Dict[str, List[int]] = {}
+        self.by_room: Dict[str, List[int]] = {}
+        self.by_building: Dict[str, List[int]] = {}
+        for i, section in enumerate(sections):
+            name = section["name"].strip()
+            match = COURSE_CODE_PATTERN.fullmatch(name) or SPACED_COURSE_CODE_PATTERN.fullmatch(name)
+            if match:
+                self.by_course.setdefault(_course_key(*match.groups()), []).append(i)
+            surname = section["instructor"].split(",")[0].strip().upper()
+            if surname:
+                self.by_instructor.setdefault(surname, []).append(i)
+            room = " ".join(section["location"].upper().split())
+            if room:
+                self.by_room.setdefault(room, []).append(i)
+                self.by_building.setdefault(room.split(" ")[0], []).append(i)
+
+    # --- Build / persist ---
+    @classmethod
+    def from_sections_frame(cls, sections_df) -> "TimetableLookupIndex":
+        """Builds from the collapsed sections produced by timetable_documents.load_sections."""
+        records = sections_df.rename(columns={
+            "Name": "name", "Section": "section", "Type": "type", "Title": "title",
+            "Day Of Week": "days", "Published Start": "start", "Published End": "end",
+            "Location": "location", "Instructor / Sponsor": "instructor", "Dates": "dates",
+        })[["name", "section", "type", "title", "days", "start", "end", "location", "instructor", "dates"]]
+        return cls(records.to_dict("records"))
+
+    def save(self, index_path: str) -> None:
+        os.makedirs(index_path, exist_ok=True)
+        path = os.path.join(index_path, LOOKUP_FILE_NAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sections": self.sections}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, index_path: str) -> "TimetableLookupIndex":
+        with open(os.path.join(index_path, LOOKUP_FILE_NAME), "r", encoding="utf-8") as f:
+            return cls(json.load(f)["sections"])
+
+    # --- Query path ---
+    def _match(self, query: str) -> Optional[Tuple[str, List[int]]]:
+        codes = SPACED_COURSE_CODE_PATTERN.findall(query) + COURSE_CODE_PATTERN.findall(query)
+        for subject, number in codes:
+            key = _course_key(subject, number)
+            if key in self.by_course:
+                return key, self.by_course[key]
+        for building, number in ROOM_PATTERN.findall(query):
+            key = f"{building.upper()} {number.upper()}"
+            if key in self.by_room:
+                return f"room {key}", self.by_room[key]
+        words = [w for w in WORD_PATTERN.findall(query) if w.lower() not in STOP_WORDS]
+        for word in words:
+            if word.upper() in self.by_instructor:
+                return f"instructor {word.capitalize()}", self.by_instructor[word.upper()]
+        for word in words:
+            if word.isupper() and word in self.by_building:
+                return f"building {word}", self.by_building[word]
+        return None
+
+    def course_types(self, subject: str, number: str) -> List[str]:
+        """Distinct section types (e.g. 'Lecture') scheduled for a course."""
+        indices = self.by_course.get(_course_key(subject, number), [])
+        return sorted({self.sections[i]["type"] for i in indices if self.sections[i]["type"]})
+
+    def _describe(self, section: Dict[str, str]) -> str:
+        time_range = "-".join(t for t in (section["start"], section["end"]) if t)
+        line = f"- {section['name']} ({section['title']}) {section['type']} section {section['section']}: "
+        line += f"{section['days']} {time_range} in {section['location'] or 'an unassigned room'}"
+        if section["instructor"]:
+            line += f", taught by {section['instructor']}"
+        if section["dates"]:
+            line += f" [{section['dates']}]"
+        return line + "."
+
+    def answer(self, query: str) -> Optional[str]:
+        """
+        Templated answer for where / when / who-teaches / what-room questions
+        naming a known course, room, instructor or building; else None.
+        """
+        if not LISTING_QUESTION.search(query):
+            return None
+        match = self._match(query)
+        if match is None:
+            return None
+        subject, indices = match
+        lines = [self._describe(self.sections[i]) for i in indices]
+        return f"Here is what the schedule lists for {subject}:\n" + "\n".join(lines)
+
+
+# --- Process-wide access ---
+_loaded: Dict[str, Tuple[int, TimetableLookupIndex]] = {}
+_loaded_lock = threading.Lock()
+
+
+def get_timetable_lookup(index_path: str) -> Optional[TimetableLookupIndex]:
+    """Returns the lookup index saved in `index_path`, reloading it when the file changes."""
+    path = os.path.join(index_path, LOOKUP_FILE_NAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _loaded_lock:
+        cached = _loaded.get(index_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        lookup = TimetableLookupIndex.load(index_path)
+        _loaded[index_path] = (mtime, lookup)
+        return lookup
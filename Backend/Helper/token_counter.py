@@ -1,6 +1,11 @@
 # Backend\Helper\token_counter.py
+import json
+import math
 import os
-from typing import List, Dict, Any
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 
 # --- Library Imports with Fallbacks ---
 try:
@@ -15,67 +20,164 @@ try:
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
 
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+# --- Offline estimator ---
+# Approximates cl100k_base: short words are one token, long words split every
+# ~4.5 letters, digit runs split in threes, punctuation and symbols cost one each.
+_PIECES = re.compile(r"[A-Za-z]+|\d+|\s+|[^\sA-Za-z\d]")
+
+CALIBRATION_SAMPLE = (
+    "Hi team, please add a new offering for CS 4500 (Advanced Algorithms) in ENG 205 on MWF 10:00-10:50, "
+    "capacity 45. Dr. Newman can't teach on Tuesdays and would prefer the Science Hall rooms. "
+    "Thanks, and let me know if anything in the request for Fall 2025 is unclear!\n\nBest regards,\nRegistrar Office"
+)
+
+
+def _raw_estimate(text: str) -> float:
+    tokens = 0.0
+    for piece in _PIECES.findall(text):
+        first = piece[0]
+        if first.isalpha():
+            tokens += 1 if len(piece) <= 6 else math.ceil(len(piece) / 4.5)
+        elif first.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif first.isspace():
+            # A single space is merged into the following word
+            tokens += 0 if piece == " " else 1
+        else:
+            tokens += 1
+    return tokens
+
+
+_calibration: Optional[float] = None
+
+
+def _calibration_factor() -> float:
+    """Ratio of real cl100k_base counts to the raw estimate on a representative sample (1.0 without tiktoken)."""
+    global _calibration
+    if _calibration is None:
+        factor = 1.0
+        if TIKTOKEN_AVAILABLE:
+            try:
+                actual = len(tiktoken.get_encoding("cl100k_base").encode(CALIBRATION_SAMPLE))
+                factor = actual / max(_raw_estimate(CALIBRATION_SAMPLE), 1.0)
+            except Exception as e:
+                print(f"Token estimator calibration skipped: {e}")
+        _calibration = factor
+    return _calibration
+
+
+def estimate_tokens(text: str) -> int:
+    """Local approximate token count, used for Gemini and unknown models. Never touches the network."""
+    if not text:
+        return 0
+    return max(1, round(_raw_estimate(text) * _calibration_factor()))
+
+
+# --- Process-wide tokenizer cache and memo ---
+_tokenizers: Dict[str, Any] = {}
+_tokenizers_lock = threading.Lock()
+
+_memo: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+_memo_lock = threading.Lock()
+MEMO_SIZE = int(os.getenv("TOKEN_COUNT_MEMO_SIZE", 4096))
+
+
+def _is_openai_model(model_name: str) -> bool:
+    name = model_name.lower()
+    return "gpt" in name or name.startswith(("o1", "o3", "o4", "text-embedding"))
+
 
 class UniversalTokenCounter:
     """
-    A universal token counter that supports Google Gemini, OpenAI models (tiktoken),
-    and open-source Hugging Face models (transformers).
-    It caches loaded tokenizer or model client objects to avoid re-initialization.
+    A universal token counter for OpenAI models (tiktoken), Hugging Face models
+    (transformers, for names like "org/model") and everything else, including
+    Gemini, through a local estimator calibrated against tiktoken.
+
+    Tokenizers and recent counts are shared process-wide, so instances are
+    cheap and counting never makes a network call.
     """
-    def __init__(self):
-        self.tokenizers = {}
-        self._gemini_configured = False
 
-    def _get_tokenizer_or_model(self, model_name: str):
+    def _get_tokenizer(self, model_name: str):
         """
-        Loads and caches the appropriate tokenizer or model client.
+        Loads and caches the tokenizer for `model_name`; None means "use the estimator".
         """
-        if model_name in self.tokenizers:
-            return self.tokenizers[model_name]
+        if model_name in _tokenizers:
+            return _tokenizers[model_name]
 
-        print(f"Initializing handler for model: {model_name}...")
-        handler = None
-        try:
-            # Case 1: Google Gemini Models
-            if "gemini" in model_name:
-                if not GEMINI_AVAILABLE:
-                    raise ImportError("google-generativeai is not installed. Please run 'pip install google-generativeai'")
-                
-                # Configure the API key once
-                if not self._gemini_configured:
-                    api_key = os.getenv("GOOGLE_API_KEY")
-                    if not api_key:
-                        raise ValueError("GOOGLE_API_KEY environment variable not found. Please set it in your .env file.")
-                    genai.configure(api_key=api_key)
-                    self._gemini_configured = True
-                
-                handler = genai.GenerativeModel(model_name)
-
-            # Case 2: OpenAI GPT Models
-            elif "gpt" in model_name:
-                if not TIKTOKEN_AVAILABLE:
-                    raise ImportError("tiktoken is not installed. Please run 'pip install tiktoken'")
-                handler = tiktoken.get_encoding("cl100k_base")
-
-            # Case 3: Hugging Face Open-Source Models
-            else:
-                if not TRANSFORMERS_AVAILABLE:
-                    raise ImportError("transformers is not installed. Please run 'pip install transformers sentencepiece'")
-                handler = AutoTokenizer.from_pretrained(model_name)
-            
-            self.tokenizers[model_name] = handler
-            print("Handler initialized and cached.")
+        with _tokenizers_lock:
+            if model_name in _tokenizers:
+                return _tokenizers[model_name]
+
+            handler = None
+            try:
+                # Case 1: OpenAI Models
+                if _is_openai_model(model_name):
+                    if not TIKTOKEN_AVAILABLE:
+                        raise ImportError("tiktoken is not installed. Please run 'pip install tiktoken'")
+                    try:
+                        handler = tiktoken.encoding_for_model(model_name)
+                    except KeyError:
+                        handler = tiktoken.get_encoding("cl100k_base")
+
+                # Case 2: Hugging Face Models (only from the local cache unless downloads are allowed)
+                elif "/" in model_name:
+                    if not TRANSFORMERS_AVAILABLE:
+                        raise ImportError("transformers is not installed. Please run 'pip install transformers sentencepiece'")
+                    allow_download = str(os.getenv("TOKENIZER_ALLOW_DOWNLOAD", "FALSE")).upper() == "TRUE"
+                    handler = AutoTokenizer.from_pretrained(model_name, local_files_only=not allow_download)
+
+                # Case 3: Gemini and unknown models use the estimator
+                if handler is not None:
+                    print(f"Tokenizer for model '{model_name}' initialized and cached.")
+            except Exception as e:
+                print(f"Error initializing tokenizer for '{model_name}', using the estimator: {e}")
+
+            _tokenizers[model_name] = handler
             return handler
 
+    def _encode_lengths(self, texts: List[str], model_name: str) -> List[int]:
+        handler = self._get_tokenizer(model_name)
+        if handler is None:
+            return [estimate_tokens(text) for text in texts]
+        try:
+            if TIKTOKEN_AVAILABLE and isinstance(handler, tiktoken.Encoding):
+                # Email bodies may contain special-token text such as "<|endoftext|>"
+                return [len(ids) for ids in handler.encode_batch(texts, disallowed_special=())]
+            return [len(ids) for ids in handler(texts, add_special_tokens=False)["input_ids"]]
         except Exception as e:
-            print(f"Error initializing handler for '{model_name}': {e}")
-            self.tokenizers[model_name] = None # Cache failure to avoid retrying
-            return None
+            print(f"Error counting tokens for model '{model_name}': {e}")
+            return [estimate_tokens(text) for text in texts]
+
+    def count_many(self, texts: List[str], model_name: str) -> List[int]:
+        """
+        Counts tokens for several texts at once. Memoized counts are reused and
+        the rest are encoded in a single batch.
+        """
+        counts: List[Optional[int]] = []
+        missing: Dict[str, List[int]] = {}
+        with _memo_lock:
+            for i, text in enumerate(texts):
+                if not isinstance(text, str):
+                    counts.append(0)
+                    continue
+                count = _memo.get((model_name, text))
+                if count is not None:
+                    _memo.move_to_end((model_name, text))
+                else:
+                    missing.setdefault(text, []).append(i)
+                counts.append(count)
+
+        if missing:
+            unique = list(missing)
+            lengths = self._encode_lengths(unique, model_name)
+            with _memo_lock:
+                for text, length in zip(unique, lengths):
+                    for i in missing[text]:
+                        counts[i] = length
+                    _memo[(model_name, text)] = length
+                while len(_memo) > MEMO_SIZE:
+                    _memo.popitem(last=False)
+        return counts
 
     def count_text_tokens(self, text: str, model_name: str) -> int:
         """
@@ -83,33 +185,61 @@ class UniversalTokenCounter:
         """
         if not isinstance(text, str):
             return 0
-            
-        handler = self._get_tokenizer_or_model(model_name)
-        if handler is None:
-            return len(text) // 4 # Fallback estimate
+        return self.count_many([text], model_name)[0]
+
+
+class TokenBudget:
+    """
+    Incremental token budget for list-shaped tool output.
+
+    Each item is serialized and counted once; the JSON list punctuation is
+    approximated by a fixed per-item overhead, so filling the budget is
+    linear in the number of items.
+    """
+    LIST_OVERHEAD = 2   # "[" and "]"
+    ITEM_OVERHEAD = 2   # ", " separator and rounding at item boundaries
+
+    def __init__(self, token_counter: UniversalTokenCounter, model_name: str, limit: int):
+        self.token_counter = token_counter
+        self.model_name = model_name
+        self.limit = limit
+        self.used = self.LIST_OVERHEAD
+        self.items = 0
+
+    def cost(self, item: Any) -> int:
+        text = item if isinstance(item, str) else json.dumps(item)
+        return self.token_counter.count_text_tokens(text=text, model_name=self.model_name) + self.ITEM_OVERHEAD
+
+    def try_add(self, item: Any) -> bool:
+        """Adds `item` if it fits; the first item is always accepted so the output is never empty."""
+        cost = self.cost(item)
+        if self.items and self.used + cost > self.limit:
+            return False
+        self.used += cost
+        self.items += 1
+        return True
+
+
+# --- Process-wide access ---
+_token_counter: Optional[UniversalTokenCounter] = None
+_token_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> UniversalTokenCounter:
+    """Returns the shared counter so loaded tokenizers are reused across tool calls."""
+    global _token_counter
+    if _token_counter is None:
+        with _token_counter_lock:
+            if _token_counter is None:
+                _token_counter = UniversalTokenCounter()
+    return _token_counter
 
-        try:
-            # Gemini has a specific client method which makes an API call
-            if "gemini" in model_name:
-                # The handler is a GenerativeModel instance
-                return handler.count_tokens(text).total_tokens
-            
-            # tiktoken and transformers have a compatible .encode() method
-            else:
-                # The handler is a tokenizer instance
-                return len(handler.encode(text))
-        except Exception as e:
-            print(f"Error counting tokens for model '{model_name}': {e}")
-            return len(text) // 4 # Fallback on error
 
 # --- Example Usage ---
 if __name__ == "__main__":
-    from dotenv import load_dotenv
-    load_dotenv() # Load .env file for the GOOGLE_API_KEY
-
-    token_counter = UniversalTokenCounter()
+    token_counter = get_token_counter()
     
-    # --- Test with a Gemini Model ---
+    # --- Test with a Gemini Model (local estimate) ---
     gemini_model = "gemini-1.5-flash-latest" # or "gemini-pro"
     gemini_text = "Hello, this is a test for the Google Gemini API."
     gemini_token_count = token_counter.count_text_tokens(gemini_text, model_name=gemini_model)
@@ -131,4 +261,7 @@ if __name__ == "__main__":
     mistral_token_count = token_counter.count_text_tokens(mistral_text, model_name=mistral_model)
     print(f"\nModel: '{mistral_model}'")
     print(f"Text: '{mistral_text}'")
-    print(f"Token Count: {mistral_token_count}")
\ No newline at end of file
+    print(f"Token Count: {mistral_token_count}")
+
+    # --- Batch counting ---
+    print(f"\nBatch counts: {token_counter.count_many([gpt_text, mistral_text, gpt_text], model_name=gpt_model)}")
@@ -0,0 +1,166 @@
+# Backend/Helper/unitime_import.py
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Tuple
+from xml.sax.saxutils import quoteattr
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+
+XML_HEADERS = {"Content-Type": "application/xml;charset=UTF-8"}
+
+
+# --- Chunking ---
+def _describe(element: ET.Element) -> str:
+    """Short label for a top-level batch element, e.g. 'CS 101' for an <offering>."""
+    course = element.find("course")
+    if course is not None and course.get("subject"):
+        return f"{course.get('subject')} {course.get('courseNbr', '')}".strip()
+    return element.tag
+
+
+def iter_chunks(file_path: str, chunk_size: int) -> Iterator[Tuple[int, List[str], bytes]]:
+    """
+    Streams a UniTime batch file and yields (index, labels, document) for every
+    `chunk_size` top-level elements (<offering>, preferences, ...), each chunk
+    wrapped in a copy of the root element and its attributes. Elements are
+    released as soon as they are serialized, so memory stays bounded by the
+    chunk size rather than the file size.
+    """
+    chunk_size = max(1, chunk_size)
+    root = None
+    depth = 0
+    labels: List[str] = []
+    fragments: List[str] = []
+    index = 0
+
+    def document() -> bytes:
+        attrs = "".join(f" {k}={quoteattr(v)}" for k, v in root.attrib.items())
+        body = "\n".join(fragments)
+        return f'<?xml version="1.0" encoding="UTF-8"?>\n<{root.tag}{attrs}>\n{body}\n</{root.tag}>\n'.encode("utf-8")
+
+    for event, element in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            if depth == 0:
+                root = element
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1:
+            continue
+        labels.append(_describe(element))
+        fragments.append(ET.tostring(element, encoding="unicode").strip())
+        root.remove(element)
+        if len(fragments) >= chunk_size:
+            yield index, labels, document()
+            index += 1
+            labels, fragments = [], []
+
+    if fragments:
+        yield index, labels, document()
+
+
+# --- HTTP client ---
+class UniTimeImporter:
+    """
+    Posts XML documents to the UniTime data exchange endpoint over one pooled,
+    keep-alive requests.Session. Connection errors and 429/5xx responses are
+    retried with exponential backoff; every request has a (connect, read) timeout.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, api_url: str, username: str, password: str, timeout: float = 120,
+                 retries: int = 3, backoff: float = 1.0, max_workers: int = 4):
+        self.api_url = api_url
+        self.timeout = (10, timeout)
+        self.max_workers = max(1, max_workers)
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(username, password)
+        self.session.headers.update(XML_HEADERS)
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=self.RETRY_STATUSES,
+            # UniTime imports are keyed by course/instructor, so a repeated POST is safe
+            allowed_methods=frozenset(["POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, data: Any) -> requests.Response:
+        """POSTs `data` (bytes or a file object, which is streamed) and raises for HTTP errors."""
+        response = self.session.post(self.api_url, data=data, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def _post_chunk(self, chunk: Tuple[int, List[str], bytes]) -> Dict[str, Any]:
+        index, labels, document = chunk
+        result = {"chunk": index + 1, "items": labels, "ok": False, "status": None, "error": None}
+        try:
+            response = self.post(document)
+            result.update(ok=True, status=response.status_code)
+        except requests.exceptions.HTTPError as http_err:
+            result.update(status=http_err.response.status_code, error=f"{http_err} - Response: {http_err.response.text[:300]}")
+        except requests.exceptions.RequestException as req_err:
+            result["error"] = str(req_err)
+        print(f"--- [UniTime Import]: Chunk {index + 1} ({len(labels)} item(s)): {'OK' if result['ok'] else 'FAILED'} ---")
+        return result
+
+    def import_file(self, file_path: str, chunk_size: int) -> List[Dict[str, Any]]:
+        """
+        Imports `file_path` in chunks of `chunk_size` top-level elements with at
+        most `max_workers` requests in flight. Returns one result per chunk, in
+        order; a failed chunk does not stop the others.
+        """
+        chunks = iter_chunks(file_path, chunk_size)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="unitime-import") as pool:
+            # pool.map would read the whole file up front; keep at most 2x max_workers chunks pending
+            pending, results = [], []
+            for chunk in chunks:
+                pending.append(pool.submit(self._post_chunk, chunk))
+                if len(pending) >= 2 * self.max_workers:
+                    results.append(pending.pop(0).result())
+            results.extend(future.result() for future in pending)
+        return results
+
+
+# --- Process-wide access ---
+# (api_url, username) -> ((password, timeout, retries, max_workers), importer)
+_importers: Dict[Tuple[str, str], Tuple[Tuple, UniTimeImporter]] = {}
+_importers_lock = threading.Lock()
+
+
+def get_unitime_importer(api_url: str, username: str, password: str, timeout: float = 120,
+                         retries: int = 3, max_workers: int = 4) -> UniTimeImporter:
+    """
+    Returns the shared importer (and its connection pool) for (api_url, username),
+    rebuilt when the password, timeout, retries or worker count change.
+    """
+    key = (api_url, username)
+    settings = (password, timeout, retries, max(1, max_workers))
+    with _importers_lock:
+        cached = _importers.get(key)
+        if cached is not None and cached[0] == settings:
+            return cached[1]
+        importer = UniTimeImporter(api_url, username, password, timeout=timeout,
+                                   retries=retries, max_workers=max_workers)
+        _importers[key] = (settings, importer)
+        return importer
+
+
+def summarize_results(filename: str, results: List[Dict[str, Any]]) -> str:
+    """Human-readable per-chunk report for the agent."""
+    failed = [r for r in results if not r["ok"]]
+    imported = sum(len(r["items"]) for r in results if r["ok"])
+    total = sum(len(r["items"]) for r in results)
+    lines = [f"Imported {imported} of {total} item(s) from {filename} in {len(results) - len(failed)} of {len(results)} chunk(s)."]
+    for r in failed:
+        lines.append(f"- Chunk {r['chunk']} FAILED ({', '.join(r['items'])}): {r['error']}")
+    return "\n".join(lines)
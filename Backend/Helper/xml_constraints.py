@@ -0,0 +1,278 @@
+# Backend/Helper/xml_constraints.py
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import torch
+from transformers import LogitsProcessor
+
+# --- Offering grammar ---
+# Mirrors UniTimeDatasetGeneratorWithUpdate.make_insert / make_update
+# (term_important/data_generator/insert_update_off.py), which the offering
+# adapter was trained on. {name} marks a value slot, everything else is
+# forced; any whitespace run in the template matches any whitespace run.
+OFFERING_TEMPLATE = """<offerings campus="woebegon" year="2010" term="Fal" dateFormat="yyyy/M/d" timeFormat="HHmm" created="{created}" includeExams="none"{incremental}>
+<offering offered="true" action="{action}">
+<course subject="{subject}" courseNbr="{courseNbr}" controlling="true" title="{title}"/>
+<config name="1" limit="{limit}">
+<subpart type="{classType}" suffix="" minPerWeek="{minPerWeek}"/>
+<class type="{classType}" suffix="L1" limit="{limit}" studentScheduling="true" displayInScheduleBook="true" cancelled="false" managingDept="0100">
+<time days="{days}" startTime="{startTime}" endTime="{endTime}" timePattern="{timePattern}"/>
+<room building="{buildingCode}" roomNbr="{roomNbr}"/>
+</class>
+</config>
+</offering>
+</offerings>"""
+
+
+def _chars(pattern: str) -> Callable[[str], bool]:
+    regex = re.compile(pattern)
+    return lambda c: bool(regex.fullmatch(c))
+
+
+DIGIT = _chars(r"[0-9]")
+ALPHA = _chars(r"[A-Za-z]")
+WORD = _chars(r"[A-Za-z0-9]")
+TEXT = _chars(r"[^\"<>&\r\n]")
+
+# slot name -> (allowed characters, min length, max length)
+OFFERING_SLOTS: Dict[str, Tuple[Callable[[str], bool], int, int]] = {
+    "created": (TEXT, 1, 40),
+    "subject": (WORD, 1, 8),
+    "courseNbr": (WORD, 1, 8),
+    "title": (TEXT, 1, 80),
+    "limit": (DIGIT, 1, 4),
+    "classType": (ALPHA, 1, 8),
+    "minPerWeek": (DIGIT, 1, 4),
+    "days": (ALPHA, 1, 8),
+    "startTime": (DIGIT, 4, 4),
+    "endTime": (DIGIT, 4, 4),
+    "timePattern": (TEXT, 1, 16),
+    "buildingCode": (WORD, 1, 10),
+    "roomNbr": (WORD, 1, 8),
+}
+
+
+def offering_template(action: str) -> str:
+    return OFFERING_TEMPLATE.replace("{action}", action).replace(
+        "{incremental}", ' incremental="true"' if action == "update" else ""
+    )
+
+
+# (segment index, position in segment, whitespace consumed at this position)
+State = Tuple[int, int, bool]
+
+
+class TemplateGrammar:
+    """
+    Character-level matcher for an XML template with value slots, compiled
+    against a tokenizer's vocabulary.
+
+    Literal segments (tag and attribute names, fixed values, closing tags)
+    must be reproduced exactly; slots accept their character class up to the
+    closing quote. `allowed(state)` is the vocabulary mask of tokens that
+    keep the output on the template.
+    """
+
+    def __init__(self, template: str, slots: Dict[str, Tuple[Callable[[str], bool], int, int]],
+                 token_texts: List[Optional[str]], eos_token_id: int):
+        self.segments: List[Tuple] = []
+        for i, part in enumerate(re.split(r"\{(\w+)\}", template)):
+            if i % 2:
+                self.segments.append(("slot",) + slots[part])
+            elif part:
+                self.segments.append(("lit", re.sub(r"\s+", " ", part)))
+        self.token_texts = token_texts
+        self.vocab_size = len(token_texts)
+        self.eos_token_id = eos_token_id
+
+        self._by_first_char: Dict[str, List[int]] = {}
+        for token_id, text in enumerate(token_texts):
+            if text:
+                self._by_first_char.setdefault(text[0], []).append(token_id)
+        self._masks: Dict[Tuple, torch.Tensor] = {}
+        self._slot_tables: Dict[int, Tuple[torch.Tensor, ...]] = {}
+        self._lock = threading.Lock()
+
+    # --- Matching ---
+    @property
+    def initial_state(self) -> State:
+        return (0, 0, False)
+
+    def is_complete(self, state: State) -> bool:
+        return state[0] >= len(self.segments)
+
+    def _normalize(self, seg: int, pos: int, ws: bool) -> State:
+        if seg < len(self.segments) and self.segments[seg][0] == "lit" and pos >= len(self.segments[seg][1]):
+            return (seg + 1, 0, False)
+        return (seg, pos, ws)
+
+    def _step(self, state: State, c: str) -> Optional[State]:
+        seg, pos, ws = state
+        if seg >= len(self.segments):
+            return None
+        segment = self.segments[seg]
+
+        if segment[0] == "slot":
+            allowed, min_len, max_len = segment[1:]
+            if c == '"':
+                if pos < min_len:
+                    return None
+                return self._step((seg + 1, 0, False), c)
+            if pos < max_len and allowed(c):
+                return (seg, pos + 1, False)
+            return None
+
+        literal = segment[1]
+        expected = literal[pos]
+        if expected == " ":
+            if c.isspace():
+                return (seg, pos, True)
+            # Whitespace between tags may be omitted, between attributes it may not
+            if not ws and not (pos > 0 and literal[pos - 1] == ">"):
+                return None
+            return self._step(self._normalize(seg, pos + 1, False), c)
+        if c == expected:
+            return self._normalize(seg, pos + 1, False)
+        return None
+
+    def advance(self, state: Optional[State], text: str) -> Optional[State]:
+        for c in text:
+            if state is None:
+                return None
+            state = self._step(state, c)
+        return state
+
+    # --- Vocabulary masks ---
+    def _slot_table(self, seg: int) -> Tuple[torch.Tensor, ...]:
+        """Per-token (value length, all value chars, value length before a valid closing quote, closes) for a slot."""
+        table = self._slot_tables.get(seg)
+        if table is None:
+            allowed = self.segments[seg][1]
+            lengths, full, close_lengths, closes = [], [], [], []
+            after_quote = (seg + 1, 0, False)
+            for text in self.token_texts:
+                lead = 0
+                if text:
+                    while lead < len(text) and allowed(text[lead]):
+                        lead += 1
+                lengths.append(lead)
+                full.append(bool(text) and lead == len(text))
+                ok = bool(text) and lead < len(text) and text[lead] == '"' and self.advance(after_quote, text[lead:]) is not None
+                close_lengths.append(lead)
+                closes.append(ok)
+            table = (torch.tensor(lengths), torch.tensor(full), torch.tensor(close_lengths), torch.tensor(closes))
+            self._slot_tables[seg] = table
+        return table
+
+    def _literal_mask(self, state: State) -> torch.Tensor:
+        mask = self._masks.get(state)
+        if mask is None:
+            seg, pos, _ = state
+            literal = self.segments[seg][1]
+            candidates = set(literal[pos])
+            if literal[pos] == " ":
+                candidates = {" ", "\n", "\t", "\r"}
+                if pos + 1 < len(literal):
+                    candidates.add(literal[pos + 1])
+            mask = torch.zeros(self.vocab_size, dtype=torch.bool)
+            for first in candidates:
+                for token_id in self._by_first_char.get(first, ()):
+                    if self.advance(state, self.token_texts[token_id]) is not None:
+                        mask[token_id] = True
+            self._masks[state] = mask
+        return mask
+
+    def allowed(self, state: State) -> torch.Tensor:
+        with self._lock:
+            if self.is_complete(state):
+                mask = torch.zeros(self.vocab_size, dtype=torch.bool)
+                mask[self.eos_token_id] = True
+                return mask
+            seg, pos, _ = state
+            if self.segments[seg][0] == "lit":
+                return self._literal_mask(state)
+            _, min_len, max_len = self.segments[seg][1:]
+            lengths, full, close_lengths, closes = self._slot_table(seg)
+            room = max_len - pos
+            return (full & (lengths <= room)) | (closes & (close_lengths <= room) & (close_lengths + pos >= min_len))
+
+
+class XMLGrammarLogitsProcessor(LogitsProcessor):
+    """
+    Masks every token that would leave the grammar. The grammar state of each
+    row is derived from its parent prefix, so beams may be reordered freely.
+    Rows that have somehow left the grammar are not masked.
+    """
+
+    def __init__(self, grammar: TemplateGrammar, special_ids: List[int]):
+        self.grammar = grammar
+        self.special_ids = set(special_ids)
+        self._states: Dict[Tuple[int, ...], Optional[State]] = {}
+
+    def _state(self, ids: Tuple[int, ...]) -> Optional[State]:
+        if ids in self._states:
+            return self._states[ids]
+        # Find the longest known prefix (the previous step's row), then walk forward
+        start = len(ids)
+        while start > 0 and ids[:start] not in self._states:
+            start -= 1
+        state = self._states[ids[:start]] if start else self.grammar.initial_state
+        for end in range(start + 1, len(ids) + 1):
+            token_id = ids[end - 1]
+            if token_id not in self.special_ids and state is not None:
+                text = self.grammar.token_texts[token_id] if token_id < self.grammar.vocab_size else None
+                state = self.grammar.advance(state, text) if text is not None else None
+            self._states[ids[:end]] = state
+        return state
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        for row, ids in enumerate(input_ids.tolist()):
+            state = self._state(tuple(ids))
+            if state is None:
+                continue
+            allowed = self.grammar.allowed(state)
+            mask = torch.zeros(scores.shape[-1], dtype=torch.bool, device=scores.device)
+            width = min(scores.shape[-1], allowed.shape[0])
+            mask[:width] = allowed[:width].to(scores.device)
+            if mask.any():
+                scores[row] = scores[row].masked_fill(~mask, float("-inf"))
+        return scores
+
+
+# --- Process-wide access ---
+CONSTRAINTS: Dict[str, Tuple[str, Dict]] = {
+    "offering-insert": (offering_template("insert"), OFFERING_SLOTS),
+    "offering-update": (offering_template("update"), OFFERING_SLOTS),
+}
+_grammars: Dict[Tuple[int, str], TemplateGrammar] = {}
+_grammars_lock = threading.Lock()
+
+
+def _token_texts(tokenizer) -> List[Optional[str]]:
+    special = set(tokenizer.all_special_ids)
+    texts: List[Optional[str]] = []
+    for token_id in range(len(tokenizer)):
+        if token_id in special:
+            texts.append(None)
+            continue
+        text = tokenizer.convert_tokens_to_string([tokenizer.convert_ids_to_tokens(token_id)])
+        # Partial UTF-8 byte tokens never appear in the ASCII templates
+        texts.append(None if "�" in text else text)
+    return texts
+
+
+def get_logits_processor(constraint: str, tokenizer) -> XMLGrammarLogitsProcessor:
+    """
+    Returns a fresh processor for one generate() call using the grammar
+    `constraint` ('offering-insert' / 'offering-update'), compiled once per
+    tokenizer.
+    """
+    key = (id(tokenizer), constraint)
+    with _grammars_lock:
+        grammar = _grammars.get(key)
+        if grammar is None:
+            template, slots = CONSTRAINTS[constraint]
+            grammar = TemplateGrammar(template, slots, _token_texts(tokenizer), tokenizer.eos_token_id)
+            _grammars[key] = grammar
+    return XMLGrammarLogitsProcessor(grammar, tokenizer.all_special_ids)
@@ -1,7 +1,7 @@
 import os
 import sys
 from abc import ABC
-from typing import List
+from typing import List, Type
 
 # --- Project Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
@@ -22,9 +22,12 @@ class AutoSyncToolkit(BaseToolkit, ABC):
     name: str = "Auto-Sync Toolkit"
     description: str = "Toolkit containing the Selenium bot to export the final schedule from UniTime."
 
+    def get_tool_classes(self) -> List[Type[BaseTool]]:
+        return [ExportTimetableTool]
+
     def get_tools(self) -> List[BaseTool]:
         """Returns a list of tools available in this toolkit."""
-        return [ExportTimetableTool()]
+        return [tool_class() for tool_class in self.get_tool_classes()]
 
     def get_env_keys(self) -> List[ToolConfiguration]:
         """Defines the environment variables required for the tools in this toolkit."""
@@ -1,7 +1,5 @@
 import os
 import sys
-import time
-import requests
 from typing import Type
 from pydantic import BaseModel
 
@@ -11,6 +9,7 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from Backend.tool_framework.base_tool import BaseTool
+from Backend.Helper.timetable_export import download_export
 
 # --- Input schema ---
 class RunExportInput(BaseModel):
@@ -51,21 +50,18 @@ class ExportTimetableTool(BaseTool):
         print(f"--- [Export Bot] Calling Direct Export URL ---\n{export_url}")
 
         try:
-            response = requests.get(export_url, timeout=20)
+            # Conditional, streamed download; the old CSV stays in place until the new one is complete
+            changed, meta = download_export(export_url, export_target_absolute, timeout=20)
 
-            if response.status_code != 200:
-                return f"Error: Export URL returned status {response.status_code}"
-
-            # Remove existing file if exists
-            if os.path.exists(export_target_absolute):
-                os.remove(export_target_absolute)
-
-            # Write the CSV
-            with open(export_target_absolute, "wb") as f:
-                f.write(response.content)
+            if not changed:
+                print(f"--- [Export Bot] Timetable unchanged (sha256 {meta.get('sha256', '')[:12]}) ---")
+                return (
+                    f"Success: Timetable unchanged since the last export ({export_target_absolute}). "
+                    "changed=false: the RAG database is already current."
+                )
 
             print(f"--- [Export Bot] CSV saved to: {export_target_absolute} ---")
-            return f"Success: Timetable exported to {export_target_absolute}"
+            return f"Success: Timetable exported to {export_target_absolute}. changed=true"
 
         except Exception as e:
             return f"Error: {str(e)}"
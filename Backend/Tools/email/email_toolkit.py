@@ -4,7 +4,7 @@ import sys
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
-from typing import List
+from typing import List, Type
 from Backend.tool_framework.base_tool import BaseTool
 from Backend.tool_framework.base_toolkit import BaseToolkit
 from Backend.tool_framework.tool_config import ToolConfiguration
@@ -12,6 +12,7 @@ from Backend.tool_framework.tool_config import ToolConfiguration
 from abc import ABC
 from typing import List
 from Backend.Tools.email.read_email import ReadEmailTool
+from Backend.Tools.email.mark_email_ignored import MarkEmailIgnoredTool
 from Backend.Tools.email.send_email import SendEmailTool
 # from Backend.Tools.email.send_email_attachment import SendEmailAttachmentTool
 from Backend.types.key_type import ToolConfigKeyType
@@ -21,8 +22,11 @@ class EmailToolkit(BaseToolkit, ABC):
     name: str = "Email Toolkit"
     description: str = "Email Tool kit contains all tools related to sending email"
 
+    def get_tool_classes(self) -> List[Type[BaseTool]]:
+        return [ReadEmailTool, MarkEmailIgnoredTool, SendEmailTool]
+
     def get_tools(self) -> List[BaseTool]:
-        return [ReadEmailTool(), SendEmailTool()]
+        return [tool_class() for tool_class in self.get_tool_classes()]
 
 # , SendEmailAttachmentTool()
 
@@ -35,5 +39,14 @@ class EmailToolkit(BaseToolkit, ABC):
             ToolConfiguration(key="EMAIL_DRAFT_FOLDER", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False),
             ToolConfiguration(key="EMAIL_SMTP_HOST", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False),
             ToolConfiguration(key="EMAIL_SMTP_PORT", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False),
-            ToolConfiguration(key="EMAIL_IMAP_SERVER", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False)
+            ToolConfiguration(key="EMAIL_IMAP_SERVER", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False),
+            ToolConfiguration(key="EMAIL_IMAP_POOL_SIZE", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="EMAIL_IMAP_KEEPALIVE_SECONDS", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="EMAIL_IMAP_IDLE_TIMEOUT", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="EMAIL_IDLE_WATCHER", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="EMAIL_LEDGER_PATH", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="EMAIL_PREFILTER", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="EMAIL_ALLOW_DOMAINS", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="EMAIL_DENY_DOMAINS", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="EMAIL_PREFILTER_THRESHOLD", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False)
         ]
\ No newline at end of file
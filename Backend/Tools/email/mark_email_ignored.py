@@ -0,0 +1,42 @@
+import os
+import sys
+from typing import List, Type
+
+from pydantic import BaseModel, Field
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from Backend.Helper.message_ledger import OUTCOME_IGNORED, OUTCOME_PENDING, get_message_ledger
+from Backend.tool_framework.base_tool import BaseTool
+
+
+class MarkEmailIgnoredInput(BaseModel):
+    message_keys: List[str] = Field(..., description="The `Message Key` of every email returned by Read_Email that is not a course/university request.")
+
+
+class MarkEmailIgnoredTool(BaseTool):
+    """
+    Records emails returned by Read_Email as ignored, so `new_only` stops
+    handing them out again.
+    """
+    name: str = "Mark_Email_Ignored"
+    args_schema: Type[BaseModel] = MarkEmailIgnoredInput
+    description: str = "Marks emails returned by Read_Email as ignored (not course/university requests) so they are not returned again."
+
+    def _execute(self, message_keys: List[str]) -> str:
+        ledger = get_message_ledger()
+        marked, skipped = [], []
+        for key in message_keys:
+            previous = ledger.outcome(key)
+            if previous not in (None, OUTCOME_PENDING):
+                # Never overwrite what a WRITE tool already did with the email
+                skipped.append(f"{key} ({previous})")
+                continue
+            ledger.record(key, None, OUTCOME_IGNORED)
+            marked.append(key)
+        result = f"Marked {len(marked)} email(s) as ignored."
+        if skipped:
+            result += f" Skipped already processed: {', '.join(skipped)}."
+        return result
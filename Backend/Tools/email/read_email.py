@@ -359,9 +359,12 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
-from Backend.Helper.imap_email import ImapEmail
+from Backend.Helper.imap_fetch import fetch_messages, folder_uidvalidity, list_uids, uids_above
+from Backend.Helper.imap_pool import find_inbox_watcher, get_imap_pool
+from Backend.Helper.message_ledger import OUTCOME_FILTERED, OUTCOME_IGNORED, OUTCOME_PENDING, content_hash, get_message_ledger, message_key
+from Backend.Helper.email_prefilter import get_email_prefilter
 from Backend.Helper.read_email_helper import ReadEmail
-from Backend.Helper.token_counter import UniversalTokenCounter 
+from Backend.Helper.token_counter import TokenBudget, get_token_counter
 from Backend.tool_framework.base_tool import BaseTool
 
 
@@ -370,6 +373,8 @@ class ReadEmailInput(BaseModel):
     page: int = Field(...,
                       description="The index of the page result the function should resturn. Defaults to 0, the first page.")
     limit: int = Field(..., description="Number of emails to fetch in one cycle. Defaults to 5.")
+    include_attachments: bool = Field(False, description="Download attachments to disk. Defaults to False; only the text body is fetched.")
+    new_only: bool = Field(False, description="Return only emails that arrived since the last run and were not processed yet. Defaults to False.")
 
 
 class ReadEmailTool(BaseTool):
@@ -398,7 +403,12 @@ class ReadEmailTool(BaseTool):
             # No reply chain found, return the original body
             return body.strip()
 
-    def _execute(self, imap_folder: str = "INBOX", page: int = 0, limit: int = 5) -> Union[str, List[Dict[str, Any]]]:
+    @property
+    def prefilter_enabled(self) -> bool:
+        return str(self.get_tool_config("EMAIL_PREFILTER") or "TRUE").upper() == "TRUE"
+
+    def _execute(self, imap_folder: str = "INBOX", page: int = 0, limit: int = 5,
+                 include_attachments: bool = False, new_only: bool = False) -> Union[str, List[Dict[str, Any]]]:
         """
         Execute the read email tool.
         """
@@ -415,84 +425,140 @@ class ReadEmailTool(BaseTool):
             print("Warning: LLM_MODEL not set in config, defaulting to 'gpt-4'.")
             model_name = "gpt-4"
 
-        token_counter = UniversalTokenCounter()
-        imap_helper = ImapEmail()
+        token_budget = TokenBudget(get_token_counter(), model_name, self.max_token_limit)
         read_email_helper = ReadEmail()
+        ledger = get_message_ledger()
+        account = f"{email_sender}@{imap_server}"
+        watcher = find_inbox_watcher(imap_server, email_sender, imap_folder) if new_only else None
+        uidvalidity = None
 
         try:
-            conn = imap_helper.imap_open(imap_folder, email_sender, email_password, imap_server)
+            # Emails handed out by an earlier run that no tool has recorded an outcome for come back first
+            pending = dict(ledger.pending(imap_folder)[:limit]) if new_only else {}
+            resurfaced, fetched = [], []
+            if watcher is None or pending:
+                with get_imap_pool().connection(imap_server, email_sender, email_password, imap_folder) as conn:
+                    status, messages_data = conn.select(imap_folder)
+                    if status != 'OK':
+                        return f"Error selecting IMAP folder '{imap_folder}'."
+
+                    if watcher is None and new_only:
+                        uidvalidity = folder_uidvalidity(conn)
+                    if pending:
+                        resurfaced = fetch_messages(conn, list(pending.values()), include_attachments=include_attachments)
+                        resurfaced = self._match_pending(resurfaced, pending, imap_folder, ledger)
+                    if watcher is None:
+                        if new_only:
+                            # Everything above the UID high-water mark of the previous run, oldest first
+                            last_uid = ledger.last_uid(account, imap_folder, uidvalidity)
+                            uids = [str(u) for u in uids_above(conn, last_uid)[:limit - len(resurfaced)]]
+                        else:
+                            uids = list_uids(conn, page=page, limit=limit)
+                        # Headers + BODYSTRUCTURE for the page in one round-trip, then only the text parts
+                        if uids:
+                            fetched = fetch_messages(conn, uids, include_attachments=include_attachments)
+            if watcher is not None:
+                # Deltas already pushed by the IDLE watcher
+                fetched = watcher.drain(limit - len(resurfaced))
+                uidvalidity = watcher.uidvalidity
+            fetched = resurfaced + fetched
         except Exception as e:
-            return f"Error connecting to IMAP server: {e}"
+            return f"An error occurred while fetching emails: {e}"
 
         try:
-            status, messages_data = conn.select(imap_folder)
-            if status != 'OK':
-                return f"Error selecting IMAP folder '{imap_folder}'."
-
-            num_of_messages = int(messages_data[0])
-            messages = []
+            keys = [
+                (message_key(item["headers"]["Message-ID"], imap_folder, item["uid"]),
+                 content_hash(item["headers"]["From"], item["headers"]["Subject"], item["body"]))
+                for item in fetched
+            ]
+            # Emails still waiting for an outcome are not processed yet
+            already_processed = {k: o for k, o in ledger.seen(keys).items() if o != OUTCOME_PENDING}
 
-            for i in range(num_of_messages, num_of_messages - limit, -1):
-                if i <= 0:
-                    break
-                
-                res, msg_data = conn.fetch(str(i), "(RFC822)")
-                email_msg = {}
-                
-                self._process_message(email_msg, msg_data, read_email_helper)
-                
-                if email_msg:
-                    messages.append(email_msg)
+            prefilter = get_email_prefilter() if self.prefilter_enabled else None
 
-                current_tokens = token_counter.count_text_tokens(
-                    text=json.dumps(messages),
-                    model_name=model_name
-                )
-                
-                if current_tokens > self.max_token_limit:
-                    print(f"Token limit reached ({current_tokens}/{self.max_token_limit}). Stopping email fetch.")
+            messages = []
+            consumed = 0
+            for item, (key, digest) in zip(fetched, keys):
+                if new_only and key in already_processed:
+                    consumed += 1
+                    continue
+                score = None
+                if prefilter is not None:
+                    # Drop mail that is clearly not a university request before it reaches the LLM
+                    keep, score, reasons = prefilter.keep(item["headers"], item["body"])
+                    if not keep:
+                        detail = f"prefilter {score:.2f}: {', '.join(reasons)}"
+                        print(f"--- [Read_Email]: Dropped '{item['headers']['Subject']}' ({detail}) ---")
+                        consumed += 1
+                        if key not in already_processed:
+                            ledger.record(key, digest, OUTCOME_FILTERED, folder=imap_folder, uid=item["uid"], detail=detail)
+                        # Reported without the body so the agent can tell the user what was skipped
+                        messages.append({
+                            "From": item["headers"]["From"], "Subject": item["headers"]["Subject"],
+                            "Message Key": key, "Relevance Score": round(score, 2), "Filtered Out": detail,
+                        })
+                        continue
+                email_msg = self._process_message(item, read_email_helper, include_attachments)
+                email_msg["Message Key"] = key
+                if score is not None:
+                    email_msg["Relevance Score"] = round(score, 2)
+                if key in already_processed:
+                    email_msg["Already Processed"] = already_processed[key]
+                elif key in pending:
+                    email_msg["Returned Earlier"] = True
+                if not token_budget.try_add(email_msg):
+                    print(f"Token limit reached ({token_budget.used}/{self.max_token_limit}). Stopping email fetch.")
                     break
+                messages.append(email_msg)
+                consumed += 1
+                if new_only:
+                    # Handed out again on later runs until a tool records what was done with it
+                    ledger.record(key, digest, OUTCOME_PENDING, folder=imap_folder, uid=item["uid"])
+
+            if new_only:
+                if watcher is not None:
+                    watcher.requeue(fetched[max(consumed, len(resurfaced)):])
+                new_uids = [int(item["uid"]) for item in fetched[len(resurfaced):consumed]]
+                if new_uids:
+                    ledger.set_last_uid(account, imap_folder, max(new_uids), uidvalidity)
             
             if not messages:
+                if new_only:
+                    return f"There are no new emails in your folder '{imap_folder}'."
                 return f"There are no emails in your folder '{imap_folder}'."
             
             return messages
 
         except Exception as e:
-            return f"An error occurred while fetching emails: {e}"
-        
-        finally:
-            if 'conn' in locals() and conn.state == 'SELECTED':
-                conn.logout()
-                print("IMAP connection closed.")
+            return f"An error occurred while processing emails: {e}"
                 
-    def _process_message(self, email_msg: Dict, response_part: List, read_email_helper: ReadEmail):
+    def _match_pending(self, fetched: List[Dict[str, Any]], pending: Dict[str, str], imap_folder: str,
+                       ledger) -> List[Dict[str, Any]]:
+        """
+        Keeps the re-fetched pending emails that are still at their recorded UID.
+        Pending emails that left the folder are recorded as ignored so they stop coming back.
+        """
+        matched = [
+            item for item in fetched
+            if pending.get(message_key(item["headers"]["Message-ID"], imap_folder, item["uid"])) == item["uid"]
+        ]
+        found = {message_key(item["headers"]["Message-ID"], imap_folder, item["uid"]) for item in matched}
+        for key in pending.keys() - found:
+            ledger.record(key, None, OUTCOME_IGNORED, detail=f"no longer in {imap_folder}")
+        return matched
+
+    def _process_message(self, item: Dict[str, Any], read_email_helper: ReadEmail, include_attachments: bool) -> Dict[str, Any]:
         """
-        Processes a single email response part.
+        Builds the tool output for one fetched message (see imap_fetch.fetch_messages).
         """
-        for response in response_part:
-            if isinstance(response, tuple):
-                msg = email.message_from_bytes(response[1])
-                email_msg["From"], email_msg["To"], email_msg["Date"], email_msg[
-                    "Subject"] = read_email_helper.obtain_header(msg)
-                if msg.is_multipart():
-                    for part in msg.walk():
-                        content_type = part.get_content_type()
-                        content_disposition = str(part.get("Content-Disposition"))
-                        try:
-                            body = part.get_payload(decode=True).decode()
-                        except:
-                            pass
-                        if content_type == "text/plain" and "attachment" not in content_disposition:
-                            # <--- 3. THIS IS THE CHANGED LINE ---
-                            dirty_body = read_email_helper.clean_email_body(body)
-                            email_msg["Message Body"] = self._clean_reply_chain(dirty_body)
-                        elif "attachment" in content_disposition:
-                            read_email_helper.download_attachment(part, email_msg["Subject"])
-                else:
-                    content_type = msg.get_content_type()
-                    body = msg.get_payload(decode=True).decode()
-                    if content_type == "text/plain":
-                        # <--- 3. THIS IS THE OTHER CHANGED LINE ---
-                        dirty_body = read_email_helper.clean_email_body(body)
-                        email_msg["Message Body"] = self._clean_reply_chain(dirty_body)
\ No newline at end of file
+        email_msg = {}
+        email_msg["From"], email_msg["To"], email_msg["Date"], email_msg[
+            "Subject"] = read_email_helper.obtain_header(item["headers"])
+        dirty_body = read_email_helper.clean_email_body(item["body"])
+        email_msg["Message Body"] = self._clean_reply_chain(dirty_body)
+        if item["attachments"]:
+            email_msg["Attachments"] = [a["filename"] or f"part-{a['section']}" for a in item["attachments"]]
+            if include_attachments:
+                for attachment in item["attachments"]:
+                    read_email_helper.save_attachment(attachment["filename"], attachment.get("payload"), email_msg["Subject"])
+        return email_msg
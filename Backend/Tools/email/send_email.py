@@ -113,7 +113,7 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
-from Backend.Helper.imap_email import ImapEmail
+from Backend.Helper.imap_pool import get_imap_pool
 from Backend.tool_framework.base_tool import BaseTool
 
 
@@ -176,14 +176,13 @@ class SendEmailTool(BaseTool):
             try:
                 draft_folder = self.get_tool_config('EMAIL_DRAFT_FOLDER') or "Drafts"
                 imap_server = self.get_tool_config('EMAIL_IMAP_SERVER')
-                conn = ImapEmail().imap_open(draft_folder, email_sender, email_password, imap_server)
-                conn.append(
-                    draft_folder,
-                    "",
-                    imaplib.Time2Internaldate(time.time()),
-                    str(message).encode("utf-8")
-                )
-                conn.logout()
+                with get_imap_pool().connection(imap_server, email_sender, email_password, draft_folder) as conn:
+                    conn.append(
+                        draft_folder,
+                        "",
+                        imaplib.Time2Internaldate(time.time()),
+                        str(message).encode("utf-8")
+                    )
                 return f"Email successfully saved to the '{draft_folder}' folder."
             except Exception as e:
                 return f"Error: Failed to save email to drafts. Details: {e}"
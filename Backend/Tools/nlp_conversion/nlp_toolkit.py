@@ -1,7 +1,7 @@
 import os
 import sys
 from abc import ABC
-from typing import List
+from typing import List, Type
 
 # --- Project Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../.."))
@@ -25,9 +25,12 @@ class NLPToolkit(BaseToolkit, ABC):
     name: str = "NLP Conversion Toolkit"
     description: str = "Tools for converting NLP text to UniTime XML."
 
+    def get_tool_classes(self) -> List[Type[BaseTool]]:
+        return [NLPToXMLTool]
+
     def get_tools(self) -> List[BaseTool]:
         """Returns a list of tools available in this toolkit."""
-        return [NLPToXMLTool()]
+        return [tool_class() for tool_class in self.get_tool_classes()]
 
     def get_env_keys(self) -> List[ToolConfiguration]:
         """
@@ -9,12 +9,9 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from Backend.tool_framework.base_tool import BaseTool
+from Backend.Helper.rag_retriever import get_retriever_service
 
 # --- LangChain Imports ---
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-# CHANGED: Switched from Google to OpenAI (Krutrim compatible)
-from langchain_openai import ChatOpenAI 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
@@ -48,36 +45,12 @@ class QueryStudentTimetableTool(BaseTool):
             return f"Error: [RAG Query] RAG index not found at {index_path}"
 
         # ------------------------------
-        # 2. LOAD LLM & VECTOR INDEX
+        # 2. LLM & VECTOR INDEX (loaded once per process)
         # ------------------------------
         try:
-            print("--- [RAG Query]: Initializing LLM and embeddings... ---")
-            
-            # --- KRUTRIM CONFIGURATION ---
-            krutrim_api_key = os.getenv("KRUTRIM_API_KEY")
-            # Default to the model you specified if not found in env
-            model_name = os.getenv("LLM_MODEL", "Qwen3-Next-80B-A3B-Instruct")
-
-            if not krutrim_api_key:
-                return "Error: KRUTRIM_API_KEY not found in environment variables."
-
-            llm = ChatOpenAI(
-                model=model_name,
-                api_key=krutrim_api_key,
-                base_url="https://cloud.olakrutrim.com/v1",
-                temperature=0.0
-            )
-            # -----------------------------
-
-            embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-
-            print(f"--- [RAG Query]: Loading FAISS index from {index_path} ---")
-            db = FAISS.load_local(
-                index_path,
-                embeddings,
-                allow_dangerous_deserialization=True
-            )
-
+            service = get_retriever_service(index_path)
+            llm = service.get_llm()
+            db = service.get_store()
             retriever = db.as_retriever(search_kwargs={"k": 3})
 
         except Exception as e:
@@ -1,7 +1,7 @@
 import os
 import sys
 from abc import ABC
-from typing import List
+from typing import List, Type
 
 # --- Project Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
@@ -22,9 +22,12 @@ class RAGToolkit(BaseToolkit, ABC):
     name: str = "RAG Toolkit"
     description: str = "Toolkit for building, refreshing, and querying the student-facing RAG chatbot."
 
+    def get_tool_classes(self) -> List[Type[BaseTool]]:
+        return [RefreshRAGDatabaseTool, QueryStudentTimetableTool]
+
     def get_tools(self) -> List[BaseTool]:
         """Returns a list of tools available in this toolkit."""
-        return [RefreshRAGDatabaseTool(), QueryStudentTimetableTool()]
+        return [tool_class() for tool_class in self.get_tool_classes()]
 
     def get_env_keys(self) -> List[ToolConfiguration]:
         """Defines the environment variables required for the tools in this toolkit."""
@@ -33,6 +36,14 @@ class RAGToolkit(BaseToolkit, ABC):
             ToolConfiguration(key="SCHEDULE_EXPORT_PATH", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False, default=os.path.join(PROJECT_ROOT, "schedule_export.csv")),
             # Path to store the FAISS vector index
             ToolConfiguration(key="RAG_INDEX_PATH", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False, default=os.path.join(PROJECT_ROOT, "faiss_index")),
+            # Documents handed to the embedder per call during a refresh
+            ToolConfiguration(key="RAG_DOC_BATCH_SIZE", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            # Embedding layer: model, encode batch size, torch threads, torch|onnx|onnx-int8 backend, on-disk cache
+            ToolConfiguration(key="RAG_EMBED_MODEL", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="RAG_EMBED_BATCH_SIZE", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="RAG_EMBED_THREADS", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="RAG_EMBED_BACKEND", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="RAG_EMBED_CACHE_DIR", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
             # We also need the GOOGLE_API_KEY for the LLM in the query tool
             ToolConfiguration(key="GOOGLE_API_KEY", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=True)
         ]
\ No newline at end of file
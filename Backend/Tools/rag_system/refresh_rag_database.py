@@ -105,9 +105,9 @@
 
 import os
 import sys
-import pandas as pd
-from typing import Type, Optional
-from pydantic import BaseModel
+import json
+from typing import Type, Optional, Dict, List, Tuple
+from pydantic import BaseModel, Field
 
 # --- Project Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
@@ -115,22 +115,112 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from Backend.tool_framework.base_tool import BaseTool
+from Backend.Helper.embeddings import embedding_signature
+from Backend.Helper.rag_retriever import get_retriever_service, write_index_version
+from Backend.Helper.timetable_documents import build_section_documents, iter_batches, load_sections
+from Backend.Helper.timetable_lookup import LOOKUP_FILE_NAME, TimetableLookupIndex
+from Backend.Helper.timetable_export import file_sha256
 
 # --- LangChain Imports ---
 from langchain_community.vectorstores import FAISS
-# Note: Use the modern import if available, otherwise fallback is handled by your env
-from langchain_huggingface import HuggingFaceEmbeddings 
 from langchain_core.documents import Document
 
+MANIFEST_FILE_NAME = "manifest.json"
+
+# (doc id, content hash, Document)
+SectionDocument = Tuple[str, str, Document]
+
 class RefreshRAGInput(BaseModel):
     query: Optional[str] = "trigger"
+    full_rebuild: bool = Field(False, description="Set to true to re-embed every row instead of only the changed ones.")
 
 class RefreshRAGDatabaseTool(BaseTool):
     name: str = "Refresh_RAG_Database"
-    description: str = "Reads the exported CSV and rebuilds the RAG memory with smart sentence conversion."
+    description: str = "Reads the exported CSV and refreshes the RAG memory with smart sentence conversion. Only new or changed classes are re-embedded."
     args_schema: Type[BaseModel] = RefreshRAGInput
 
-    def _execute(self, query: str = "trigger") -> str:
+    @property
+    def doc_batch_size(self) -> int:
+        """How many documents are handed to the embedder per call."""
+        return int(self.get_tool_config("RAG_DOC_BATCH_SIZE") or 256)
+
+    # --- Manifest (sidecar next to the index: doc id -> content hash) ---
+    def _load_manifest(self, index_path: str) -> Optional[Dict]:
+        manifest_path = os.path.join(index_path, MANIFEST_FILE_NAME)
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"--- [RAG Refresh]: Manifest unreadable, falling back to full rebuild. {e} ---")
+            return None
+
+    def _save_manifest(self, index_path: str, manifest: Dict) -> None:
+        manifest_path = os.path.join(index_path, MANIFEST_FILE_NAME)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    # --- Refresh strategies ---
+    def _full_rebuild(self, index_path: str, documents: List[SectionDocument], embeddings, source_sha256: str) -> str:
+        print("--- Building FAISS index ---")
+        db = None
+        for batch in iter_batches(documents, self.doc_batch_size):
+            docs = [doc for _, _, doc in batch]
+            ids = [doc_id for doc_id, _, _ in batch]
+            if db is None:
+                db = FAISS.from_documents(docs, embeddings, ids=ids)
+            else:
+                db.add_documents(docs, ids=ids)
+        if db is None:
+            return "Error: The exported timetable contains no classes."
+
+        print(f"--- Saving FAISS index to {index_path} ---")
+        db.save_local(index_path)
+        self._save_manifest(index_path, {
+            "embedding_model": embedding_signature(),
+            "source_sha256": source_sha256,
+            "rows": {doc_id: content_hash for doc_id, content_hash, _ in documents},
+        })
+        # Stamp last so running query services hot-swap to the complete index
+        write_index_version(index_path)
+        return f"Success: RAG index rebuilt with {len(documents)} classes."
+
+    def _incremental_refresh(self, index_path: str, documents: List[SectionDocument], manifest: Dict, embeddings,
+                             source_sha256: str) -> str:
+        old_rows: Dict[str, str] = manifest.get("rows", {})
+        new_rows = {doc_id: content_hash for doc_id, content_hash, _ in documents}
+
+        removed = [doc_id for doc_id in old_rows if doc_id not in new_rows]
+        changed = [doc_id for doc_id, h in new_rows.items() if doc_id in old_rows and old_rows[doc_id] != h]
+        to_embed = [item for item in documents if old_rows.get(item[0]) != item[1]]
+
+        print(f"--- [RAG Refresh]: {len(to_embed) - len(changed)} new, {len(changed)} changed, {len(removed)} removed ---")
+        manifest["source_sha256"] = source_sha256
+        if not to_embed and not removed:
+            self._save_manifest(index_path, manifest)
+            return f"Success: RAG index already up to date ({len(documents)} classes, nothing re-embedded)."
+
+        db = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+        stale = removed + changed
+        if stale:
+            db.delete(stale)
+        for batch in iter_batches(to_embed, self.doc_batch_size):
+            db.add_documents([doc for _, _, doc in batch], ids=[doc_id for doc_id, _, _ in batch])
+
+        print(f"--- Saving FAISS index to {index_path} ---")
+        db.save_local(index_path)
+        manifest["rows"] = new_rows
+        self._save_manifest(index_path, manifest)
+        write_index_version(index_path)
+        return (
+            f"Success: RAG index refreshed incrementally. "
+            f"Embedded {len(to_embed)} of {len(documents)} classes, removed {len(removed)}."
+        )
+
+    def _execute(self, query: str = "trigger", full_rebuild: bool = False) -> str:
         print("--- [RAG Refresh]: Starting ---")
         
         # 1. Define Paths (FORCE CSV extension)
@@ -146,50 +236,42 @@ class RefreshRAGDatabaseTool(BaseTool):
             else:
                 return f"Error: Source file not found at {csv_path}. Please run 'Export_Timetable' first."
 
-        print(f"--- [RAG Refresh]: Loading CSV {csv_path} ---")
-
         try:
-            # 2. Read CSV with Pandas (Handles quotes and commas correctly)
-            # header=0 means the first row contains "Name", "Section", etc.
-            df = pd.read_csv(csv_path, dtype=str).fillna("")
+            # 1b. Skip everything when the export is byte-for-byte what the index (and the
+            # structured lookup beside it) was built from
+            source_sha256 = file_sha256(csv_path)
+            manifest = None if full_rebuild else self._load_manifest(index_path)
+            index_exists = os.path.exists(os.path.join(index_path, "index.faiss"))
+            up_to_date = (
+                manifest is not None and index_exists
+                and os.path.exists(os.path.join(index_path, LOOKUP_FILE_NAME))
+                and manifest.get("embedding_model") == embedding_signature()
+                and manifest.get("source_sha256") == source_sha256
+            )
+            if up_to_date:
+                print("--- [RAG Refresh]: Source CSV unchanged, skipping ---")
+                return "Success: RAG index already up to date (exported timetable unchanged)."
+
+            print(f"--- [RAG Refresh]: Loading CSV {csv_path} ---")
+
+            # 2. Read CSV with Pandas and collapse the per-date-range rows into sections
+            sections = load_sections(csv_path)
             
-            # 3. Convert Rows to "Smart Sentences"
-            documents = []
-            for _, row in df.iterrows():
-                # Extract columns based on YOUR csv structure
-                name = row.get("Name", "Unknown Class")         # ALG 101
-                title = row.get("Title", "")                    # Algebra I
-                room = row.get("Location", "Unknown Room")      # EDUC 103
-                time_start = row.get("Published Start", "")     # 9:30a
-                days = row.get("Day Of Week", "")               # MWF
-                instructor = row.get("Instructor / Sponsor", "") # Doe, J
-
-                # Create the sentence the AI will actually read
-                page_content = (
-                    f"Class: {name}. "
-                    f"Title: {title}. "
-                    f"Location: {room}. "
-                    f"Time: {time_start} on {days}. "
-                    f"Instructor: {instructor}."
-                )
-
-                # Add metadata for filtering
-                metadata = {"source": "timetable", "course_name": name}
-                documents.append(Document(page_content=page_content, metadata=metadata))
-
-            print(f"--- [RAG Refresh]: Converted {len(documents)} rows into clean sentences. ---")
-
-            # 4. Build Vector Index
-            print("--- Initializing embeddings model ---")
-            embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+            # 3. Convert Sections to "Smart Sentences" (column-wise)
+            documents = build_section_documents(sections)
+            print(f"--- [RAG Refresh]: Converted {len(documents)} sections into clean sentences. ---")
 
-            print("--- Building FAISS index ---")
-            db = FAISS.from_documents(documents, embeddings)
+            # Structured lookup (course code / instructor / room) saved beside the index
+            TimetableLookupIndex.from_sections_frame(sections).save(index_path)
 
-            print(f"--- Saving FAISS index to {index_path} ---")
-            db.save_local(index_path)
+            # 4. Build or patch the Vector Index
+            print("--- Initializing embeddings model ---")
+            # Reuse the process-wide model the query service already holds
+            embeddings = get_retriever_service(index_path).embeddings
 
-            return f"Success: RAG index refreshed with {len(documents)} classes."
+            if manifest is None or not index_exists or manifest.get("embedding_model") != embedding_signature():
+                return self._full_rebuild(index_path, documents, embeddings, source_sha256)
+            return self._incremental_refresh(index_path, documents, manifest, embeddings, source_sha256)
 
         except Exception as e:
-            return f"Error during RAG refresh: {str(e)}"
\ No newline at end of file
+            return f"Error during RAG refresh: {str(e)}"
@@ -1,18 +1,10 @@
 import os
 import sys
-import torch
-import datetime 
 from typing import Type, Any, Optional, ClassVar
 from bs4 import BeautifulSoup 
 
 from pydantic import BaseModel, Field
 from langchain_google_genai import ChatGoogleGenerativeAI
-from transformers import (
-    AutoModelForSeq2SeqLM,
-    AutoTokenizer, 
-    BitsAndBytesConfig
-)
-from peft import PeftModel
 
 # --- Project Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
@@ -20,9 +12,15 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from Backend.tool_framework.base_tool import BaseTool
+from Backend.Helper.model_registry import get_model_registry
+from Backend.Helper.batch_generator import get_batch_generator
+from Backend.Helper.batch_store import get_batch_store
+from Backend.Helper.prompt_memo import get_prompt_memo, prompt_version
+from Backend.Helper.message_ledger import OUTCOME_BATCH_APPENDED, UNHANDLED_OUTCOMES, get_message_ledger
 
 class AddPreferenceInput(BaseModel):
     query_text: str = Field(..., description="The full, original text requesting the preference update.")
+    message_key: Optional[str] = Field(None, description="The 'Message Key' of the email this request came from (from Read_Email), if any.")
 
 class AddPreferenceToBatchTool(BaseTool):
     name: str = "Add_Preference_to_Batch"
@@ -30,11 +28,22 @@ class AddPreferenceToBatchTool(BaseTool):
     args_schema: Type[BaseModel] = AddPreferenceInput
     
     BATCH_FILE_NAME: ClassVar[str] = "unitime_batch.xml"
+    ADAPTER_NAME: ClassVar[str] = "preference"
+    SANITIZE_SYSTEM_PROMPT: ClassVar[str] = """
+        You are a Data Formatter for University Instructor Preferences. 
+        Convert the user request into a standard prompt like:
+        "INSTRUCTOR PREFERENCE REQUEST: Instructor [Name] [Action: Add/Update] [Type: Room/Time/Distribution] Preference [Level: Required/Strongly Preferred] for [Details]."
+        
+        Examples:
+        - "Instructor Doe needs a Projector" -> "INSTRUCTOR PREFERENCE REQUEST: Instructor Doe Add Room Preference Required for Projector."
+        - "Prof Smith cannot teach on Mondays" -> "INSTRUCTOR PREFERENCE REQUEST: Instructor Smith Add Time Preference Prohibited for Monday."
+        
+        Input Text:
+        """
 
     # --- Attributes ---
     classifier_llm: Optional[Any] = None
-    preference_model: Optional[Any] = None
-    tokenizer: Optional[Any] = None
+    model_registry: Optional[Any] = None
     base_model_id: Optional[str] = None
     preference_adapter_path: Optional[str] = None
 
@@ -58,82 +67,52 @@ class AddPreferenceToBatchTool(BaseTool):
             print(f"Error: Failed to initialize Classifier LLM. Exception: {e}")
 
     def _load_qlora_pipeline(self) -> Any:
-        try:
-            if not self.tokenizer:
-                self.tokenizer = AutoTokenizer.from_pretrained(self.base_model_id, trust_remote_code=True, use_fast=False)
-            
-            bnb_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_quant_type="nf4",
-                bnb_4bit_compute_dtype=torch.float16,
-            )
-            
-            base_model = AutoModelForSeq2SeqLM.from_pretrained(
-                self.base_model_id,
-                quantization_config=bnb_config,
-                device_map="auto",
-                trust_remote_code=True,
-            )
-            print(f"Loading Preference Adapter: {self.preference_adapter_path}")
-            model = PeftModel.from_pretrained(base_model, self.preference_adapter_path)
-            model.eval()
-            return model
-        except Exception as e:
-            print(f"Error loading Preference Model: {e}")
+        """Attaches the preference adapter to the shared 4-bit base model in the model pool."""
+        registry = get_model_registry(self.base_model_id)
+        if not registry.load_adapter(self.ADAPTER_NAME, self.preference_adapter_path):
             return None
+        return registry
 
     def _sanitize_prompt_for_model(self, text: str) -> str:
         # Specific prompt for Preferences to standardize input for the model
-        system_prompt = """
-        You are a Data Formatter for University Instructor Preferences. 
-        Convert the user request into a standard prompt like:
-        "INSTRUCTOR PREFERENCE REQUEST: Instructor [Name] [Action: Add/Update] [Type: Room/Time/Distribution] Preference [Level: Required/Strongly Preferred] for [Details]."
-        
-        Examples:
-        - "Instructor Doe needs a Projector" -> "INSTRUCTOR PREFERENCE REQUEST: Instructor Doe Add Room Preference Required for Projector."
-        - "Prof Smith cannot teach on Mondays" -> "INSTRUCTOR PREFERENCE REQUEST: Instructor Smith Add Time Preference Prohibited for Monday."
-        
-        Input Text:
-        """
+        memo = get_prompt_memo()
+        version = prompt_version(self.SANITIZE_SYSTEM_PROMPT)
+        cached = memo.get(self.name, version, text)
+        if cached is not None:
+            return cached
         try:
-            return self.classifier_llm.invoke(f"{system_prompt}\n\"{text}\"\n\nOUTPUT:").content.strip().strip('"')
+            clean_prompt = self.classifier_llm.invoke(f"{self.SANITIZE_SYSTEM_PROMPT}\n\"{text}\"\n\nOUTPUT:").content.strip().strip('"')
+            memo.put(self.name, version, text, clean_prompt)
+            return clean_prompt
         except:
             return text
 
-    def _ensure_batch_file_exists(self) -> str:
-        batch_file_path = os.path.join(PROJECT_ROOT, self.BATCH_FILE_NAME)
-        if not os.path.exists(batch_file_path):
-            timestamp = datetime.datetime.now().strftime("%a %b %d %H:%M:%S %Z %Y")
-            xml_header = f"""<?xml version="1.0" encoding="UTF-8"?>
-<offerings campus="woebegon" year="2010" term="Fal" dateFormat="yyyy/M/d" timeFormat="HHmm" created="{timestamp}" includeExams="none">"""
-            xml_footer = """
-</offerings>"""
-            with open(batch_file_path, "w", encoding="utf-8") as f:
-                f.write(f"{xml_header}\n{xml_footer}")
-        return "Success"
-
-    def _execute(self, query_text: str) -> str:
+    def _execute(self, query_text: str, message_key: Optional[str] = None) -> str:
+        if message_key:
+            previous = get_message_ledger().outcome(message_key)
+            if previous and previous not in UNHANDLED_OUTCOMES:
+                return f"Skipped: email '{message_key}' was already processed ({previous})."
+
         if not self.classifier_llm or not self.base_model_id: return "Error: Config missing."
 
         # 1. Load Model
-        if not self.preference_model:
-            self.preference_model = self._load_qlora_pipeline()
-        if not self.preference_model: return "Error: Preference Model failed to load."
+        if not self.model_registry:
+            self.model_registry = self._load_qlora_pipeline()
+        if not self.model_registry: return "Error: Preference Model failed to load."
 
         # 2. Sanitize
         sanitized_prompt = self._sanitize_prompt_for_model(query_text)
         print(f"Preference Prompt: {sanitized_prompt}")
 
         # 3. Generate
+        gen_kwargs = {"max_new_tokens": 512, "num_beams": 4}
+        if str(self.get_tool_config("ASSISTED_DECODING_ADD_PREFERENCE") or "FALSE").upper() == "TRUE":
+            # The 220M draft proposes the boilerplate, the 770M adapter only verifies it
+            gen_kwargs["draft"] = self.get_tool_config("DRAFT_PREFERENCE_MODEL_PATH") or ""
         try:
-            inputs = self.tokenizer(sanitized_prompt, return_tensors="pt").to(self.preference_model.device)
-            with torch.no_grad():
-                outputs = self.preference_model.generate(
-                    input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"],
-                    max_new_tokens=512, num_beams=4,
-                    pad_token_id=self.tokenizer.pad_token_id, eos_token_id=self.tokenizer.eos_token_id,
-                )
-            xml_output = self.tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
+            xml_output = get_batch_generator(self.base_model_id).generate(
+                self.ADAPTER_NAME, self.preference_adapter_path, sanitized_prompt, **gen_kwargs
+            ).strip()
         except Exception as e:
             return f"Error during inference: {e}"
 
@@ -152,20 +131,10 @@ class AddPreferenceToBatchTool(BaseTool):
 
             pref_block = str(pref_tag)
             
-            self._ensure_batch_file_exists()
-            batch_file_path = os.path.join(PROJECT_ROOT, self.BATCH_FILE_NAME)
-
-            with open(batch_file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            insert_pos = content.rfind("</offerings>")
-            if insert_pos == -1: return "Error: Batch file corrupt."
-
-            new_content = content[:insert_pos] + pref_block + "\n" + content[insert_pos:]
-
-            with open(batch_file_path, "w", encoding="utf-8") as f:
-                f.write(new_content)
+            get_batch_store(os.path.join(PROJECT_ROOT, self.BATCH_FILE_NAME)).append(pref_block)
 
+            if message_key:
+                get_message_ledger().record(message_key, None, OUTCOME_BATCH_APPENDED)
             return "Success: Preference added to batch file."
 
         except Exception as e:
@@ -1,9 +1,6 @@
 import os
 import sys
-import torch
 import re 
-import datetime 
-import traceback
 import dotenv
 from typing import Type, Any, Optional, ClassVar
 from bs4 import BeautifulSoup 
@@ -12,19 +9,18 @@ from pydantic import BaseModel, Field
 # --- KRUTRIM IMPORT ---
 from langchain_openai import ChatOpenAI
 
-from transformers import (
-    AutoModelForSeq2SeqLM,
-    AutoTokenizer, 
-    BitsAndBytesConfig
-)
-from peft import PeftModel
-
 # --- Project Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from Backend.tool_framework.base_tool import BaseTool
+from Backend.Helper.model_registry import get_model_registry
+from Backend.Helper.batch_generator import get_batch_generator
+from Backend.Helper.batch_store import get_batch_store
+from Backend.Helper.offering_renderer import render_from_prompt
+from Backend.Helper.prompt_memo import get_prompt_memo, prompt_version
+from Backend.Helper.message_ledger import OUTCOME_BATCH_APPENDED, UNHANDLED_OUTCOMES, get_message_ledger
 
 # Load environment variables
 dotenv.load_dotenv()
@@ -32,6 +28,7 @@ dotenv.load_dotenv()
 # --- Pydantic Input Schema ---
 class AddToBatchInput(BaseModel):
     query_text: str = Field(..., description="The full, original email body or query text to be processed.")
+    message_key: Optional[str] = Field(None, description="The 'Message Key' of the email this request came from (from Read_Email), if any.")
 
 # --- Tool Class Definition ---
 class AddToBatchFileTool(BaseTool):
@@ -40,11 +37,25 @@ class AddToBatchFileTool(BaseTool):
     args_schema: Type[BaseModel] = AddToBatchInput
     
     BATCH_FILE_NAME: ClassVar[str] = "unitime_batch.xml"
+    ADAPTER_NAME: ClassVar[str] = "offering"
+    SANITIZE_SYSTEM_PROMPT: ClassVar[str] = """
+        You are a Data Formatter. Your job is to extract details from a course request email and format them into a SINGLE strict sentence.
+        
+        REQUIRED OUTPUT FORMAT:
+        "Add a new course offering: {Subject} {Number} titled '{Title}' as a {Type} in {Building} room {Room} on {Days} {Start}-{End} with limit {Capacity}."
+        
+        RULES:
+        - If the Title is missing, infer a generic one like '{Subject} Basics'.
+        - If Building is 'ENG', use 'Engineering'. If 'EDU', use 'Education Center'.
+        - Time must be HHmm format (e.g. 1330).
+        - Ignore greetings and signatures.
+        
+        Input Email:
+        """
 
     # --- Attributes for ALL models ---
     classifier_llm: Optional[Any] = None
-    offering_model: Optional[Any] = None
-    tokenizer: Optional[Any] = None
+    model_registry: Optional[Any] = None
     
     # --- DYNAMIC PATHS (Loaded from .env) ---
     # Defaulting to 770m if not found in .env
@@ -82,72 +93,34 @@ class AddToBatchFileTool(BaseTool):
 
     def _load_qlora_pipeline(self) -> Any:
         """
-        Loads the 770M model + Adapter using 4-bit quantization.
+        Attaches the offering adapter to the shared 4-bit 770M base model.
+        The base model and tokenizer are loaded once per process by the model pool.
         """
-        try:
-            print(f"--- Loading Base Model: {self.base_model_id} ---")
-            
-            # 1. Quantization
-            bnb_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_quant_type="nf4",
-                bnb_4bit_compute_dtype=torch.float16,
-            )
-            
-            # 2. Base Model
-            base_model = AutoModelForSeq2SeqLM.from_pretrained(
-                self.base_model_id,
-                quantization_config=bnb_config,
-                device_map="auto",
-                trust_remote_code=True,
-            )
-            
-            # 3. Tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.base_model_id,
-                trust_remote_code=True,
-                use_fast=False
-            )
-            
-            # 4. Adapter
-            print(f"--- Loading Adapter: {self.offering_adapter_path} ---")
-            model = PeftModel.from_pretrained(base_model, self.offering_adapter_path)
-            model.eval()
-            
-            print("--- Model Loaded Successfully ---")
-            return model
-
-        except Exception as e:
-            print(f"CRITICAL ERROR LOADING MODEL: {e}")
-            traceback.print_exc()
+        registry = get_model_registry(self.base_model_id)
+        if not registry.load_adapter(self.ADAPTER_NAME, self.offering_adapter_path):
             return None
+        return registry
 
     def _classify_intent(self, query: str) -> str:
         return "Course_Offering"
 
     def _sanitize_prompt_for_model(self, email_body: str, intent: str) -> str:
         print(f"Sanitizing prompt for intent: {intent}...")
-        
-        system_prompt = """
-        You are a Data Formatter. Your job is to extract details from a course request email and format them into a SINGLE strict sentence.
-        
-        REQUIRED OUTPUT FORMAT:
-        "Add a new course offering: {Subject} {Number} titled '{Title}' as a {Type} in {Building} room {Room} on {Days} {Start}-{End} with limit {Capacity}."
-        
-        RULES:
-        - If the Title is missing, infer a generic one like '{Subject} Basics'.
-        - If Building is 'ENG', use 'Engineering'. If 'EDU', use 'Education Center'.
-        - Time must be HHmm format (e.g. 1330).
-        - Ignore greetings and signatures.
-        
-        Input Email:
-        """
+
+        # Retries of the same email reuse the earlier result instead of calling the LLM again
+        memo = get_prompt_memo()
+        version = prompt_version(self.SANITIZE_SYSTEM_PROMPT)
+        cached = memo.get(self.name, version, email_body)
+        if cached is not None:
+            print(f"Sanitized prompt (cached): {cached}")
+            return cached
 
         try:
-            full_prompt = f"{system_prompt}\n\"{email_body}\"\n\nOUTPUT:"
+            full_prompt = f"{self.SANITIZE_SYSTEM_PROMPT}\n\"{email_body}\"\n\nOUTPUT:"
             response = self.classifier_llm.invoke(full_prompt)
             clean_prompt = response.content.strip().strip('"') 
             print(f"Sanitized prompt: {clean_prompt}")
+            memo.put(self.name, version, email_body, clean_prompt)
             return clean_prompt
         except Exception as e:
             print(f"Error sanitizing prompt: {e}")
@@ -156,46 +129,47 @@ class AddToBatchFileTool(BaseTool):
     def _get_batch_file_path(self) -> str:
         return os.path.join(PROJECT_ROOT, self.BATCH_FILE_NAME)
 
-    def _ensure_batch_file_exists(self) -> str:
-        batch_file_path = self._get_batch_file_path()
-        if not os.path.exists(batch_file_path):
-            timestamp = datetime.datetime.now().strftime("%a %b %d %H:%M:%S %Z %Y")
-            xml_header = f"""<?xml version="1.0" encoding="UTF-8"?>
-<offerings campus="woebegon" year="2010" term="Fal" dateFormat="yyyy/M/d" timeFormat="HHmm" created="{timestamp}" includeExams="none">"""
-            xml_footer = """
-</offerings>"""
-            try:
-                with open(batch_file_path, "w", encoding="utf-8") as f:
-                    f.write(f"{xml_header}\n{xml_footer}")
-            except Exception as e:
-                return f"Error: Failed to create new batch file: {e}"
-        return "Success"
+    def _execute(self, query_text: str, message_key: Optional[str] = None) -> str:
+        if message_key:
+            previous = get_message_ledger().outcome(message_key)
+            if previous and previous not in UNHANDLED_OUTCOMES:
+                return f"Skipped: email '{message_key}' was already processed ({previous})."
 
-    def _execute(self, query_text: str) -> str:
         if not self.classifier_llm: return "Error: Classifier not loaded."
 
-        # 1. Load Model (Lazy Loading)
-        if not self.offering_model:
-            self.offering_model = self._load_qlora_pipeline()
-        
-        if not self.offering_model: 
-            return "Error: Model failed to load. Check console for details."
-
-        # 2. Sanitize
+        # 1. Sanitize
         sanitized_prompt = self._sanitize_prompt_for_model(query_text, "Course_Offering")
 
-        # 3. Generate
-        try:
-            inputs = self.tokenizer(sanitized_prompt, return_tensors="pt").to(self.offering_model.device)
-            with torch.no_grad():
-                outputs = self.offering_model.generate(
-                    input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"],
-                    max_new_tokens=512, num_beams=4,
-                    pad_token_id=self.tokenizer.pad_token_id, eos_token_id=self.tokenizer.eos_token_id,
-                )
-            xml_output = self.tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
-        except Exception as e:
-            return f"Error during inference: {e}"
+        # 2. Render directly when the sanitized prompt carries every field
+        xml_output, path = None, "model"
+        if str(self.get_tool_config("XML_TEMPLATE_FAST_PATH") or "TRUE").upper() == "TRUE":
+            xml_output, reason = render_from_prompt(sanitized_prompt, "insert")
+            if xml_output:
+                path = "template"
+            else:
+                print(f"--- [Add_Offering_to_Batch_File]: Falling back to the model ({reason}) ---")
+
+        # 3. Otherwise load the model (lazily) and generate
+        if xml_output is None:
+            if not self.model_registry:
+                self.model_registry = self._load_qlora_pipeline()
+            
+            if not self.model_registry: 
+                return "Error: Model failed to load. Check console for details."
+
+            gen_kwargs = {"max_new_tokens": 512, "num_beams": 4}
+            if str(self.get_tool_config("XML_CONSTRAINED_DECODING") or "FALSE").upper() == "TRUE":
+                # Tags and attribute names are forced by the grammar, so fewer beams give the same XML
+                gen_kwargs.update(num_beams=int(self.get_tool_config("XML_CONSTRAINED_NUM_BEAMS") or 1), constraint="offering-insert")
+            if str(self.get_tool_config("ASSISTED_DECODING_ADD_OFFERING") or "FALSE").upper() == "TRUE":
+                # The 220M draft proposes the boilerplate, the 770M adapter only verifies it
+                gen_kwargs["draft"] = self.get_tool_config("DRAFT_OFFERING_MODEL_PATH") or ""
+            try:
+                xml_output = get_batch_generator(self.base_model_id).generate(
+                    self.ADAPTER_NAME, self.offering_adapter_path, sanitized_prompt, **gen_kwargs
+                ).strip()
+            except Exception as e:
+                return f"Error during inference: {e}"
 
         # 4. Insert into File
         try:
@@ -216,21 +190,11 @@ class AddToBatchFileTool(BaseTool):
 
             offering_block = str(offering_tag)
             
-            self._ensure_batch_file_exists()
-            batch_file_path = self._get_batch_file_path()
-
-            with open(batch_file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            insert_pos = content.rfind("</offerings>")
-            if insert_pos == -1: return "Error: Batch file corrupt."
-
-            new_content = content[:insert_pos] + offering_block + "\n" + content[insert_pos:]
-
-            with open(batch_file_path, "w", encoding="utf-8") as f:
-                f.write(new_content)
+            get_batch_store(self._get_batch_file_path()).append(offering_block)
 
-            return "Success: Added to batch file."
+            if message_key:
+                get_message_ledger().record(message_key, None, OUTCOME_BATCH_APPENDED)
+            return f"Success: Added to batch file (path: {path})."
 
         except Exception as e:
             return f"Error saving to batch file: {e}"
\ No newline at end of file
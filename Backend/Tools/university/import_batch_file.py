@@ -123,9 +123,8 @@
 import os
 import sys
 import requests
-from requests.auth import HTTPBasicAuth 
 from pydantic import BaseModel, Field
-from typing import Type
+from typing import Type, Optional
 
 # --- Project Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
@@ -133,11 +132,14 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from Backend.tool_framework.base_tool import BaseTool
+from Backend.Helper.batch_store import get_batch_store, is_journaled
+from Backend.Helper.unitime_import import get_unitime_importer, summarize_results
 
 # --- Pydantic Input Schema ---
 class ImportBatchFileInput(BaseModel):
     # KEY CHANGE: We ask the AI to tell us WHICH file to import
     filename: str = Field(..., description="The name of the XML file to import. Use 'unitime_batch.xml' for new courses (inserts) or 'unitime_update.xml' for updates.")
+    chunk_size: Optional[int] = Field(None, description="Optional. Import this many offerings per request and report each chunk separately. Defaults to UNITIME_IMPORT_CHUNK_SIZE (0 = whole file in one request).")
 
 # --- Tool Class Definition ---
 class ImportBatchFileTool(BaseTool):
@@ -149,19 +151,20 @@ class ImportBatchFileTool(BaseTool):
     description: str = "Imports a specific local XML file into UniTime. You must specify if you are importing the batch file or the update file."
     args_schema: Type[BaseModel] = ImportBatchFileInput
     
-    def _execute(self, filename: str) -> str:
+    def _execute(self, filename: str, chunk_size: Optional[int] = None) -> str:
         
-        # --- Step 1: Read XML Data from the Requested File ---
+        # --- Step 1: Locate the Requested File ---
         file_path = os.path.join(PROJECT_ROOT, filename)
+
+        # Batch files are kept as an append-only journal; write out the full <offerings> document first
+        if is_journaled(file_path):
+            try:
+                get_batch_store(file_path).materialize()
+            except Exception as e:
+                return f"Error: Failed to assemble '{filename}' from its journal: {e}"
         
         if not os.path.exists(file_path):
             return f"Error: The file '{filename}' was not found. Please generate the file first before importing."
-            
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                unitime_xml_data = f.read()
-        except Exception as e:
-            return f"Error: Failed to read content from file '{filename}': {e}"
         
         # --- Step 2: Load Credentials ---
         api_url = self.get_tool_config("UNITIME_API_URL")
@@ -171,29 +174,42 @@ class ImportBatchFileTool(BaseTool):
         if not api_url or not username or not password:
             return "Error: Missing UNITIME credentials in configuration."
 
-        headers = {
-            "Content-Type": "application/xml;charset=UTF-8"
-        }
-        
-        # --- Step 3: API Request ---
+        if chunk_size is None:
+            chunk_size = int(self.get_tool_config("UNITIME_IMPORT_CHUNK_SIZE") or 0)
+        importer = get_unitime_importer(
+            api_url, username, password,
+            timeout=float(self.get_tool_config("UNITIME_IMPORT_TIMEOUT") or 120),
+            retries=int(self.get_tool_config("UNITIME_IMPORT_RETRIES") or 3),
+            max_workers=int(self.get_tool_config("UNITIME_IMPORT_CONCURRENCY") or 4),
+        )
+
+        # --- Step 3a: Chunked Import (one request per N offerings) ---
+        if chunk_size > 0:
+            print(f"--- ATTEMPTING TO POST XML from '{filename}' TO UniTime in chunks of {chunk_size} ---")
+            try:
+                results = importer.import_file(file_path, chunk_size)
+            except Exception as e:
+                return f"Error: Failed to read XML from file '{filename}': {e}"
+            if not results:
+                return f"Error: '{filename}' contains no offerings to import."
+            report = summarize_results(filename, results)
+            return report if all(r["ok"] for r in results) else f"Error: Partial import. {report}"
+
+        # --- Step 3b: API Request (whole file, streamed from disk) ---
         try:
             print(f"--- ATTEMPTING TO POST XML from '{filename}' TO UniTime ---")
             
-            response = requests.post(
-                api_url, 
-                data=unitime_xml_data.encode('utf-8'), 
-                headers=headers,
-                auth=HTTPBasicAuth(username, password)
-            )
-            
-            response.raise_for_status() 
+            with open(file_path, "rb") as f:
+                response = importer.post(f)
             
             if "text/html" in response.headers.get("Content-Type", ""):
                  return f"Successfully imported {filename}. Server returned HTML status: {response.status_code}."
             
             return f"Successfully imported {filename}. Server response: {response.text}"
         
+        except OSError as e:
+            return f"Error: Failed to read content from file '{filename}': {e}"
         except requests.exceptions.HTTPError as http_err:
             return f"Error: HTTP error during import of {filename}: {http_err}"
         except requests.exceptions.RequestException as req_err:
-            return f"Error: Critical request error for {filename}: {req_err}"
\ No newline at end of file
+            return f"Error: Critical request error for {filename}: {req_err}"
@@ -89,6 +89,7 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from Backend.tool_framework.base_tool import BaseTool
+from Backend.Helper.batch_store import get_batch_store, is_journaled
 
 # --- Pydantic Input Schema (UPDATED) ---
 class ImportToUnitimeInput(BaseModel):
@@ -111,6 +112,13 @@ class ImportToUnitimeTool(BaseTool):
         
         # --- Step 1: Read XML Data from Local File ---
         file_path = os.path.join(PROJECT_ROOT, filename)
+
+        # Batch files are kept as an append-only journal; write out the full <offerings> document first
+        if is_journaled(file_path):
+            try:
+                get_batch_store(file_path).materialize()
+            except Exception as e:
+                return f"Error: Failed to assemble '{filename}' from its journal: {e}"
         
         if not os.path.exists(file_path):
             return f"Error: The batch file '{filename}' was not found at path {file_path}. Cannot proceed with import."
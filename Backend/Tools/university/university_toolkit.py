@@ -1,7 +1,7 @@
 import os
 import sys
 from abc import ABC
-from typing import List
+from typing import List, Type
 
 # --- Project Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
@@ -24,22 +24,49 @@ class UniversityToolkit(BaseToolkit, ABC):
     name: str = "University Toolkit"
     description: str = "Toolkit containing all tools for interacting with university-specific systems."
 
-    def get_tools(self) -> List[BaseTool]:
+    def get_tool_classes(self) -> List[Type[BaseTool]]:
         return [
-            AddToBatchFileTool(), 
-            ImportBatchFileTool(),
-            UpdateCourseFileTool(),
-            ModelPromptFactoryTool(),
-            AddPreferenceToBatchTool() # <--- NEW TOOL
+            AddToBatchFileTool,
+            ImportBatchFileTool,
+            UpdateCourseFileTool,
+            ModelPromptFactoryTool,
+            AddPreferenceToBatchTool # <--- NEW TOOL
         ]
 
+    def get_tools(self) -> List[BaseTool]:
+        return [tool_class() for tool_class in self.get_tool_classes()]
+
     def get_env_keys(self) -> List[ToolConfiguration]:
         return [
             ToolConfiguration(key="GOOGLE_API_KEY", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=True),
             ToolConfiguration(key="BASE_MODEL_ID", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False),
             ToolConfiguration(key="OFFERING_MODEL_PATH", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False),
             ToolConfiguration(key="PREFERENCE_MODEL_PATH", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False), # <--- CRITICAL FOR NEW TOOL
+            ToolConfiguration(key="MODEL_POOL_MAX_ADAPTERS", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="MODEL_POOL_MEMORY_BUDGET_MB", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="GEN_MAX_BATCH_SIZE", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="GEN_MAX_WAIT_MS", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="XML_TEMPLATE_FAST_PATH", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="XML_CONSTRAINED_DECODING", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="XML_CONSTRAINED_NUM_BEAMS", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="DRAFT_MODEL_ID", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="DRAFT_OFFERING_MODEL_PATH", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="DRAFT_PREFERENCE_MODEL_PATH", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="ASSISTED_DECODING_ADD_OFFERING", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="ASSISTED_DECODING_UPDATE_COURSE", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="ASSISTED_DECODING_ADD_PREFERENCE", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="GEN_CACHE", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="GEN_CACHE_MAX_ENTRIES", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="GEN_CACHE_SQLITE", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="GEN_CACHE_PATH", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="SANITIZE_CACHE_MAX_ENTRIES", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="SANITIZE_CACHE_SQLITE", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
+            ToolConfiguration(key="SANITIZE_CACHE_PATH", key_type=ToolConfigKeyType.STRING, is_required=False, is_secret=False),
             ToolConfiguration(key="UNITIME_API_URL", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=False),
             ToolConfiguration(key="UNITIME_USERNAME", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=True),
-            ToolConfiguration(key="UNITIME_PASSWORD", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=True)
+            ToolConfiguration(key="UNITIME_PASSWORD", key_type=ToolConfigKeyType.STRING, is_required=True, is_secret=True),
+            ToolConfiguration(key="UNITIME_IMPORT_CHUNK_SIZE", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="UNITIME_IMPORT_CONCURRENCY", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="UNITIME_IMPORT_TIMEOUT", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False),
+            ToolConfiguration(key="UNITIME_IMPORT_RETRIES", key_type=ToolConfigKeyType.INT, is_required=False, is_secret=False)
         ]
\ No newline at end of file
@@ -1,31 +1,30 @@
 import os
 import sys
-import torch
 import re
 import datetime 
-from typing import Type, Any, Optional, ClassVar
+from typing import Type, Any, Optional, ClassVar, List
 from bs4 import BeautifulSoup
 
 from pydantic import BaseModel, Field
 # --- KRUTRIM IMPORT ---
 from langchain_openai import ChatOpenAI
 
-from transformers import (
-    AutoModelForSeq2SeqLM,
-    AutoTokenizer, 
-    BitsAndBytesConfig
-)
-from peft import PeftModel
-
 # --- Project Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from Backend.tool_framework.base_tool import BaseTool
+from Backend.Helper.model_registry import get_model_registry
+from Backend.Helper.batch_generator import get_batch_generator
+from Backend.Helper.offering_renderer import render_from_prompt
+from Backend.Helper.rag_retriever import resolve_index_path
+from Backend.Helper.timetable_lookup import get_timetable_lookup
+from Backend.Helper.message_ledger import OUTCOME_UPDATE_WRITTEN, UNHANDLED_OUTCOMES, get_message_ledger
 
 class UpdateCourseInput(BaseModel):
     query_text: str = Field(..., description="The formatted prompt from Model_Prompt_Factory.")
+    message_key: Optional[str] = Field(None, description="The 'Message Key' of the email this request came from (from Read_Email), if any.")
 
 class UpdateCourseFileTool(BaseTool):
     name: str = "Update_Course_File"
@@ -33,11 +32,11 @@ class UpdateCourseFileTool(BaseTool):
     args_schema: Type[BaseModel] = UpdateCourseInput
     
     UPDATE_FILE_NAME: ClassVar[str] = "unitime_update.xml"
+    ADAPTER_NAME: ClassVar[str] = "offering"
 
     # --- Attributes ---
     classifier_llm: Optional[Any] = None
-    offering_model: Optional[Any] = None
-    tokenizer: Optional[Any] = None
+    model_registry: Optional[Any] = None
     
     # Change to:
     base_model_id: str = os.getenv("BASE_MODEL_ID", "Salesforce/codet5p-770m")
@@ -69,80 +68,62 @@ class UpdateCourseFileTool(BaseTool):
 
     def _load_qlora_pipeline(self) -> Any:
         """
-        Loads the model EXACTLY like your working snippet.
-        1. BitsAndBytes Config
-        2. Load Base Model (Salesforce/codet5p-220m)
-        3. Load Tokenizer
-        4. Apply Adapter (PeftModel)
+        Attaches the offering adapter to the shared 4-bit base model.
+        Shares the same pooled base model (and adapter) as Add_Offering_to_Batch_File.
         """
-        try:
-            print(f"--- Loading Base Model: {self.base_model_id} ---")
-            
-            # 1. Quantization Config
-            bnb_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_quant_type="nf4",
-                bnb_4bit_compute_dtype=torch.float16,
-            )
-
-            # 2. Load Base Model
-            base_model = AutoModelForSeq2SeqLM.from_pretrained(
-                self.base_model_id,
-                quantization_config=bnb_config,
-                device_map="auto",
-                trust_remote_code=True,
-            )
-
-            # 3. Load Tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.base_model_id,
-                trust_remote_code=True,
-                use_fast=False,
-            )
-
-            # 4. Load Adapter
-            print(f"--- Loading Adapter: {self.offering_adapter_path} ---")
-            model = PeftModel.from_pretrained(base_model, self.offering_adapter_path)
-            model.eval()
-            
-            print("--- Model Loaded Successfully ---")
-            return model
-
-        except Exception as e:
-            print(f"CRITICAL ERROR LOADING MODEL: {e}")
-            import traceback
-            traceback.print_exc()
+        registry = get_model_registry(self.base_model_id)
+        if not registry.load_adapter(self.ADAPTER_NAME, self.offering_adapter_path):
             return None
+        return registry
 
     def _get_update_file_path(self) -> str:
         return os.path.join(PROJECT_ROOT, self.UPDATE_FILE_NAME)
 
-    def _execute(self, query_text: str) -> str:
-        # Load model if not already loaded
-        if not self.offering_model:
-            self.offering_model = self._load_qlora_pipeline()
-        
-        if not self.offering_model: 
-            return "Error: Model failed to load. Check console logs for 'CRITICAL ERROR'."
-
-        print(f"--- Generating XML for: {query_text} ---")
-
-        # 1. Generate
-        try:
-            inputs = self.tokenizer(query_text, return_tensors="pt").to(self.offering_model.device)
-            with torch.no_grad():
-                outputs = self.offering_model.generate(
-                    input_ids=inputs["input_ids"], 
-                    attention_mask=inputs["attention_mask"],
-                    max_new_tokens=512, 
-                    num_beams=4,
-                    pad_token_id=self.tokenizer.pad_token_id, 
-                    eos_token_id=self.tokenizer.eos_token_id
-                )
-            xml_output = self.tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
-            print(f"Raw Output: {xml_output}")
-        except Exception as e: 
-            return f"Error inference: {e}"
+    @staticmethod
+    def _existing_class_types(subject: str, number: str) -> List[str]:
+        """Section types the exported timetable lists for the course (the update prompt has none)."""
+        lookup = get_timetable_lookup(resolve_index_path())
+        return lookup.course_types(subject, number) if lookup else []
+
+    def _execute(self, query_text: str, message_key: Optional[str] = None) -> str:
+        if message_key:
+            previous = get_message_ledger().outcome(message_key)
+            if previous and previous not in UNHANDLED_OUTCOMES:
+                return f"Skipped: email '{message_key}' was already processed ({previous})."
+
+        # 1. Render directly when every field is known, otherwise generate
+        xml_output, path = None, "model"
+        if str(self.get_tool_config("XML_TEMPLATE_FAST_PATH") or "TRUE").upper() == "TRUE":
+            xml_output, reason = render_from_prompt(query_text, "update", self._existing_class_types)
+            if xml_output:
+                path = "template"
+            else:
+                print(f"--- [Update_Course_File]: Falling back to the model ({reason}) ---")
+
+        if xml_output is None:
+            # Load model if not already loaded
+            if not self.model_registry:
+                self.model_registry = self._load_qlora_pipeline()
+            
+            if not self.model_registry: 
+                return "Error: Model failed to load. Check console logs for 'CRITICAL ERROR'."
+
+            print(f"--- Generating XML for: {query_text} ---")
+
+            gen_kwargs = {"max_new_tokens": 512, "num_beams": 4}
+            if str(self.get_tool_config("XML_CONSTRAINED_DECODING") or "FALSE").upper() == "TRUE":
+                # Tags and attribute names are forced by the grammar, so fewer beams give the same XML
+                gen_kwargs.update(num_beams=int(self.get_tool_config("XML_CONSTRAINED_NUM_BEAMS") or 1), constraint="offering-update")
+            if str(self.get_tool_config("ASSISTED_DECODING_UPDATE_COURSE") or "FALSE").upper() == "TRUE":
+                # The 220M draft proposes the boilerplate, the 770M adapter only verifies it
+                gen_kwargs["draft"] = self.get_tool_config("DRAFT_OFFERING_MODEL_PATH") or ""
+            try:
+                xml_output = get_batch_generator(self.base_model_id).generate(
+                    self.ADAPTER_NAME, self.offering_adapter_path, query_text, **gen_kwargs
+                ).strip()
+                print(f"Raw Output: {xml_output}")
+            except Exception as e: 
+                return f"Error inference: {e}"
 
         # 2. Extract & Correct
         try:
@@ -178,5 +159,7 @@ class UpdateCourseFileTool(BaseTool):
             with open(update_file_path, "w", encoding="utf-8") as f:
                 f.write(f"{xml_header}\n{str(offering_tag)}\n\n</offerings>")
 
-            return "Success: Update file refreshed."
+            if message_key:
+                get_message_ledger().record(message_key, None, OUTCOME_UPDATE_WRITTEN)
+            return f"Success: Update file refreshed (path: {path})."
         except Exception as e: return f"Error saving file: {e}"
\ No newline at end of file
@@ -1,6 +1,6 @@
 # tool_framework/base_toolkit.py
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Type
 from pydantic import BaseModel
 import os 
 import sys
@@ -22,6 +22,13 @@ class BaseToolkit(BaseModel, ABC):
         """
         pass
 
+    def get_tool_classes(self) -> List[Type[BaseTool]]:
+        """
+        Tool classes in this toolkit, so a registry can build them lazily.
+        Toolkits should override this; the default has to instantiate get_tools().
+        """
+        return [type(tool) for tool in self.get_tools()]
+
     @abstractmethod
     def get_env_keys(self) -> List[ToolConfiguration]:
         """
@@ -0,0 +1,98 @@
+# tool_framework/tool_registry.py
+import threading
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from Backend.tool_framework.base_tool import BaseTool
+from Backend.tool_framework.base_toolkit import BaseToolkit
+
+
+def _field_default(tool_class: Type[BaseTool], field: str) -> Any:
+    """Reads a declared field default (name/description/args_schema) without instantiating the tool."""
+    fields = getattr(tool_class, "model_fields", None) or getattr(tool_class, "__fields__", {})
+    info = fields.get(field)
+    return getattr(info, "default", None) if info is not None else None
+
+
+class LazyTool:
+    """
+    Stand-in for a tool that exposes its name, description and args schema
+    straight from the class, and only constructs the real tool (models, LLM
+    clients, ...) the first time it is executed.
+    """
+
+    def __init__(self, tool_class: Type[BaseTool]):
+        self.tool_class = tool_class
+        self.name: str = _field_default(tool_class, "name")
+        self.description: str = _field_default(tool_class, "description")
+        self.args_schema: Optional[Type[BaseModel]] = _field_default(tool_class, "args_schema")
+        self._instance: Optional[BaseTool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def instance(self) -> BaseTool:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    print(f"--- [Tool Registry]: Initializing {self.name} ---")
+                    self._instance = self.tool_class()
+        return self._instance
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._instance is not None
+
+    def _execute(self, *args: Any, **kwargs: Any) -> Any:
+        return self.instance._execute(*args, **kwargs)
+
+    def execute(self, tool_input: Any, **kwargs: Any) -> Any:
+        return self.instance.execute(tool_input, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only reached for attributes not defined on the proxy itself
+        return getattr(self.instance, attr)
+
+
+class ToolRegistry:
+    """Name -> LazyTool map shared by every agent group, so each tool is built at most once per process."""
+
+    def __init__(self):
+        self._tools: Dict[str, LazyTool] = {}
+        self._lock = threading.Lock()
+
+    def register(self, tool_class: Type[BaseTool]) -> LazyTool:
+        proxy = LazyTool(tool_class)
+        with self._lock:
+            return self._tools.setdefault(proxy.name, proxy)
+
+    def register_toolkit(self, toolkit: BaseToolkit) -> None:
+        for tool_class in toolkit.get_tool_classes():
+            self.register(tool_class)
+
+    def get(self, name: str) -> LazyTool:
+        try:
+            return self._tools[name]
+        except KeyError:
+            raise KeyError(f"Tool '{name}' is not registered.") from None
+
+    def tools(self, *names: str) -> List[LazyTool]:
+        return [self.get(name) for name in names]
+
+    def loaded(self) -> List[str]:
+        return [name for name, proxy in self._tools.items() if proxy.is_loaded]
+
+
+# --- Process-wide access ---
+_registry: Optional[ToolRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Returns the shared tool registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ToolRegistry()
+    return _registry
@@ -1,7 +1,11 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
 import sys
 import os
 import logging
@@ -12,6 +16,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import the compiled graph from your multi_agent.py
 # Ensure multi_agent.py has `app = workflow.compile()` accessible
 from kurt_multi_agent import app as langgraph_app
+from kurt_multi_agent import intent_router
+from Backend.Helper.imap_pool import get_imap_pool, get_inbox_watcher
+from Backend.Helper.message_ledger import get_message_ledger
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -45,6 +52,141 @@ class ChatResponse(BaseModel):
 async def root():
     return {"message": "University Assistant API is running"}
 
+@app.get("/router/stats")
+async def router_stats():
+    """How many requests each router tier (keyword/classifier/llm/default) decided."""
+    return dict(intent_router.stats)
+
+# --- Inbox watcher ---
+@app.on_event("startup")
+async def start_inbox_watcher():
+    """With EMAIL_IDLE_WATCHER=TRUE, new mail is tracked from boot so Read_Email(new_only) sees every delta."""
+    if str(os.getenv("EMAIL_IDLE_WATCHER", "FALSE")).upper() != "TRUE":
+        return
+    server, user, password = os.getenv("EMAIL_IMAP_SERVER"), os.getenv("EMAIL_ADDRESS"), os.getenv("EMAIL_PASSWORD")
+    if not all([server, user, password]):
+        logger.warning("EMAIL_IDLE_WATCHER is set but the email credentials are not configured.")
+        return
+    # Resume from the UID high-water mark Read_Email(new_only) last recorded
+    last_uid = get_message_ledger().last_uid(f"{user}@{server}", "INBOX") or None
+    get_inbox_watcher(server, user, password, "INBOX", last_uid=last_uid)
+    logger.info("IMAP inbox watcher started.")
+
+@app.on_event("shutdown")
+async def close_imap_connections():
+    get_imap_pool().close_all()
+
+# --- Graph execution off the event loop ---
+# The graph's nodes (LLM calls, model generation, FAISS) are synchronous, so each
+# run is executed on a bounded worker pool and its events are bridged back here.
+graph_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHAT_MAX_WORKERS", 8)),
+    thread_name_prefix="langgraph"
+)
+
+AGENT_NODES = {
+    "test_agent": "TEST",
+    "read_agent": "READ",
+    "write_agent": "WRITE",
+    "sync_agent": "SYNC",
+    "import_agent": "IMPORT",
+}
+
+_STREAM_DONE = object()
+
+
+async def run_graph(state: Dict[str, Any], stream_mode: Any = "updates") -> AsyncIterator[Any]:
+    """Runs `langgraph_app.stream` on the worker pool and yields its events asynchronously."""
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def produce():
+        try:
+            for item in langgraph_app.stream(state, stream_mode=stream_mode):
+                loop.call_soon_threadsafe(events.put_nowait, item)
+        except Exception as e:
+            loop.call_soon_threadsafe(events.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(events.put_nowait, _STREAM_DONE)
+
+    worker = loop.run_in_executor(graph_executor, produce)
+    while True:
+        item = await events.get()
+        if item is _STREAM_DONE:
+            break
+        if isinstance(item, Exception):
+            raise item
+        yield item
+    await worker
+
+
+def build_state(request: ChatRequest) -> Dict[str, Any]:
+    """
+    Reconstruct the state from history.
+    LangGraph expects a list of tuples or objects for messages.
+    We map 'user' -> 'human' and 'bot' -> 'ai' for LangChain/LangGraph compatibility.
+    """
+    messages = []
+    for msg in request.history:
+        if msg.role == "user":
+            messages.append(("user", msg.content))
+        elif msg.role == "bot":
+            messages.append(("assistant", msg.content))
+
+    # Append the new user message
+    messages.append(("user", request.message))
+    return {"messages": messages}
+
+
+class RunSummary:
+    """Accumulates agent / tool / final-answer information from graph update events."""
+
+    def __init__(self):
+        self.agent_used = "READ" # Default
+        self.tools_called: List[str] = []
+        self.final_response = ""
+
+    def apply(self, node: str, output: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Folds one node update into the summary and returns the tool events it contained."""
+        tool_events = []
+
+        # Detect Agent
+        if node in AGENT_NODES:
+            self.agent_used = AGENT_NODES[node]
+
+            # Capture the latest message content from this node
+            if output and "messages" in output:
+                last_msg = output["messages"][-1]
+
+                # Check for tool calls in this message
+                if hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
+                    for tc in last_msg.tool_calls:
+                        self.tools_called.append(tc.get("name", "Unknown"))
+                        tool_events.append({"type": "tool_call", "name": tc.get("name", "Unknown"), "args": tc.get("args", {})})
+
+                # If it's a text response, update final_response
+                if hasattr(last_msg, "content") and last_msg.content:
+                    self.final_response = last_msg.content
+
+        # Also capture tools from tool nodes explicitly if needed
+        if "tools" in node and output and "messages" in output:
+            for tool_msg in output["messages"]:
+                name = getattr(tool_msg, "name", None)
+                if name and name not in self.tools_called:
+                    self.tools_called.append(name)
+                tool_events.append({"type": "tool_result", "name": name, "content": str(getattr(tool_msg, "content", ""))})
+
+        return tool_events
+
+    def to_response(self) -> ChatResponse:
+        # Fallback if response is empty
+        return ChatResponse(
+            response=self.final_response or "Task processed, but no text output was generated.",
+            agent=self.agent_used,
+            tool_calls=self.tools_called
+        )
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -52,68 +194,15 @@ async def chat(request: ChatRequest):
     """
     try:
         logger.info(f"Received message: {request.message}")
-        
-        # 1. Reconstruct the state from history
-        # LangGraph expects a list of tuples or objects for messages
-        # We map 'user' -> 'human' and 'bot' -> 'ai' for LangChain/LangGraph compatibility
-        messages = []
-        for msg in request.history:
-            if msg.role == "user":
-                messages.append(("user", msg.content))
-            elif msg.role == "bot":
-                messages.append(("assistant", msg.content))
-        
-        # Append the new user message
-        messages.append(("user", request.message))
-        
-        state = {"messages": messages}
-        
-        # 2. Run the graph
-        agent_used = "READ" # Default
-        tools_called = []
-        final_response = ""
-
-        # Stream through the graph to capture events
-        for event in langgraph_app.stream(state):
+        state = build_state(request)
+        summary = RunSummary()
+
+        # Stream through the graph (on the worker pool) to capture events
+        async for event in run_graph(state):
             for node, output in event.items():
-                
-                # Detect Agent
-                if "agent" in node:
-                    if "test_agent" in node: agent_used = "TEST"
-                    elif "read_agent" in node: agent_used = "READ"
-                    elif "write_agent" in node: agent_used = "WRITE"
-                    elif "sync_agent" in node: agent_used = "SYNC"
-                    elif "import_agent" in node: agent_used = "IMPORT"
-
-                    # Capture the latest message content from this node
-                    if "messages" in output:
-                        last_msg = output["messages"][-1]
-                        
-                        # Check for tool calls in this message
-                        if hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
-                            for tc in last_msg.tool_calls:
-                                tools_called.append(tc.get("name", "Unknown"))
-                        
-                        # If it's a text response, update final_response
-                        if hasattr(last_msg, "content") and last_msg.content:
-                            final_response = last_msg.content
-
-                # Also capture tools from tool nodes explicitly if needed
-                if "tools" in node and "messages" in output:
-                    for tool_msg in output["messages"]:
-                        name = getattr(tool_msg, "name", None)
-                        if name and name not in tools_called:
-                            tools_called.append(name)
+                summary.apply(node, output)
 
-        # Fallback if response is empty
-        if not final_response:
-            final_response = "Task processed, but no text output was generated."
-
-        return ChatResponse(
-            response=final_response,
-            agent=agent_used,
-            tool_calls=tools_called
-        )
+        return summary.to_response()
 
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}")
@@ -123,6 +212,57 @@ async def chat(request: ChatRequest):
             tool_calls=[]
         )
 
+
+def sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Server-Sent Events version of /chat.
+    Emits `agent`, `token`, `tool_call`, `tool_result`, then `done` (the ChatResponse) or `error`.
+    """
+    logger.info(f"Received streaming message: {request.message}")
+    state = build_state(request)
+
+    async def event_source() -> AsyncIterator[str]:
+        summary = RunSummary()
+        current_agent = None
+        try:
+            async for mode, payload in run_graph(state, stream_mode=["updates", "messages"]):
+                if mode == "messages":
+                    chunk, metadata = payload
+                    node = metadata.get("langgraph_node", "")
+                    # Only the agents' own tokens; router and tool-internal LLM calls are not the answer
+                    if node not in AGENT_NODES:
+                        continue
+                    if AGENT_NODES[node] != current_agent:
+                        current_agent = AGENT_NODES[node]
+                        yield sse("agent", {"agent": current_agent})
+                    content = getattr(chunk, "content", "")
+                    if content:
+                        yield sse("token", {"agent": current_agent, "content": content})
+                    continue
+
+                for node, output in payload.items():
+                    if node in AGENT_NODES and AGENT_NODES[node] != current_agent:
+                        current_agent = AGENT_NODES[node]
+                        yield sse("agent", {"agent": current_agent})
+                    for tool_event in summary.apply(node, output):
+                        yield sse(tool_event.pop("type"), tool_event)
+
+            yield sse("done", summary.to_response().dict())
+        except Exception as e:
+            logger.error(f"Error in chat stream endpoint: {str(e)}")
+            yield sse("error", {"response": f"System Error: {str(e)}"})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000,reload=True)
\ No newline at end of file
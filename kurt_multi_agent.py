@@ -7,6 +7,7 @@ from langchain_core.prompts import ChatPromptTemplate
 # CHANGED: Use OpenAI wrapper for Krutrim (since the API is OpenAI-compatible)
 from langchain_openai import ChatOpenAI 
 from langchain_core.tools import StructuredTool
+from langchain_core.messages import AIMessage, HumanMessage
 
 # --- LangGraph Imports ---
 from langgraph.graph import StateGraph, END
@@ -18,6 +19,11 @@ from Backend.Tools.email.email_toolkit import EmailToolkit
 from Backend.Tools.university.university_toolkit import UniversityToolkit
 from Backend.Tools.Auto_sync.auto_sync_toolkit import AutoSyncToolkit
 from Backend.Tools.rag_system.rag_toolkit import RAGToolkit
+from Backend.tool_framework.tool_registry import get_tool_registry
+from Backend.Agents.intent_router import TieredIntentRouter
+from Backend.Helper.answer_cache import get_answer_cache
+from Backend.Helper.rag_retriever import read_index_version, resolve_index_path
+from Backend.Helper.timetable_lookup import get_timetable_lookup
 
 
 # ===============================
@@ -59,12 +65,12 @@ def make_llm():
 # 2. LOAD TOOLKITS
 # ===============================
 
-print("Loading toolkits...")
-email_toolkit = EmailToolkit()
-university_toolkit = UniversityToolkit()
-auto_sync_toolkit = AutoSyncToolkit()
-rag_toolkit = RAGToolkit()
-print("Toolkits loaded.")
+# Toolkits only declare their tool classes; each tool is built on first use
+# behind a LazyTool proxy and shared by every agent group below.
+tool_registry = get_tool_registry()
+for toolkit in (EmailToolkit(), UniversityToolkit(), AutoSyncToolkit(), RAGToolkit()):
+    tool_registry.register_toolkit(toolkit)
+print("Toolkits registered.")
 
 
 # Helper: convert your custom tools to LangChain StructuredTool objects
@@ -87,53 +93,27 @@ def to_langchain_tools(tool_list):
 # ===============================
 
 # TEST → Export_Timetable
-test_tools_raw = [
-    t for t in auto_sync_toolkit.get_tools()
-    if t.name == "Export_Timetable"
-]
+test_tools_raw = tool_registry.tools("Export_Timetable")
 
 # READ → Query_Student_Timetable
-read_tools_raw = [
-    t for t in rag_toolkit.get_tools()
-    if t.name == "Query_Student_Timetable"
-]
+read_tools_raw = tool_registry.tools("Query_Student_Timetable")
 
 # WRITE → All admin tools (Email, Add, Update, Prefs, Factory)
-write_tools_raw = [
-    t for t in email_toolkit.get_tools()
-    if t.name == "Read_Email"
-] + [
-    t for t in university_toolkit.get_tools()
-    if t.name == "Add_Offering_to_Batch_File"
-] + [
-    t for t in university_toolkit.get_tools()
-    if t.name == "Update_Course_File"
-] + [
-    t for t in rag_toolkit.get_tools()
-    if t.name == "Query_Student_Timetable"
-] + [
-    t for t in university_toolkit.get_tools()
-    if t.name == "Model_Prompt_Factory"
-] + [
-    t for t in university_toolkit.get_tools()
-    if t.name == "Add_Preference_to_Batch"
-]
-
+write_tools_raw = tool_registry.tools(
+    "Read_Email",
+    "Mark_Email_Ignored",
+    "Add_Offering_to_Batch_File",
+    "Update_Course_File",
+    "Query_Student_Timetable",
+    "Model_Prompt_Factory",
+    "Add_Preference_to_Batch",
+)
 
 # SYNC → Export_Timetable + Refresh_RAG_Database
-sync_tools_raw = [
-    t for t in auto_sync_toolkit.get_tools()
-    if t.name == "Export_Timetable"
-] + [
-    t for t in rag_toolkit.get_tools()
-    if t.name == "Refresh_RAG_Database"
-]
+sync_tools_raw = tool_registry.tools("Export_Timetable", "Refresh_RAG_Database")
 
 # IMPORT → Import_File_to_Unitime
-import_tools_raw = [
-    t for t in university_toolkit.get_tools()
-    if t.name == "Import_File_to_Unitime"
-]
+import_tools_raw = tool_registry.tools("Import_File_to_Unitime")
 
 # Convert to LangChain tools
 test_tools_lc = to_langchain_tools(test_tools_raw)
@@ -178,6 +158,11 @@ router_prompt = ChatPromptTemplate.from_messages(
 router_llm = make_llm()
 router_chain = router_prompt | router_llm
 
+# Keyword + local classifier tiers first; the LLM chain only sees low-confidence messages
+intent_router = TieredIntentRouter(
+    llm_route=lambda text: router_chain.invoke({"input": text}).content
+)
+
 
 # ===============================
 # 5. WORKFLOW AGENTS (PROMPTS + CHAINS)
@@ -225,7 +210,8 @@ write_prompt = ChatPromptTemplate.from_messages(
             "You are the WRITE agent. You are responsible for safe, accurate updates to course data.\n\n"
             
             "TOOLS:\n"
-            "- `Read_Email`: Fetches recent emails.\n"
+            "- `Read_Email`: Fetches recent emails, or only new ones with `new_only`.\n"
+            "- `Mark_Email_Ignored`: Records emails that are not course/university requests so they are not returned again.\n"
             "- `Add_Offering_to_Batch_File`: Appends NEW courses to 'unitime_batch.xml'.\n"
             "- `Add_Preference_to_Batch`: Appends NEW preferences to 'unitime_batch.xml'.\n"
             "- `Update_Course_File`: Overwrites 'unitime_update.xml' with modifications.\n"
@@ -246,13 +232,18 @@ write_prompt = ChatPromptTemplate.from_messages(
             
             "WORKFLOW 3: PROCESSING EMAILS (CRITICAL)\n"
             "If the user says 'Check email' or 'Process inbox':\n"
-            "1. Call `Read_Email`.\n"
-            "2. **FILTER STEP:** When you receive the list of emails, IGNORE any emails from 'Uber', 'Medium', 'LinkedIn', or obvious marketing/spam.\n"
+            "1. Call `Read_Email` with `new_only` set to true so only emails that arrived since the last check are returned (omit it only if the user asks for all recent emails).\n"
+            "2. **FILTER STEP:** `Read_Email` already drops obvious marketing/spam locally. IGNORE any remaining emails that are not course/university requests.\n"
             "3. **ACTION STEP:** Look strictly for Course/University related subjects (e.g. 'Request to Add', 'Update Class', 'Preference').\n"
-            "   - Found a **NEW COURSE** request? -> IMMEDIATELY Call `Add_Offering_to_Batch_File` with that email's body.\n"
-            "   - Found a **PREFERENCE** request? -> IMMEDIATELY Call `Add_Preference_to_Batch` with that email's body.\n"
-            "   - Found an **UPDATE** request? -> Use Workflow 1 logic.\n"
-            "4. **REPORT:** Tell the user exactly which email you processed and which you ignored."
+            "   - Found a **NEW COURSE** request? -> IMMEDIATELY Call `Add_Offering_to_Batch_File` with that email's body and its `Message Key` as `message_key`.\n"
+            "   - Found a **PREFERENCE** request? -> IMMEDIATELY Call `Add_Preference_to_Batch` with that email's body and its `Message Key` as `message_key`.\n"
+            "   - Found an **UPDATE** request? -> Use Workflow 1 logic, passing the email's `Message Key` to `Update_Course_File`.\n"
+            "   - Emails marked `Already Processed` were handled on an earlier run; do not process them again.\n"
+            "   - Emails marked `Returned Earlier` were read on an earlier run but never handled; process them like new emails.\n"
+            "   - Emails marked `Filtered Out` were dropped by the local pre-filter (no body is returned); do not process them, but list them in the report with their subject and score.\n"
+            "   - When several emails need `Add_Offering_to_Batch_File` / `Add_Preference_to_Batch`, issue ALL of those tool calls in the SAME turn so they are generated together in one batch.\n"
+            "4. **IGNORE STEP:** Call `Mark_Email_Ignored` with the `Message Key` of every returned email you did not process (not the `Filtered Out` ones). Emails without a recorded outcome are returned again on the next check.\n"
+            "5. **REPORT:** Tell the user exactly which email you processed and which you ignored."
         ),
         ("placeholder", "{messages}"),
     ]
@@ -274,7 +265,7 @@ sync_prompt = ChatPromptTemplate.from_messages(
             "If the user asks to 'run the sync', 'refresh the database', or 'run the auto-sync':\n"
             "You MUST perform these steps in order:\n"
             "1. Call `Export_Timetable` to get the currently active schedule.\n"
-            "2. AFTER step 1 succeeds, call `Refresh_RAG_Database`.\n"
+            "2. AFTER step 1 succeeds, call `Refresh_RAG_Database`. If step 1 reported `changed=false`, SKIP this step: the database is already current.\n"
             "3. Finally, inform the user that the sync is complete and the chatbot is updated.\n"
         ),
         ("placeholder", "{messages}"),
@@ -323,9 +314,59 @@ def make_agent_node(chain):
     return _node
 
 
+def _standalone_question(messages):
+    """The user's question if it is the only human turn (no history it could depend on), else None."""
+    human_turns = [m for m in messages if isinstance(m, HumanMessage)]
+    if len(human_turns) != 1:
+        return None
+    return human_turns[0].content
+
+
+def make_cached_read_node(chain):
+    """
+    READ node with the structured lookup and a semantic answer cache in front of it.
+    A standalone where / when / who-teaches question about a known course,
+    instructor or room, or a repeated question, is answered without any LLM
+    call; other questions go to the retriever. The cache is tied to
+    the RAG index version, so a refresh invalidates it.
+    """
+    answer_cache = get_answer_cache("read_agent")
+
+    def _node(state: AgentState):
+        messages = state["messages"]
+        question = _standalone_question(messages)
+        index_path = resolve_index_path()
+        index_version = read_index_version(index_path)
+        first_turn = isinstance(messages[-1], HumanMessage)
+
+        if question and first_turn:
+            try:
+                lookup = get_timetable_lookup(index_path)
+                structured = lookup.answer(question) if lookup else None
+                if structured:
+                    return {"messages": [AIMessage(content=structured)]}
+            except Exception as e:
+                print(f"[Timetable Lookup] Skipped: {e}")
+            try:
+                cached = answer_cache.lookup(question, index_version)
+                if cached:
+                    return {"messages": [AIMessage(content=cached)]}
+            except Exception as e:
+                print(f"[Answer Cache] Lookup skipped: {e}")
+
+        response = chain.invoke({"messages": messages})
+        if question and not getattr(response, "tool_calls", None) and response.content:
+            try:
+                answer_cache.store(question, response.content, index_version)
+            except Exception as e:
+                print(f"[Answer Cache] Store skipped: {e}")
+        return {"messages": [response]}
+    return _node
+
+
 # Agent nodes
 test_agent_node = make_agent_node(test_chain)
-read_agent_node = make_agent_node(read_chain)
+read_agent_node = make_cached_read_node(read_chain)
 write_agent_node = make_agent_node(write_chain)
 sync_agent_node = make_agent_node(sync_chain)
 import_agent_node = make_agent_node(import_chain)
@@ -347,15 +388,7 @@ def route_decision(state: AgentState) -> str:
     """Decide which workflow (TEST/READ/WRITE/SYNC/IMPORT) to route to."""
     last_message = state["messages"][-1]
     user_text = getattr(last_message, "content", str(last_message))
-    try:
-        route = router_chain.invoke({"input": user_text})
-        choice = route.content.strip().upper()
-    except Exception as e:
-        print(f"Router Error: {e}. Defaulting to READ.")
-        choice = "READ"
-        
-    if choice not in ["TEST", "READ", "WRITE", "SYNC", "IMPORT"]:
-        choice = "READ"  # default fallback
+    choice = intent_router.route(user_text)
     print(f"[Router] Routing to: {choice}")
     return choice
 
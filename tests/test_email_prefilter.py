@@ -0,0 +1,61 @@
+import pytest
+
+from Backend.Helper.email_prefilter import EmailPreFilter, RELEVANT_TERMS
+
+
+@pytest.fixture(scope="module")
+def prefilter():
+    return EmailPreFilter(allow_domains=["registrar.uni.example"])
+
+
+def test_word_followed_by_digits_is_not_a_course_code(prefilter):
+    keep, score, reasons = prefilter.keep({"From": "deals@shop.example", "Subject": "Flat 500 off on trip 123"}, "")
+    assert not keep
+    assert not any(r.startswith("course code") for r in reasons)
+
+
+def test_a_course_code_alone_does_not_clear_the_threshold(prefilter):
+    weight = dict((label, w) for label, _, w in RELEVANT_TERMS)["course code"]
+    assert weight < prefilter.threshold
+
+
+@pytest.mark.parametrize("subject, body", [
+    ("New offering", "Please add CS 101 in ENG 205 on MWF 10:00 with capacity 40."),
+    ("DLCS 102", "Please change the room to EDUC 107."),
+    ("Preference", "Instructor Doe cannot teach on Mondays, please add a time preference."),
+])
+def test_university_requests_are_kept(prefilter, subject, body):
+    keep, _, reasons = prefilter.keep({"From": "dean@uni.example", "Subject": subject}, body)
+    assert keep, reasons
+
+
+def test_bulk_mail_with_a_course_code_is_dropped(prefilter):
+    headers = {"From": "news@shop.example", "Subject": "SALE on ABC 100 headphones", "List-Unsubscribe": "<mailto:u@shop.example>"}
+    assert not prefilter.keep(headers, "Unsubscribe at any time.")[0]
+
+
+def test_allow_and_deny_domains_override_the_score(prefilter):
+    assert prefilter.keep({"From": "noreply@registrar.uni.example", "Subject": "hi"}, "")[0]
+    assert not prefilter.keep({"From": "noreply@linkedin.com", "Subject": "Add CS 101 offering"}, "room 205")[0]
+
+
+@pytest.mark.parametrize("subject, body", [
+    ("Projector", "Dr. Newman needs a projector for his lectures."),
+    ("Mornings", "Smith would like mornings only."),
+    ("Quick question", "Can we talk tomorrow?"),
+])
+def test_short_requests_without_marketing_signals_are_kept(prefilter, subject, body):
+    keep, _, reasons = prefilter.keep({"From": "faculty@uni.example", "Subject": subject}, body)
+    assert keep, reasons
+
+
+def test_newman_and_smith_requests_match_the_vocabulary(prefilter):
+    _, _, reasons = prefilter.keep({"From": "faculty@uni.example", "Subject": ""}, "Dr. Newman needs a projector for his lectures.")
+    assert {"course terms +1.5", "equipment +1", "request phrasing +0.5"} <= set(reasons)
+    _, _, reasons = prefilter.keep({"From": "faculty@uni.example", "Subject": ""}, "Smith would like mornings only.")
+    assert {"time of day +1", "request phrasing +0.5"} <= set(reasons)
+
+
+def test_low_scoring_newsletter_is_dropped(prefilter):
+    keep, score, _ = prefilter.keep({"From": "news@club.example", "Subject": "Weekly digest"}, "This week's newsletter.")
+    assert not keep and score < prefilter.threshold
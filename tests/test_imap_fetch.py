@@ -0,0 +1,120 @@
+from Backend.Helper.imap_fetch import fetch_envelopes, fetch_messages, parse_bodystructure, _split_fetch_response
+
+HEADERS = b"From: registrar@uni.example\r\nSubject: Room change\r\n\r\n"
+HEADER_ITEM = b"BODY[HEADER.FIELDS (FROM SUBJECT)] {%d}" % len(HEADERS)
+
+# Gmail: multipart/mixed with a text/plain + text/html alternative and a PDF attachment
+GMAIL_STRUCTURE = (
+    b'(("TEXT" "PLAIN" ("CHARSET" "UTF-8") NIL NIL "QUOTED-PRINTABLE" 120 4 NIL NIL NIL NIL)'
+    b'("TEXT" "HTML" ("CHARSET" "UTF-8") NIL NIL "QUOTED-PRINTABLE" 410 9 NIL NIL NIL NIL)'
+    b' "ALTERNATIVE" ("BOUNDARY" "000000000000a1b2c3") NIL NIL NIL)'
+    b'("APPLICATION" "PDF" ("NAME" "schedule.pdf") "<f_lq1>" NIL "BASE64" 52342 NIL'
+    b' ("ATTACHMENT" ("FILENAME" "schedule.pdf")) NIL NIL)'
+    b' "MIXED" ("BOUNDARY" "000000000000d4e5f6") NIL NIL NIL'
+)
+# Newsletter: a single HTML part
+HTML_ONLY_STRUCTURE = b'"TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "BASE64" 3080 40 NIL NIL NIL NIL'
+# Dovecot sends non-ASCII parameter values as literals
+NON_ASCII_NAME = "Stundenplän Übersicht.pdf".encode("utf-8")
+
+
+def envelope_response(uid: int, structure: bytes):
+    return [(b"1 (UID %d BODYSTRUCTURE (%s) %s" % (uid, structure, HEADER_ITEM), HEADERS), b")"]
+
+
+def literal_structure_response(uid: int):
+    return [
+        (b'1 (UID %d BODYSTRUCTURE (("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "8BIT" 18 1 NIL NIL NIL NIL)'
+         b'("APPLICATION" "PDF" ("NAME" {%d}' % (uid, len(NON_ASCII_NAME)), NON_ASCII_NAME),
+        (b') NIL NIL "BASE64" 9120 NIL ("ATTACHMENT" ("FILENAME" {%d}' % len(NON_ASCII_NAME), NON_ASCII_NAME),
+        (b') NIL NIL) "MIXED" ("BOUNDARY" "b1") NIL NIL NIL) ' + HEADER_ITEM, HEADERS),
+        b")",
+    ]
+
+
+class FakeConnection:
+    """Answers UID FETCH like imaplib: a list of (head, literal) tuples and trailing bytes."""
+
+    def __init__(self, envelopes, sections):
+        self.envelopes = envelopes
+        self.sections = sections
+        self.queries = []
+
+    def uid(self, command, uid_set, query):
+        self.queries.append(query)
+        if "BODYSTRUCTURE" in query:
+            return "OK", [item for uid in uid_set.split(",") for item in self.envelopes[uid]]
+        section = query[query.index("[") + 1:query.index("]")]
+        data = []
+        for uid in uid_set.split(","):
+            payload = self.sections[(uid, section)]
+            data += [(b"1 (UID %s BODY[%s] {%d}" % (uid.encode(), section.encode(), len(payload)), payload), b")"]
+        return "OK", data
+
+
+def parts_of(response):
+    (meta, literals), = _split_fetch_response(response)
+    return parse_bodystructure(meta, literals)
+
+
+def test_gmail_structure_sections():
+    parts = parts_of(envelope_response(5, GMAIL_STRUCTURE))
+    assert [(p["section"], p["type"]) for p in parts] == [
+        ("1.1", "text/plain"), ("1.2", "text/html"), ("2", "application/pdf"),
+    ]
+    assert parts[0]["encoding"] == "quoted-printable"
+    assert parts[2]["attachment"] and parts[2]["filename"] == "schedule.pdf"
+    assert parts[2]["size"] == 52342
+
+
+def test_single_part_structure_is_section_1():
+    parts = parts_of(envelope_response(5, HTML_ONLY_STRUCTURE))
+    assert [(p["section"], p["type"], p["encoding"]) for p in parts] == [("1", "text/html", "base64")]
+
+
+def test_html_only_mail_has_no_body_part():
+    conn = FakeConnection({"9": envelope_response(9, HTML_ONLY_STRUCTURE)}, {})
+    envelope, = fetch_envelopes(conn, ["9"])
+    assert envelope["body_part"] is None
+    assert envelope["headers"]["Subject"] == "Room change"
+
+
+def test_literal_parameter_values():
+    parts = parts_of(literal_structure_response(7))
+    assert [p["type"] for p in parts] == ["text/plain", "application/pdf"]
+    assert parts[1]["filename"] == "Stundenplän Übersicht.pdf"
+
+
+def test_fetch_messages_downloads_only_the_text_part():
+    body = b"Please move CS 101 to=\r\n ENG 205."
+    conn = FakeConnection({"5": envelope_response(5, GMAIL_STRUCTURE)}, {("5", "1.1"): body})
+    message, = fetch_messages(conn, ["5"])
+    assert message["body"] == "Please move CS 101 to ENG 205."
+    assert message["body_type"] == "text/plain"
+    assert [a["filename"] for a in message["attachments"]] == ["schedule.pdf"]
+    assert conn.queries[1] == "(UID BODY.PEEK[1.1])"
+
+
+def test_literal_headers_are_not_mistaken_for_structure_literals():
+    conn = FakeConnection({"7": literal_structure_response(7)}, {("7", "1"): b"Room change please"})
+    message, = fetch_messages(conn, ["7"])
+    assert message["headers"]["From"] == "registrar@uni.example"
+    assert message["body"] == "Room change please"
+    assert message["attachments"][0]["filename"] == "Stundenplän Übersicht.pdf"
+
+
+def test_unparseable_structure_falls_back_to_the_full_message():
+    raw = (
+        b"From: registrar@uni.example\r\nSubject: Room change\r\nMIME-Version: 1.0\r\n"
+        b'Content-Type: multipart/mixed; boundary="b1"\r\n\r\n'
+        b"--b1\r\nContent-Type: text/plain; charset=utf-8\r\n\r\nMove CS 101 to ENG 205.\r\n"
+        b'--b1\r\nContent-Type: application/pdf\r\nContent-Disposition: attachment; filename="plan.pdf"\r\n'
+        b"Content-Transfer-Encoding: base64\r\n\r\nJVBERg==\r\n--b1--\r\n"
+    )
+    broken = [(b'1 (UID 3 BODYSTRUCTURE (("TEXT" "PLAIN" ("CHARSET" ' + HEADER_ITEM, HEADERS), b")"]
+    conn = FakeConnection({"3": broken}, {("3", ""): raw})
+    message, = fetch_messages(conn, ["3"], include_attachments=True)
+    assert conn.queries[-1] == "(UID BODY.PEEK[])"
+    assert message["body"].strip() == "Move CS 101 to ENG 205."
+    assert message["attachments"][0]["filename"] == "plan.pdf"
+    assert message["attachments"][0]["payload"] == b"%PDF"
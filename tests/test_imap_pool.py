@@ -0,0 +1,297 @@
+import imaplib
+import select
+import socketserver
+import threading
+import time
+
+import pytest
+
+from Backend.Helper.imap_pool import ImapConnectionPool, ImapInboxWatcher
+
+
+class StubImapServer(socketserver.ThreadingTCPServer):
+    """
+    Just enough IMAP4rev1 + IDLE for the pool and the watcher: LOGIN, SELECT,
+    NOOP, UID SEARCH, UID FETCH (BODYSTRUCTURE, header fields, section 1),
+    IDLE and LOGOUT, over a single mailbox of text/plain messages.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubImapHandler)
+        self.messages = {}  # uid -> body
+        self.lock = threading.Lock()
+        self.idle_started = threading.Event()
+        self.idle_listeners = []
+        self.refuse_idle = False
+        self.failing_noops = 0
+        self.counts = {"LOGIN": 0, "NOOP": 0, "LOGOUT": 0, "IDLE": 0, "DONE": 0}
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def count(self, command):
+        with self.lock:
+            self.counts[command] += 1
+
+    def deliver(self, body):
+        with self.lock:
+            uid = max(self.messages, default=0) + 1
+            self.messages[uid] = body
+            listeners = list(self.idle_listeners)
+        for listener in listeners:
+            listener.set()
+        return uid
+
+    def connect(self, folder, user, password, server):
+        """Same signature as ImapEmail.imap_open."""
+        conn = imaplib.IMAP4("127.0.0.1", self.port, timeout=10)
+        conn.login(user, password)
+        conn.select(folder)
+        return conn
+
+
+class StubImapHandler(socketserver.StreamRequestHandler):
+
+    def send(self, text):
+        self.wfile.write(text if isinstance(text, bytes) else text.encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        self.send("* OK [CAPABILITY IMAP4rev1 IDLE] stub ready\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            tag, command, *args = line.decode().rstrip("\r\n").split(" ", 2)
+            command = command.upper()
+            rest = args[0] if args else ""
+            if command == "CAPABILITY":
+                self.send(f"* CAPABILITY IMAP4rev1 IDLE\r\n{tag} OK done\r\n")
+            elif command == "LOGIN":
+                self.server.count("LOGIN")
+                self.send(f"{tag} OK logged in\r\n")
+            elif command == "SELECT":
+                self.send(f"* {len(self.server.messages)} EXISTS\r\n* OK [UIDVALIDITY 7] ok\r\n{tag} OK [READ-WRITE] done\r\n")
+            elif command == "NOOP":
+                self.server.count("NOOP")
+                with self.server.lock:
+                    failing = self.server.failing_noops > 0
+                    self.server.failing_noops -= failing
+                if failing:
+                    self.send("* BYE going away\r\n")
+                    return
+                self.send(f"{tag} OK noop\r\n")
+            elif command == "UID":
+                self.uid(tag, rest)
+            elif command == "IDLE":
+                self.idle(tag)
+            elif command == "LOGOUT":
+                self.server.count("LOGOUT")
+                self.send(f"* BYE\r\n{tag} OK bye\r\n")
+                return
+            else:
+                self.send(f"{tag} BAD unknown command\r\n")
+
+    def uid(self, tag, rest):
+        subcommand, rest = rest.split(" ", 1)
+        with self.server.lock:
+            messages = dict(self.server.messages)
+        if subcommand.upper() == "SEARCH":
+            low = int(rest.split()[1].split(":")[0]) if rest.upper().startswith("UID") else 1
+            matching = [str(u) for u in sorted(messages) if u >= low] or [str(max(messages))] if messages else []
+            self.send(f"* SEARCH {' '.join(matching)}\r\n{tag} OK search\r\n")
+            return
+        uid_set, query = rest.split(" ", 1)
+        for seq, uid in enumerate(int(u) for u in uid_set.split(",")):
+            body = messages[uid].encode("utf-8")
+            if "BODYSTRUCTURE" in query:
+                headers = f"From: registrar@uni.example\r\nSubject: Request {uid}\r\n\r\n".encode()
+                self.send(
+                    f'* {seq + 1} FETCH (UID {uid} BODYSTRUCTURE ("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" '
+                    f"{len(body)} 1 NIL NIL NIL NIL) BODY[HEADER.FIELDS (FROM SUBJECT)] {{{len(headers)}}}\r\n"
+                )
+                self.send(headers + b")\r\n")
+            else:
+                self.send(f"* {seq + 1} FETCH (UID {uid} BODY[1] {{{len(body)}}}\r\n")
+                self.send(body + b")\r\n")
+        self.send(f"{tag} OK fetch\r\n")
+
+    def idle(self, tag):
+        self.server.count("IDLE")
+        if self.server.refuse_idle:
+            self.send(f"{tag} BAD IDLE not allowed\r\n")
+            return
+        arrived = threading.Event()
+        with self.server.lock:
+            self.server.idle_listeners.append(arrived)
+            known = len(self.server.messages)
+        self.send("+ idling\r\n")
+        self.server.idle_started.set()
+        try:
+            while True:
+                if arrived.is_set():
+                    arrived.clear()
+                    with self.server.lock:
+                        known = len(self.server.messages)
+                    self.send(f"* {known} EXISTS\r\n")
+                ready, _, _ = select.select([self.connection], [], [], 0.05)
+                if ready:
+                    line = self.rfile.readline()
+                    if not line or line.strip().upper() == b"DONE":
+                        break
+        finally:
+            with self.server.lock:
+                self.server.idle_listeners.remove(arrived)
+        self.server.count("DONE")
+        self.send(f"{tag} OK IDLE terminated\r\n")
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def server():
+    server = StubImapServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_pool(server, **kwargs):
+    kwargs.setdefault("keepalive_seconds", 0)
+    return ImapConnectionPool(connect=server.connect, **kwargs)
+
+
+# --- Connection pool ---
+def test_pool_reuses_a_connection(server):
+    pool = make_pool(server)
+    with pool.connection("stub", "user", "pw", "INBOX") as first:
+        assert first.noop()[0] == "OK"
+    with pool.connection("stub", "user", "pw", "INBOX") as second:
+        pass
+    assert second is first
+    assert server.counts["LOGIN"] == 1
+    pool.close_all()
+
+
+def test_pool_replaces_a_connection_that_fails_noop_and_reuses_the_new_one(server):
+    pool = make_pool(server, health_check_after=0)
+    with pool.connection("stub", "user", "pw", "INBOX") as first:
+        pass
+    server.failing_noops = 1
+    with pool.connection("stub", "user", "pw", "INBOX") as second:
+        assert second.noop()[0] == "OK"
+    assert second is not first
+    with pool.connection("stub", "user", "pw", "INBOX") as third:
+        pass
+    assert third is second
+    assert server.counts["LOGIN"] == 2
+    pool.close_all()
+
+
+def test_pool_drops_connections_that_broke_in_use(server):
+    pool = make_pool(server)
+    with pytest.raises(imaplib.IMAP4.abort):
+        with pool.connection("stub", "user", "pw", "INBOX") as conn:
+            raise imaplib.IMAP4.abort("socket error")
+    with pool.connection("stub", "user", "pw", "INBOX") as fresh:
+        pass
+    assert fresh is not conn
+    assert server.counts["LOGIN"] == 2
+    pool.close_all()
+
+
+def test_pool_keeps_at_most_max_per_key_idle(server):
+    pool = make_pool(server, max_per_key=1)
+    with pool.connection("stub", "user", "pw", "INBOX"):
+        with pool.connection("stub", "user", "pw", "INBOX"):
+            pass
+    assert server.counts["LOGIN"] == 2
+    assert wait_for(lambda: server.counts["LOGOUT"] == 1)
+    pool.close_all()
+
+
+def test_keepalive_noops_idle_connections_and_closes_expired_ones(server):
+    pool = make_pool(server, keepalive_seconds=0.05, max_idle_seconds=0.5)
+    with pool.connection("stub", "user", "pw", "INBOX"):
+        pass
+    assert wait_for(lambda: server.counts["NOOP"] >= 1)
+    assert wait_for(lambda: server.counts["LOGOUT"] == 1)
+    assert pool._idle == {}
+    pool.close_all()
+
+
+def test_close_all_logs_out_idle_connections_and_stops_keepalive(server):
+    pool = make_pool(server, keepalive_seconds=0.05)
+    with pool.connection("stub", "user", "pw", "INBOX"):
+        with pool.connection("stub", "user", "pw", "Sent"):
+            pass
+    pool.close_all()
+    assert server.counts["LOGOUT"] == 2
+    assert pool._idle == {}
+    assert wait_for(lambda: not pool._keepalive_thread.is_alive())
+
+
+# --- Inbox watcher ---
+def test_idle_once_reports_exists(server):
+    server.deliver("first")
+    conn = server.connect("INBOX", "user", "pw", "stub")
+    watcher = ImapInboxWatcher("stub", "user", "pw", idle_timeout=10)
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("arrived", watcher._idle_once(conn)))
+    thread.start()
+    assert server.idle_started.wait(5)
+    server.deliver("second")
+    thread.join(10)
+    assert result == {"arrived": True}
+    assert server.counts["DONE"] == 1
+    # The connection is usable again once IDLE has been terminated
+    assert conn.noop()[0] == "OK"
+    conn.logout()
+
+
+def test_idle_once_raises_when_the_server_refuses_idle(server):
+    server.refuse_idle = True
+    conn = server.connect("INBOX", "user", "pw", "stub")
+    watcher = ImapInboxWatcher("stub", "user", "pw")
+    with pytest.raises(imaplib.IMAP4.error):
+        watcher._idle_once(conn)
+
+
+def test_watcher_queues_only_messages_above_the_last_seen_uid(server):
+    server.deliver("already there")
+    watcher = ImapInboxWatcher("stub", "user", "pw", idle_timeout=10, connect=server.connect).start()
+    try:
+        assert server.idle_started.wait(5)
+        assert watcher.last_uid == 1
+        uid = server.deliver("Please move CS 101 to ENG 205.")
+        assert wait_for(lambda: not watcher.messages.empty())
+        item, = watcher.drain()
+        assert item["uid"] == str(uid)
+        assert item["body"] == "Please move CS 101 to ENG 205."
+        assert item["headers"]["Subject"] == f"Request {uid}"
+        assert watcher.last_uid == uid
+    finally:
+        watcher.stop()
+
+
+def test_requeue_puts_unused_messages_back_in_order(server):
+    watcher = ImapInboxWatcher("stub", "user", "pw")
+    for uid in ("1", "2", "3"):
+        watcher.messages.put({"uid": uid})
+    drained = watcher.drain()
+    watcher.requeue(drained[1:])
+    watcher.messages.put({"uid": "4"})
+    assert [m["uid"] for m in watcher.drain(limit=2)] == ["2", "3"]
+    assert [m["uid"] for m in watcher.drain()] == ["4"]
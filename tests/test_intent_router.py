@@ -0,0 +1,56 @@
+import pytest
+
+from Backend.Agents.intent_router import TieredIntentRouter
+
+
+@pytest.fixture(scope="module")
+def router():
+    # The LLM tier answers READ, so anything that reaches it is visibly not IMPORT
+    return TieredIntentRouter(llm_route=lambda text: "READ")
+
+
+@pytest.mark.parametrize("text", [
+    "import the batch file",
+    "Please import the update",
+    "import new courses",
+    "Can you import the batch file now?",
+    "push the batch to unitime",
+    "apply the changes to unitime",
+])
+def test_import_commands_route_locally(router, text):
+    assert router._keyword_route(text) == "IMPORT"
+    assert router.route(text) == "IMPORT"
+
+
+@pytest.mark.parametrize("text", [
+    "Do not import anything yet, just show me ALG 101",
+    "Don't push anything to unitime",
+    "don't import the batch file",
+    "Please do not apply the changes yet",
+    "What rooms are free? also import is broken?",
+    "the import failed yesterday, who teaches CHM 101?",
+    "is the import done?",
+    "where is the unitime batch file",
+])
+def test_negated_or_mixed_messages_never_import_locally(router, text):
+    assert router._keyword_route(text) != "IMPORT"
+    assert router._classifier_route(text) != "IMPORT"
+    assert router.route(text) != "IMPORT"
+
+
+def test_negated_import_is_left_to_the_llm():
+    calls = []
+    router = TieredIntentRouter(llm_route=lambda text: calls.append(text) or "READ")
+    assert router.route("Don't push anything to unitime") == "READ"
+    assert calls == ["Don't push anything to unitime"]
+    assert router.stats["llm"] == 1
+
+
+@pytest.mark.parametrize("text, route", [
+    ("where is my ALG 101 class?", "READ"),
+    ("add a new offering CS 450", "WRITE"),
+    ("refresh the rag index", "SYNC"),
+    ("test the selenium export", "TEST"),
+])
+def test_other_routes_keep_their_keyword_rules(router, text, route):
+    assert router._keyword_route(text) == route
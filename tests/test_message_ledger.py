@@ -0,0 +1,31 @@
+from Backend.Helper.message_ledger import (
+    OUTCOME_BATCH_APPENDED, OUTCOME_IGNORED, OUTCOME_PENDING, MessageLedger, content_hash,
+)
+
+
+def make_ledger(tmp_path):
+    return MessageLedger(str(tmp_path / "ledger.sqlite3"))
+
+
+def test_returned_emails_stay_pending_until_a_tool_records_an_outcome(tmp_path):
+    ledger = make_ledger(tmp_path)
+    ledger.record("<b@uni>", content_hash("b"), OUTCOME_PENDING, folder="INBOX", uid="12")
+    ledger.record("<a@uni>", content_hash("a"), OUTCOME_PENDING, folder="INBOX", uid="3")
+    ledger.record("<c@uni>", content_hash("c"), OUTCOME_PENDING, folder="Sent", uid="4")
+    assert ledger.pending("INBOX") == [("<a@uni>", "3"), ("<b@uni>", "12")]
+
+    ledger.record("<a@uni>", None, OUTCOME_BATCH_APPENDED)
+    ledger.record("<b@uni>", None, OUTCOME_IGNORED)
+    assert ledger.pending("INBOX") == []
+    # The tool's record keeps the content hash and UID Read_Email stored
+    assert ledger.seen([("<a@uni>", content_hash("a"))]) == {"<a@uni>": OUTCOME_BATCH_APPENDED}
+
+
+def test_high_water_mark_only_moves_forward_within_a_uidvalidity(tmp_path):
+    ledger = make_ledger(tmp_path)
+    ledger.set_last_uid("me@imap", "INBOX", 10, "7")
+    ledger.set_last_uid("me@imap", "INBOX", 4, "7")
+    assert ledger.last_uid("me@imap", "INBOX", "7") == 10
+    assert ledger.last_uid("me@imap", "INBOX", "8") == 0
+    ledger.set_last_uid("me@imap", "INBOX", 4, "8")
+    assert ledger.last_uid("me@imap", "INBOX", "8") == 4
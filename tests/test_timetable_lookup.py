@@ -0,0 +1,56 @@
+import pytest
+
+from Backend.Helper.timetable_lookup import TimetableLookupIndex
+
+
+def section(name, type_, location, instructor, days="MWF", start="0900", end="0950"):
+    return {
+        "name": name, "section": "1", "type": type_, "title": f"{name} title", "days": days,
+        "start": start, "end": end, "location": location, "instructor": instructor, "dates": "",
+    }
+
+
+@pytest.fixture(scope="module")
+def lookup():
+    return TimetableLookupIndex([
+        section("ALG 101", "Lecture", "EDUC 107", "Doe, Jane"),
+        section("ALG 101", "Laboratory", "SCI 110", "Doe, Jane", days="Th", start="1300", end="1450"),
+        section("C S 201", "Lecture", "THTR 101", "Newman, Paul", days="TTh", start="1030", end="1145"),
+    ])
+
+
+@pytest.mark.parametrize("question, subject", [
+    ("Where is my ALG 101 class?", "ALG 101"),
+    ("When does ALG 101 meet?", "ALG 101"),
+    ("What time is CS 201?", "CS 201"),
+    ("Who teaches ALG 101?", "ALG 101"),
+    ("What room is CS 201 in?", "CS 201"),
+    ("What does Newman teach?", "instructor Newman"),
+    ("What's in EDUC 107 on Monday?", "room EDUC 107"),
+    ("Which days is THTR used?", "building THTR"),
+])
+def test_listing_questions_are_answered(lookup, question, subject):
+    answer = lookup.answer(question)
+    assert answer is not None
+    assert answer.startswith(f"Here is what the schedule lists for {subject}:")
+
+
+@pytest.mark.parametrize("question", [
+    "Is ALG 101 full?",
+    "Does ALG 101 have a lab?",
+    "What can I take after ALG 101?",
+    "I have a question about Doe",
+    "how do I get to the THTR building",
+    "Who should I contact about ALG 101?",
+])
+def test_other_questions_fall_through_to_the_retriever(lookup, question):
+    assert lookup.answer(question) is None
+
+
+def test_listing_question_about_an_unknown_course_falls_through(lookup):
+    assert lookup.answer("Where is BIOL 999?") is None
+
+
+def test_course_types(lookup):
+    assert lookup.course_types("ALG", "101") == ["Laboratory", "Lecture"]
+    assert lookup.course_types("CS", "201") == ["Lecture"]
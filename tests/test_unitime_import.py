@@ -0,0 +1,188 @@
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Backend.Helper import unitime_import
+from Backend.Helper.unitime_import import UniTimeImporter, get_unitime_importer, iter_chunks, summarize_results
+
+ROOT_ATTRS = {"campus": "woebegon", "year": "2010", "term": "Fal", "created": 'Fri "Oct" 16 & co'}
+
+
+def write_batch(tmp_path, count):
+    root = ET.Element("offerings", ROOT_ATTRS)
+    for i in range(count):
+        offering = ET.SubElement(root, "offering", {"offered": "true", "action": "insert"})
+        ET.SubElement(offering, "course", {"subject": "CS", "courseNbr": str(101 + i), "title": f"Course {i} <&>"})
+        config = ET.SubElement(offering, "config", {"name": "1", "limit": "30"})
+        ET.SubElement(config, "subpart", {"type": "Lec", "minPerWeek": "150"})
+    path = tmp_path / "unitime_batch.xml"
+    ET.ElementTree(root).write(path, encoding="UTF-8", xml_declaration=True)
+    return str(path)
+
+
+class StubUniTime(ThreadingHTTPServer):
+    """Records every POSTed document; `respond(body, attempt)` picks the status for each."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubUniTimeHandler)
+        self.lock = threading.Lock()
+        self.bodies = []
+        self.attempts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.respond = lambda body, attempt: 200
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/import"
+
+
+class StubUniTimeHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        with server.lock:
+            server.bodies.append(body)
+            attempt = server.attempts[body] = server.attempts.get(body, 0) + 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            server.release.wait(10)
+            status = server.respond(body, attempt)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+        payload = b"ok" if status == 200 else b"Import failed: bad offering"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def server():
+    server = StubUniTime()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def make_importer(server, **kwargs):
+    kwargs.setdefault("retries", 2)
+    return UniTimeImporter(server.url, "admin", "secret", timeout=10, backoff=0, **kwargs)
+
+
+# --- Chunking ---
+def test_chunks_are_well_formed_documents_under_a_copy_of_the_root(tmp_path):
+    path = write_batch(tmp_path, 7)
+    chunks = list(iter_chunks(path, 3))
+    assert [index for index, _, _ in chunks] == [0, 1, 2]
+    assert [labels for _, labels, _ in chunks] == [
+        ["CS 101", "CS 102", "CS 103"], ["CS 104", "CS 105", "CS 106"], ["CS 107"],
+    ]
+    for _, labels, document in chunks:
+        assert document.startswith(b'<?xml version="1.0" encoding="UTF-8"?>')
+        root = ET.fromstring(document)
+        assert root.tag == "offerings"
+        assert root.attrib == ROOT_ATTRS
+        assert [f"{o.find('course').get('subject')} {o.find('course').get('courseNbr')}" for o in root] == labels
+        assert root.find("offering/course").get("title").endswith("<&>")
+        assert root.find("offering/config/subpart").get("type") == "Lec"
+
+
+def test_chunk_size_is_at_least_one(tmp_path):
+    assert len(list(iter_chunks(write_batch(tmp_path, 2), 0))) == 2
+
+
+# --- HTTP client ---
+def test_import_posts_every_chunk_in_order(server, tmp_path):
+    results = make_importer(server).import_file(write_batch(tmp_path, 5), 2)
+    assert [(r["chunk"], r["ok"], r["status"]) for r in results] == [(1, True, 200), (2, True, 200), (3, True, 200)]
+    assert sorted(len(ET.fromstring(b)) for b in server.bodies) == [1, 2, 2]
+
+
+def test_5xx_post_is_retried(server, tmp_path):
+    server.respond = lambda body, attempt: 503 if attempt == 1 else 200
+    results = make_importer(server).import_file(write_batch(tmp_path, 2), 2)
+    assert [(r["ok"], r["status"]) for r in results] == [(True, 200)]
+    assert len(server.bodies) == 2
+    assert server.bodies[0] == server.bodies[1]
+
+
+def test_5xx_post_fails_after_the_retries_are_used_up(server, tmp_path):
+    server.respond = lambda body, attempt: 500
+    result, = make_importer(server, retries=2).import_file(write_batch(tmp_path, 1), 1)
+    assert not result["ok"] and result["status"] == 500
+    assert "Import failed" in result["error"]
+    assert len(server.bodies) == 3
+
+
+def test_4xx_post_is_not_retried(server, tmp_path):
+    server.respond = lambda body, attempt: 400
+    result, = make_importer(server).import_file(write_batch(tmp_path, 1), 1)
+    assert result["status"] == 400
+    assert len(server.bodies) == 1
+
+
+def test_at_most_twice_max_workers_chunks_are_pending(server, tmp_path, monkeypatch):
+    produced = []
+
+    def counting_chunks(path, size):
+        for chunk in iter_chunks(path, size):
+            produced.append(chunk[0])
+            yield chunk
+
+    monkeypatch.setattr(unitime_import, "iter_chunks", counting_chunks)
+    server.release.clear()
+    importer = make_importer(server, max_workers=2)
+    done = threading.Thread(target=lambda: importer.import_file(write_batch(tmp_path, 20), 1))
+    done.start()
+
+    deadline = time.monotonic() + 5
+    while server.in_flight < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    # Every request is blocked: only 2 x max_workers chunks may have been read and submitted
+    assert len(produced) == 4
+    assert server.in_flight == 2
+
+    server.release.set()
+    done.join(10)
+    assert len(produced) == 20
+    assert server.max_in_flight <= 2
+
+
+def test_summary_reports_failed_chunks(server, tmp_path):
+    server.respond = lambda body, attempt: 400 if b'courseNbr="103"' in body else 200
+    results = make_importer(server).import_file(write_batch(tmp_path, 5), 2)
+    summary = summarize_results("unitime_batch.xml", results)
+    lines = summary.splitlines()
+    assert lines[0] == "Imported 3 of 5 item(s) from unitime_batch.xml in 2 of 3 chunk(s)."
+    assert len(lines) == 2
+    assert lines[1].startswith("- Chunk 2 FAILED (CS 103, CS 104): 400 Client Error")
+    assert "Import failed: bad offering" in lines[1]
+
+
+def test_shared_importer_is_rebuilt_when_its_settings_change():
+    first = get_unitime_importer("http://unitime.test/api", "admin", "secret")
+    assert get_unitime_importer("http://unitime.test/api", "admin", "secret") is first
+    rotated = get_unitime_importer("http://unitime.test/api", "admin", "rotated")
+    assert rotated is not first and rotated.session.auth.password == "rotated"
+    assert get_unitime_importer("http://unitime.test/api", "admin", "rotated", timeout=30).timeout == (10, 30)
+    assert get_unitime_importer("http://unitime.test/api", "admin", "rotated", timeout=30, retries=5) \
+        .session.get_adapter("http://unitime.test").max_retries.total == 5
+    assert get_unitime_importer("http://unitime.test/api", "admin", "rotated", timeout=30, retries=5,
+                                max_workers=8).max_workers == 8